@@ -0,0 +1,120 @@
+"""Локальный сокет администрирования работающего бота.
+
+Сокет Unix принимает одну команду в строке и отвечает одной строкой
+JSON: {"ok": true, "result": ...} или {"ok": false, "error": "..."}.
+Команды: state — состояние подписчиков, очереди и задержки;
+poll — внеочередной опрос; flush — отправка ожидающих сообщений
+и сохранение состояния основным циклом, без ожидания конца текущего
+цикла; memory — снимок памяти, если включён MEMORY_SNAPSHOT_INTERVAL.
+
+Запуск: python admin.py SOCKET state|poll|flush|memory
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+
+TIMEOUT = 10
+MAX_COMMAND = 256
+
+UNKNOWN_COMMAND = 'Неизвестная команда {command!r}, доступны: {commands}'
+COMMAND_ERROR = 'Ошибка {error} при выполнении команды {command}'
+ADMIN_STARTED = 'Сокет администрирования: {path}'
+
+
+class AdminHandler(socketserver.StreamRequestHandler):
+    """Выполнение одной команды из соединения."""
+
+    def handle(self):
+        """Ответ JSON на команду."""
+        command = self.rfile.readline(MAX_COMMAND).decode(
+            'utf-8', 'replace'
+        ).strip()
+        commands = self.server.commands
+        if command not in commands:
+            reply = dict(ok=False, error=UNKNOWN_COMMAND.format(
+                command=command, commands=', '.join(sorted(commands))
+            ))
+        else:
+            try:
+                reply = dict(ok=True, result=commands[command]())
+            except Exception as error:
+                message = COMMAND_ERROR.format(error=error, command=command)
+                logging.error(message)
+                reply = dict(ok=False, error=message)
+        self.wfile.write(json.dumps(
+            reply, ensure_ascii=False, default=str
+        ).encode() + b'\n')
+
+
+class AdminServer(socketserver.ThreadingUnixStreamServer):
+    """Сервер команд на сокете path."""
+
+    daemon_threads = True
+
+    def __init__(self, path, commands):
+        """Сервер с командами: имя -> функция без аргументов."""
+        remove_stale_socket(path)
+        super().__init__(path, AdminHandler)
+        os.chmod(path, 0o600)
+        self.path = path
+        self.commands = commands
+
+    def close(self):
+        """Остановка сервера и удаление сокета."""
+        self.shutdown()
+        self.server_close()
+        remove_stale_socket(self.path)
+
+
+def remove_stale_socket(path):
+    """Удаление оставшегося от прошлого запуска сокета."""
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def serve_admin(path, commands):
+    """Запуск сервера команд в фоновом потоке."""
+    server = AdminServer(path, commands)
+    threading.Thread(
+        target=server.serve_forever, name='admin', daemon=True
+    ).start()
+    logging.info(ADMIN_STARTED.format(path=path))
+    return server
+
+
+def request(path, command, timeout=TIMEOUT):
+    """Ответ бота на команду command."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall(command.encode() + b'\n')
+        with client.makefile('rb') as reply:
+            return json.loads(reply.readline())
+
+
+def main(argv=None):
+    """Команда работающему боту из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('socket')
+    parser.add_argument('command')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT)
+    arguments = parser.parse_args(argv)
+    reply = request(arguments.socket, arguments.command, arguments.timeout)
+    if not reply['ok']:
+        print(reply['error'], file=sys.stderr)
+        return 1
+    print(json.dumps(reply['result'], ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Сравнение способов разбора ответа API.
+
+Запуск: python -m benchmarks.bench_decoding
+"""
+import json
+import timeit
+import tracemalloc
+
+import decoding
+from benchmarks.payloads import chunked, make_body
+
+SIZES = (100, 1000, 10000, 100000)
+ROW = '{size:>7} {name:<10} {seconds:>10.4f} s {peak:>10.1f} KiB'
+
+
+def decode_json(body):
+    """Текущий путь: requests.Response.json()."""
+    return json.loads(body.decode())
+
+
+def decode_fast(body):
+    """Быстрый декодер (orjson, если установлен)."""
+    return decoding.loads(body)
+
+
+def decode_stream(body):
+    """Потоковый разбор с первой работой."""
+    return decoding.parse_answer(
+        chunked(body, decoding.STREAM_CHUNK_SIZE), max_homeworks=1
+    )
+
+
+DECODERS = dict(json=decode_json, fast=decode_fast, stream=decode_stream)
+
+
+def measure(decoder, body, repeat=5):
+    """Лучшее время и пиковая память одного разбора."""
+    seconds = min(timeit.repeat(
+        lambda: decoder(body), number=1, repeat=repeat
+    ))
+    tracemalloc.start()
+    decoder(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    """Таблица результатов для ответов разного размера."""
+    print('fast decoder:', 'orjson' if decoding.orjson else 'json')
+    for size in SIZES:
+        body = make_body(size)
+        for name, decoder in DECODERS.items():
+            seconds, peak = measure(decoder, body)
+            print(ROW.format(
+                size=size, name=name, seconds=seconds, peak=peak / 1024
+            ))
+
+
+if __name__ == '__main__':
+    main()
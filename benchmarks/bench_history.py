@@ -0,0 +1,65 @@
+"""Запись, открытие и запросы к журналу смен статусов.
+
+Запуск: python -m benchmarks.bench_history [записей]
+"""
+import random
+import sys
+import tempfile
+import time
+
+from history import TransitionLog, percentiles
+
+RECORDS = 1000000
+TENANTS = 10000
+BATCH = 10000
+ROW = '{name:<22} {seconds:>8.3f} s'
+
+
+def transitions(count, seed=0):
+    """Проверки: reviewing, затем approved или rejected."""
+    rng = random.Random(seed)
+    now = 1600000000.0
+    for number in range(count // 2):
+        tenant = f'token{rng.randrange(TENANTS)}'
+        name = f'hw{number}'
+        now += rng.random() * 60
+        yield tenant, name, None, 'reviewing', now
+        verdict = rng.choice(('approved', 'rejected'))
+        yield tenant, name, 'reviewing', verdict, now + rng.random() * 86400
+
+
+def timed(name, action):
+    """Время выполнения action."""
+    started = time.perf_counter()
+    result = action()
+    print(ROW.format(name=name, seconds=time.perf_counter() - started))
+    return result
+
+
+def main(count=RECORDS):
+    """Таблица времени основных операций."""
+    with tempfile.TemporaryDirectory() as directory:
+        log = TransitionLog(directory)
+
+        def write():
+            batch = []
+            for transition in transitions(count):
+                batch.append(transition)
+                if len(batch) == BATCH:
+                    log.extend(batch)
+                    batch = []
+            log.extend(batch)
+
+        timed(f'append {count}', write)
+        log.close()
+        log = timed('open', lambda: TransitionLog(directory))
+        latencies = timed('latency all', log.review_latencies)
+        timed('latency one tenant', lambda: log.review_latencies('token1'))
+        start = log.timestamps[len(log) // 2]
+        timed('latency last half', lambda: log.review_latencies(since=start))
+        print(percentiles(latencies))
+        log.close()
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,127 @@
+"""Основной цикл бота в виртуальном времени.
+
+Запросы к API заменяются ответами, зависящими от виртуального времени:
+каждые REVIEW_EVERY циклов появляется новая работа, которая сначала
+берётся на проверку, а затем принимается. Как и настоящий API, ответ
+содержит работу, только если её статус менялся начиная с from_date.
+С failure_every каждый такой запрос завершается ошибкой соединения
+или ответом 500. Сеть и ожидание не участвуют, поэтому измеряется
+стоимость самого цикла.
+
+Запуск: python -m benchmarks.bench_loop [циклов]
+"""
+import json
+import logging
+import sys
+import time
+from contextlib import contextmanager
+
+import requests
+
+import homework
+from benchmarks.suite import StubBot
+from clock import VirtualClock
+from lifecycle import Lifecycle
+
+CYCLES = 100000
+REVIEW_EVERY = 10
+ROW = '{cycles:>9} циклов {seconds:>8.3f} s {rate:>10.0f} циклов/с'
+
+
+class SimulatedResponse:
+    """Ответ API без тела в байтах, как requests.Response.json()."""
+
+    def __init__(self, answer, status_code=200):
+        """Ответ с разобранным телом answer."""
+        self.answer = answer
+        self.status_code = status_code
+
+    @property
+    def content(self):
+        """Тело ответа в байтах."""
+        return json.dumps(self.answer).encode()
+
+    def json(self):
+        """Тело ответа."""
+        return self.answer
+
+
+class SimulatedPracticum:
+    """Замена requests.get, отвечающая по виртуальному времени."""
+
+    def __init__(self, clock, period=None, review_every=REVIEW_EVERY,
+                 failure_every=0):
+        """API, где работа проходит проверку за review_every циклов."""
+        self.clock = clock
+        self.period = period or homework.RETRY_PERIOD
+        self.review_every = review_every
+        self.failure_every = failure_every
+        self.requests = 0
+        self.failures = 0
+        self.from_date = 0
+
+    def answer(self, from_date=0):
+        """Последняя работа, если её статус менялся с from_date."""
+        now = int(self.clock.time())
+        cycle = now // self.period
+        number, stage = divmod(cycle, self.review_every)
+        status = 'reviewing'
+        updated = number * self.review_every
+        if stage >= self.review_every // 2:
+            status = 'approved'
+            updated += self.review_every // 2
+        homeworks = []
+        if updated * self.period >= from_date:
+            homeworks.append(
+                {'homework_name': f'hw{number}', 'status': status}
+            )
+        return {'homeworks': homeworks, 'current_date': now}
+
+    def __call__(self, url, params=None, **kwargs):
+        """Ответ на запрос к ENDPOINT."""
+        self.requests += 1
+        self.from_date = (params or {}).get('from_date', 0)
+        if self.failure_every and not self.requests % self.failure_every:
+            self.failures += 1
+            if self.failures % 2:
+                raise requests.ConnectionError('Симуляция сбоя сети')
+            return SimulatedResponse({}, status_code=500)
+        return SimulatedResponse(self.answer(self.from_date))
+
+
+@contextmanager
+def simulated(clock, failure_every=0):
+    """homework.requests.get, отвечающий по часам clock."""
+    practicum = SimulatedPracticum(clock, failure_every=failure_every)
+    get = homework.requests.get
+    homework.requests.get = practicum
+    try:
+        yield practicum
+    finally:
+        homework.requests.get = get
+
+
+def simulate(cycles, bot=None, clock=None):
+    """Прогон cycles циклов PollLoop; возвращает цикл и API."""
+    clock = clock or VirtualClock()
+    with simulated(clock) as practicum:
+        loop = homework.PollLoop(
+            bot or StubBot(), clock=clock, lifecycle=Lifecycle()
+        )
+        loop.run(cycles=cycles)
+    return loop, practicum
+
+
+def main(cycles=CYCLES):
+    """Скорость циклов в виртуальном времени."""
+    logging.disable(logging.CRITICAL)
+    started = time.perf_counter()
+    loop, _ = simulate(cycles)
+    seconds = time.perf_counter() - started
+    print(ROW.format(cycles=loop.cycles, seconds=seconds,
+                     rate=loop.cycles / seconds))
+    print('виртуальных суток:', round(loop.clock.time() / 86400, 1))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
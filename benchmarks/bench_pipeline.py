@@ -0,0 +1,54 @@
+"""Масштабирование конвейера обработки ответов по числу процессов.
+
+Запуск: python -m benchmarks.bench_pipeline [подписчиков] [работ]
+"""
+import os
+import sys
+import time
+
+import homework
+from benchmarks.payloads import make_body
+from pipeline import ProcessPipeline
+
+TENANTS = 5000
+SIZE = 50
+ROW = '{workers:>7} {seconds:>8.3f} s {rate:>10.0f} ответов/с {speedup:>5.2f}x'
+
+
+def worker_counts():
+    """0 (без пула), затем степени двойки до числа ядер."""
+    counts = [0, 1]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    return counts
+
+
+def run(workers, bodies):
+    """Время обработки всех ответов двумя циклами опроса."""
+    with ProcessPipeline(
+        homework.TEMPLATES, homework.HOMEWORK_VERDICTS, workers=workers
+    ) as pipeline:
+        pipeline.process(bodies[:1])
+        started = time.perf_counter()
+        pipeline.process(bodies)
+        pipeline.process(bodies)
+        return time.perf_counter() - started
+
+
+def main(tenants=TENANTS, size=SIZE):
+    """Таблица времени для разного числа процессов."""
+    body = make_body(size)
+    bodies = [(number, body, 'ru', '') for number in range(tenants)]
+    baseline = None
+    print('cpu:', os.cpu_count())
+    for workers in worker_counts():
+        seconds = run(workers, bodies)
+        baseline = baseline or seconds
+        print(ROW.format(
+            workers=workers, seconds=seconds,
+            rate=2 * tenants / seconds, speedup=baseline / seconds
+        ))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,66 @@
+"""Загрузка и перечитывание списка подписчиков из файла и SQLite.
+
+Запуск: python -m benchmarks.bench_roster [подписчиков]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from roster import Roster
+
+TENANTS = 100000
+ROW = '{name:<26} {seconds:>8.3f} s'
+
+
+def timed(name, action):
+    """Время выполнения action."""
+    started = time.perf_counter()
+    result = action()
+    print(ROW.format(name=name, seconds=time.perf_counter() - started))
+    return result
+
+
+def rows(count):
+    """Подписчики: токен и chat_id."""
+    return [(f'y0_token{number:08d}', 100000 + number)
+            for number in range(count)]
+
+
+def write_file(path, tenants):
+    """Текстовый список подписчиков."""
+    with open(path, 'w', encoding='utf-8') as file:
+        file.writelines(f'{token} {chat_id}\n' for token, chat_id in tenants)
+
+
+def write_sqlite(path, tenants):
+    """Список подписчиков в SQLite."""
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE tenants (practicum_token TEXT, chat_id INTEGER)'
+    )
+    connection.executemany('INSERT INTO tenants VALUES (?, ?)', tenants)
+    connection.commit()
+    connection.close()
+
+
+def main(count=TENANTS):
+    """Таблица времени загрузки и перечитывания с изменениями."""
+    tenants = rows(count)
+    with tempfile.TemporaryDirectory() as directory:
+        for name, suffix, write in (
+            ('file', '.txt', write_file), ('sqlite', '.db', write_sqlite)
+        ):
+            path = os.path.join(directory, f'roster{suffix}')
+            write(path, tenants)
+            roster = timed(f'{name}: загрузка {count}',
+                           lambda: Roster.load(path))
+            os.remove(path)
+            write(path, tenants[1:] + [('y0_new', 1)])
+            diff = timed(f'{name}: перечитывание', roster.refresh)
+            assert len(diff.added) == len(diff.removed) == 1
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
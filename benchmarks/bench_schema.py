@@ -0,0 +1,43 @@
+"""Сравнение проверки ответа схемой и функциями homework.py.
+
+Запуск: python -m benchmarks.bench_schema
+"""
+import timeit
+
+import homework
+from benchmarks.payloads import shuffled_answers
+
+CASES = ((1, 1000), (100, 100), (1000, 10), (10, 1000))
+ROW = '{tenants:>6} x {size:<6} {name:<10} {seconds:>10.4f} s'
+
+
+def check_with_functions(answers):
+    """Текущий путь: check_response и parse_status по каждой работе."""
+    for answer in answers:
+        for homework_data in homework.check_response(answer):
+            homework.parse_status(homework_data)
+
+
+def check_with_schema(answers):
+    """Один проход скомпилированного валидатора по всей пачке."""
+    return homework.check_responses(answers)
+
+
+CHECKS = dict(functions=check_with_functions, schema=check_with_schema)
+
+
+def main():
+    """Таблица результатов для разного числа подписчиков и работ."""
+    for tenants, size in CASES:
+        answers = shuffled_answers(tenants, size)
+        for name, check in CHECKS.items():
+            seconds = min(timeit.repeat(
+                lambda: check(answers), number=1, repeat=5
+            ))
+            print(ROW.format(
+                tenants=tenants, size=size, name=name, seconds=seconds
+            ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Долгий прогон основного цикла с контролем памяти.
+
+Цикл PollLoop крутится в виртуальном времени миллионы циклов: работы
+проходят проверку, часть запросов завершается сбоями, ответы API
+кэшируются. MemoryMonitor снимает статистику tracemalloc после
+разогрева, за который заполняются кэши, и после каждой части прогона;
+объём памяти не должен вырасти больше чем на GROWTH_LIMIT байт.
+
+Запуск: python -m benchmarks.bench_soak [циклов] [частей]
+"""
+import logging
+import os
+import sys
+import time
+
+import homework
+from benchmarks.bench_loop import simulated
+from benchmarks.suite import StubBot
+from cache import SingleFlightCache
+from clock import VirtualClock
+from lifecycle import Lifecycle
+from memory import MemoryMonitor
+
+CYCLES = 1000000
+CHECKPOINTS = 10
+WARMUP = 30000
+FAILURE_EVERY = 7
+GROWTH_LIMIT = 64 * 1024
+ROW = ('{cycles:>9} циклов {seconds:>8.1f} s '
+       'память {current:>9} Б рост {growth:>+8} Б')
+GROWTH_ERROR = (
+    'Память выросла на {growth} Б за {cycles} циклов '
+    '(допустимо {limit} Б), места роста: {growing}'
+)
+
+
+def soak(cycles=CYCLES, checkpoints=CHECKPOINTS, warmup=WARMUP,
+         failure_every=FAILURE_EVERY, report=None):
+    """Прогон cycles циклов; возвращает отчёты MemoryMonitor.
+
+    Первый отчёт снимается после warmup циклов разогрева, остальные —
+    после каждой из checkpoints частей. report вызывается с числом
+    пройденных после разогрева циклов и отчётом.
+    """
+    clock = VirtualClock()
+    cache = homework.API_CACHE
+    homework.API_CACHE = SingleFlightCache(
+        ttl=2 * homework.RETRY_PERIOD, clock=clock.monotonic
+    )
+    monitor = MemoryMonitor(interval=0, clock=clock.monotonic)
+    reports = []
+    try:
+        with simulated(clock, failure_every=failure_every):
+            loop = homework.PollLoop(
+                StubBot(), clock=clock, lifecycle=Lifecycle()
+            )
+            monitor.start()
+            loop.run(cycles=warmup)
+            reports.append(monitor.snapshot())
+            chunk = max(1, cycles // checkpoints)
+            done = 0
+            while done < cycles:
+                loop.run(cycles=min(chunk, cycles - done))
+                done = loop.cycles - warmup
+                reports.append(monitor.snapshot())
+                if report:
+                    report(done, reports[-1])
+    finally:
+        monitor.stop()
+        homework.API_CACHE = cache
+    return reports
+
+
+def check_flat(reports, cycles, limit=GROWTH_LIMIT):
+    """Рост памяти после разогрева не больше limit байт."""
+    growth = reports[-1].current - reports[0].current
+    assert growth <= limit, GROWTH_ERROR.format(
+        growth=growth, cycles=cycles, limit=limit,
+        growing=reports[-1].growing
+    )
+    return growth
+
+
+def main(cycles=CYCLES, checkpoints=CHECKPOINTS):
+    """Память при долгом прогоне цикла."""
+    logging.basicConfig(
+        level=logging.WARNING, stream=open(os.devnull, 'w')
+    )
+    started = time.perf_counter()
+
+    def report(done, memory):
+        print(ROW.format(
+            cycles=done, seconds=time.perf_counter() - started,
+            current=memory.current, growth=memory.growth
+        ))
+
+    reports = soak(cycles, checkpoints, report=report)
+    growth = check_flat(reports, cycles)
+    print('рост после первой части:', growth, 'Б')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
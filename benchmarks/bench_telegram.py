@@ -0,0 +1,174 @@
+"""Скорость отправки сообщений в Telegram: telegram.Bot и AsyncBot.
+
+Локальная замена Bot API отвечает на sendMessage с задержкой LATENCY,
+как настоящий сервер по сети. Сравниваются последовательная отправка
+через python-telegram-bot, последовательная и одновременная через
+AsyncBot.
+
+Запуск: python -m benchmarks.bench_telegram [сообщений]
+"""
+import asyncio
+import json
+import sys
+import threading
+import time
+
+import telegram
+
+from telegram_async import AsyncBot
+
+MESSAGES = 500
+LATENCY = 0.02
+TOKEN = '1234:abcdefg'
+ROW = '{name:<28} {seconds:>8.3f} s {rate:>10.0f} сообщений/с'
+
+
+class StandInBotApi:
+    """Замена Bot API на локальном порту с постоянными соединениями.
+
+    Чаты из failing получают ошибку 400, как несуществующие. Первые
+    throttled запросов получают 429 с паузой retry_after, а первые
+    truncated ответов обрываются посередине.
+    """
+
+    def __init__(self, latency=LATENCY, retry_after=0.05):
+        """Сервер, отвечающий через latency секунд."""
+        self.latency = latency
+        self.retry_after = retry_after
+        self.received = []
+        self.failing = set()
+        self.throttled = 0
+        self.truncated = 0
+        self.connections = 0
+        self.loop = asyncio.new_event_loop()
+        self._server = None
+        self._writers = set()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, daemon=True
+        )
+
+    @property
+    def url(self):
+        """Адрес для TelegramClient."""
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Запуск в фоновом потоке."""
+        self._thread.start()
+        self._server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self.handle, '127.0.0.1', 0), self.loop
+        ).result()
+        return self
+
+    def stop(self):
+        """Остановка сервера, открытых соединений и цикла событий."""
+        asyncio.run_coroutine_threadsafe(
+            self._shutdown(), self.loop
+        ).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    async def _shutdown(self):
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+        while self._writers:
+            await asyncio.sleep(0)
+
+    async def handle(self, reader, writer):
+        """Запросы одного соединения, пока клиент его не закроет."""
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b''):
+                        break
+                    name, _, value = line.decode().partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(
+                    int(headers.get('content-length', 0))
+                )
+                await asyncio.sleep(self.latency)
+                status, answer = self.answer(
+                    headers.get('content-type', ''), body
+                )
+                payload = json.dumps(answer).encode()
+                response = (
+                    f'HTTP/1.1 {status} OK\r\n'
+                    'Content-Type: application/json\r\n'
+                    f'Content-Length: {len(payload)}\r\n\r\n'
+                ).encode() + payload
+                if self.truncated:
+                    self.truncated -= 1
+                    writer.write(response[:len(response) // 2])
+                    await writer.drain()
+                    break
+                writer.write(response)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            self._writers.discard(writer)
+
+    def answer(self, content_type, body):
+        """Код и тело ответа на sendMessage."""
+        if content_type.startswith('application/json'):
+            parameters = json.loads(body or b'{}')
+        else:
+            parameters = {}
+        chat_id = parameters.get('chat_id')
+        if self.throttled:
+            self.throttled -= 1
+            return 429, {'ok': False, 'error_code': 429,
+                         'description': 'Too Many Requests',
+                         'parameters': {'retry_after': self.retry_after}}
+        if str(chat_id) in self.failing:
+            return 400, {'ok': False, 'error_code': 400,
+                         'description': 'Bad Request: chat not found'}
+        self.received.append((chat_id, parameters.get('text')))
+        return 200, {'ok': True, 'result': {
+            'message_id': len(self.received), 'date': 0,
+            'chat': {'id': chat_id, 'type': 'private'},
+            'text': parameters.get('text'),
+        }}
+
+
+def timed(name, count, action):
+    """Время отправки count сообщений."""
+    started = time.perf_counter()
+    action()
+    seconds = time.perf_counter() - started
+    print(ROW.format(name=name, seconds=seconds, rate=count / seconds))
+
+
+def main(count=MESSAGES):
+    """Таблица скорости отправки."""
+    server = StandInBotApi().start()
+    messages = [(number, f'Сообщение {number}') for number in range(count)]
+    try:
+        bot = telegram.Bot(token=TOKEN, base_url=f'{server.url}/bot')
+        timed('telegram.Bot', count, lambda: [
+            bot.send_message(chat_id, text) for chat_id, text in messages
+        ])
+        fast = AsyncBot(TOKEN, api_url=server.url, rate=0)
+        timed('AsyncBot.send_message', count, lambda: [
+            fast.send_message(chat_id, text) for chat_id, text in messages
+        ])
+        timed('AsyncBot.send_many', count, lambda: fast.send_many(messages))
+        fast.close()
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
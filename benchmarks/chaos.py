@@ -0,0 +1,285 @@
+"""Внесение сбоев в локальные замены Практикума и Telegram.
+
+Каждый сценарий — расписание сбоев по циклам опроса. Настоящий
+homework.poll() опрашивает локальный HTTP-сервер, который в нужных
+циклах отвечает с задержкой, кодом 5xx, битым JSON и т.п.; бот-заглушка
+может отказывать в отправке. Как и настоящий API, заглушка возвращает
+работу, только если её статус менялся начиная с from_date; время
+заглушки сдвигается на RETRY_PERIOD за цикл. По итогам считаются время
+восстановления, лишние запросы и повторные уведомления.
+
+Запуск: python -m benchmarks.chaos [сценарий ...]
+"""
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import homework
+from state import PollState
+
+OK = 'ok'
+TIMEOUT = 'timeout'
+SERVER_ERROR = '5xx'
+MALFORMED_JSON = 'malformed_json'
+MISSING_HOMEWORKS = 'missing_homeworks'
+UNKNOWN_STATUS = 'unknown_status'
+SERVICE_ERROR = 'service_error'
+SLOW = 'slow'
+TELEGRAM_DOWN = 'telegram_down'
+
+REQUEST_TIMEOUT = 0.2
+SLOW_DELAY = 0.1
+HOMEWORK_NAME = 'hw_chaos'
+
+SCENARIOS = {
+    'timeouts': [OK] + [TIMEOUT] * 3 + [OK] * 4,
+    'server_errors': [OK] + [SERVER_ERROR] * 3 + [OK] * 4,
+    'malformed_json': [OK] + [MALFORMED_JSON] * 2 + [OK] * 4,
+    'missing_homeworks': [OK] + [MISSING_HOMEWORKS] * 2 + [OK] * 4,
+    'unknown_status': [OK] + [UNKNOWN_STATUS] * 2 + [OK] * 4,
+    'service_error': [OK] + [SERVICE_ERROR] * 2 + [OK] * 4,
+    'slow': [OK] + [SLOW] * 3 + [OK] * 2,
+    'telegram_down': [OK] + [TELEGRAM_DOWN] * 3 + [OK] * 4,
+    'flapping': [OK, SERVER_ERROR, OK, SERVER_ERROR, OK, MALFORMED_JSON, OK],
+}
+
+Outcome = namedtuple('Outcome', ('fault', 'healthy', 'requests', 'seconds'))
+Report = namedtuple('Report', (
+    'scenario', 'cycles', 'time_to_recover', 'wasted_requests',
+    'duplicate_notifications', 'notifications', 'slowest_cycle'
+))
+ROW = (
+    '{scenario:<18} {cycles:>6} {time_to_recover!s:>10} '
+    '{wasted_requests:>7} {duplicate_notifications:>11} {notifications:>6} '
+    '{slowest_cycle:>8}'
+)
+HEADER = ROW.format(
+    scenario='scenario', cycles='cycles', time_to_recover='recover, s',
+    wasted_requests='wasted', duplicate_notifications='duplicates',
+    notifications='sent', slowest_cycle='max, s'
+)
+
+
+class FakeTelegramError(Exception):
+    """Отказ заглушки Telegram."""
+
+    pass
+
+
+class FakeBot:
+    """Заглушка Telegram, запоминающая доставленные сообщения."""
+
+    def __init__(self):
+        """Бот без сообщений."""
+        self.down = False
+        self.delivered = []
+
+    def send_message(self, chat_id, text):
+        """Доставка или отказ, если заглушка «лежит»."""
+        if self.down:
+            raise FakeTelegramError('Telegram недоступен')
+        self.delivered.append(text)
+
+
+class FaultyPracticum(ThreadingHTTPServer):
+    """Заглушка API Практикума с заданным сбоем текущего цикла."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        """Сервер на свободном локальном порту."""
+        super().__init__(('127.0.0.1', 0), FaultyHandler)
+        self.fault = OK
+        self.requests = 0
+        self.now = int(time.time())
+        self.change_status('reviewing')
+
+    def change_status(self, status):
+        """Смена статуса работы незадолго до текущего времени."""
+        self.status = status
+        self.updated = self.now - 1
+
+    def answer(self, fault, from_date):
+        """Тело ответа для сбоев на уровне данных."""
+        if fault == SERVICE_ERROR:
+            return {'code': 'UnknownError', 'error': {'error': 'Ошибка'}}
+        homeworks = []
+        if fault == UNKNOWN_STATUS:
+            homeworks.append(
+                {'homework_name': HOMEWORK_NAME, 'status': 'lost'}
+            )
+        elif self.updated >= from_date:
+            homeworks.append(
+                {'homework_name': HOMEWORK_NAME, 'status': self.status}
+            )
+        answer = {'homeworks': homeworks, 'current_date': self.now}
+        if fault == MISSING_HOMEWORKS:
+            del answer['homeworks']
+        return answer
+
+    @property
+    def url(self):
+        """Адрес заглушки для homework.ENDPOINT."""
+        host, port = self.server_address
+        return f'http://{host}:{port}/api/user_api/homework_statuses/'
+
+
+class FaultyHandler(BaseHTTPRequestHandler):
+    """Ответ с учётом сбоя, заданного серверу."""
+
+    def do_GET(self):
+        """Ответ API или сбой."""
+        server = self.server
+        server.requests += 1
+        fault = server.fault
+        if fault == TIMEOUT:
+            time.sleep(REQUEST_TIMEOUT * 2)
+            return
+        if fault == SLOW:
+            time.sleep(SLOW_DELAY)
+        if fault == SERVER_ERROR:
+            self.reply(HTTPStatus.INTERNAL_SERVER_ERROR, b'{}')
+            return
+        if fault == MALFORMED_JSON:
+            self.reply(HTTPStatus.OK, b'{"homeworks": [')
+            return
+        query = parse_qs(urlsplit(self.path).query)
+        from_date = float(query.get('from_date', ['0'])[0])
+        self.reply(HTTPStatus.OK, json.dumps(
+            server.answer(fault, from_date)
+        ).encode())
+
+    def reply(self, status, body):
+        """Ответ с телом body."""
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass
+
+    def log_message(self, format, *args):
+        """Без журнала запросов."""
+        pass
+
+
+@contextmanager
+def patched_homework(server):
+    """homework, направленный на заглушку с коротким тайм-аутом."""
+    saved = dict(
+        ENDPOINT=homework.ENDPOINT,
+        REQUEST_TIMEOUT=homework.REQUEST_TIMEOUT,
+        TELEGRAM_CHAT_ID=homework.TELEGRAM_CHAT_ID,
+    )
+    homework.ENDPOINT = server.url
+    homework.REQUEST_TIMEOUT = REQUEST_TIMEOUT
+    homework.TELEGRAM_CHAT_ID = homework.TELEGRAM_CHAT_ID or 'chaos'
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(homework, name, value)
+
+
+def run_scenario(name, schedule, period=None):
+    """Прогон сценария; время в секундах опроса по RETRY_PERIOD."""
+    period = period or homework.RETRY_PERIOD
+    server = FaultyPracticum()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    bot = FakeBot()
+    state = PollState()
+    outcomes = []
+    try:
+        with patched_homework(server):
+            for cycle, fault in enumerate(schedule):
+                server.fault = OK if fault == TELEGRAM_DOWN else fault
+                bot.down = fault == TELEGRAM_DOWN
+                if cycle:
+                    server.now += period
+                if cycle == len(schedule) // 2:
+                    server.change_status('approved')
+                requests_before = server.requests
+                started = time.monotonic()
+                success = homework.poll(bot, state)
+                outcomes.append(Outcome(
+                    fault=fault,
+                    healthy=success and fault != UNKNOWN_STATUS and (
+                        last_status(bot.delivered) == expected(server.status)
+                    ),
+                    requests=server.requests - requests_before,
+                    seconds=time.monotonic() - started
+                ))
+    finally:
+        server.shutdown()
+        server.server_close()
+    return report(name, outcomes, bot.delivered, period)
+
+
+def expected(status):
+    """Сообщение, которое должно быть доставлено при статусе status."""
+    return homework.REVIEW_VERDICT.format(
+        name=HOMEWORK_NAME, verdict=homework.HOMEWORK_VERDICTS[status]
+    )
+
+
+def last_status(delivered):
+    """Последнее доставленное уведомление о статусе, без ошибок."""
+    statuses = {expected(status) for status in homework.HOMEWORK_VERDICTS}
+    for text in reversed(delivered):
+        if text in statuses:
+            return text
+    return None
+
+
+def report(name, outcomes, delivered, period):
+    """Метрики сценария по итогам циклов.
+
+    Цикл здоров, если ответ API принят и последнее доставленное в чат
+    уведомление о статусе актуально. Время восстановления считается
+    от последнего цикла со сбоем до первого здорового цикла после него.
+    """
+    faulty = [
+        index for index, outcome in enumerate(outcomes)
+        if outcome.fault != OK
+    ]
+    time_to_recover = 0
+    if faulty:
+        time_to_recover = None
+        for index in range(faulty[-1] + 1, len(outcomes)):
+            if outcomes[index].healthy:
+                time_to_recover = (index - faulty[-1]) * period
+                break
+    counts = Counter(delivered)
+    return Report(
+        scenario=name,
+        cycles=len(outcomes),
+        time_to_recover=time_to_recover,
+        wasted_requests=sum(
+            outcome.requests for outcome in outcomes if not outcome.healthy
+        ),
+        duplicate_notifications=sum(count - 1 for count in counts.values()),
+        notifications=len(delivered),
+        slowest_cycle=round(max(outcome.seconds for outcome in outcomes), 3)
+    )
+
+
+def main(names=None):
+    """Таблица метрик по сценариям."""
+    logging.disable(logging.CRITICAL)
+    print(HEADER)
+    for name in names or SCENARIOS:
+        result = run_scenario(name, SCENARIOS[name])
+        print(ROW.format(**result._asdict()))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,48 @@
+import json
+import random
+
+STATUSES = ('approved', 'reviewing', 'rejected')
+
+
+def make_homework(number, status=None):
+    """Синтетическая домашняя работа в формате API."""
+    return {
+        'id': number,
+        'status': status or STATUSES[number % len(STATUSES)],
+        'homework_name': f'student__hw{number:05d}.zip',
+        'reviewer_comment': 'Проверено ревьюером. ' * 4,
+        'date_updated': '2020-02-13T14:40:57Z',
+        'lesson_name': f'Спринт {number % 20}'
+    }
+
+
+def make_answer(size, current_date=1000198991):
+    """Ответ API с size работами."""
+    return {
+        'homeworks': [make_homework(number) for number in range(size)],
+        'current_date': current_date
+    }
+
+
+def make_body(size, current_date=1000198991):
+    """Тело ответа API в байтах."""
+    return json.dumps(
+        make_answer(size, current_date), ensure_ascii=False
+    ).encode()
+
+
+def shuffled_answers(count, size, seed=0):
+    """Набор ответов разных подписчиков."""
+    rng = random.Random(seed)
+    answers = []
+    for _ in range(count):
+        answer = make_answer(size, rng.randint(1, 2 ** 31))
+        rng.shuffle(answer['homeworks'])
+        answers.append(answer)
+    return answers
+
+
+def chunked(body, chunk_size):
+    """Тело ответа фрагментами, как его отдаёт iter_content."""
+    for start in range(0, len(body), chunk_size):
+        yield body[start:start + chunk_size]
@@ -0,0 +1,185 @@
+"""Микробенчмарки функций homework.py с порогами регрессии.
+
+Запуск:
+    python -m benchmarks.suite --save    измерить и сохранить базовую линию;
+    python -m benchmarks.suite           сравнить с базовой линией, код
+                                         возврата 1 при регрессии.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import timeit
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import homework
+from benchmarks.payloads import make_answer, make_body
+
+SIZES = (1, 10, 100, 1000, 10000)
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+THROUGHPUT_THRESHOLD = 0.25
+MEMORY_THRESHOLD = 0.1
+MIN_TIME = 0.05
+REPEAT = 7
+
+ROW = '{name:<28} {ops:>12.1f} ops/s {peak:>12} B {verdict}'
+REGRESSION = 'регрессия'
+MISSING_BASELINE = 'нет базовой линии'
+
+
+class StubBot:
+    """Бот, который ничего не отправляет."""
+
+    def send_message(self, chat_id, text):
+        """Сообщение отбрасывается."""
+        pass
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Ответ API из size работ для пути /size/."""
+
+    bodies = {}
+
+    def do_GET(self):
+        """Тело ответа для размера из пути."""
+        size = int(self.path.strip('/').split('/')[0].split('?')[0])
+        body = self.bodies.setdefault(size, make_body(size))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Без журнала запросов."""
+        pass
+
+
+def start_stub():
+    """Локальная замена API в фоновом потоке."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def cases(server):
+    """Имя бенчмарка -> функция одной операции."""
+    host, port = server.server_address
+    cases = {
+        'check_tokens': homework.check_tokens,
+        'send_message': lambda: homework.send_message(StubBot(), 'Текст'),
+    }
+    for size in SIZES:
+        answer = make_answer(size)
+        homeworks = answer['homeworks']
+        cases[f'check_response[{size}]'] = (
+            lambda answer=answer: homework.check_response(answer)
+        )
+        cases[f'parse_status[{size}]'] = (
+            lambda homeworks=homeworks: [
+                homework.parse_status(item) for item in homeworks
+            ]
+        )
+        cases[f'get_api_answer[{size}]'] = (
+            lambda url=f'http://{host}:{port}/{size}/': _get_api_answer(url)
+        )
+    return cases
+
+
+def _get_api_answer(url):
+    endpoint = homework.ENDPOINT
+    homework.ENDPOINT = url
+    try:
+        return homework.get_api_answer(0)
+    finally:
+        homework.ENDPOINT = endpoint
+
+
+def measure(operation):
+    """Операций в секунду и пиковая память одной операции."""
+    operation()
+    timer = timeit.Timer(operation)
+    number, _ = timer.autorange()
+    number = max(number, 1)
+    while True:
+        seconds = min(timer.repeat(repeat=REPEAT, number=number))
+        if seconds >= MIN_TIME or number > 10 ** 7:
+            break
+        number *= 2
+    tracemalloc.start()
+    operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dict(ops_per_sec=number / seconds, peak_bytes=peak)
+
+
+def compare(result, baseline, throughput_threshold=THROUGHPUT_THRESHOLD,
+            memory_threshold=MEMORY_THRESHOLD):
+    """Причины регрессии результата относительно базовой линии."""
+    problems = []
+    if result['ops_per_sec'] < (
+        baseline['ops_per_sec'] * (1 - throughput_threshold)
+    ):
+        problems.append('ops_per_sec {ops:.1f} < {base:.1f}'.format(
+            ops=result['ops_per_sec'], base=baseline['ops_per_sec']
+        ))
+    if result['peak_bytes'] > (
+        baseline['peak_bytes'] * (1 + memory_threshold)
+    ):
+        problems.append('peak_bytes {peak} > {base}'.format(
+            peak=result['peak_bytes'], base=baseline['peak_bytes']
+        ))
+    return problems
+
+
+def main(argv=None):
+    """Прогон бенчмарков; 1 — есть регрессии."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--save', action='store_true')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--filter', default='')
+    parser.add_argument(
+        '--threshold', type=float, default=THROUGHPUT_THRESHOLD
+    )
+    arguments = parser.parse_args(argv)
+    baseline = {}
+    if os.path.exists(arguments.baseline):
+        with open(arguments.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+    server = start_stub()
+    results = {}
+    regressions = 0
+    try:
+        for name, operation in cases(server).items():
+            if arguments.filter not in name:
+                continue
+            result = results[name] = measure(operation)
+            verdict = ''
+            if not arguments.save:
+                if name not in baseline:
+                    verdict = MISSING_BASELINE
+                else:
+                    problems = compare(
+                        result, baseline[name], arguments.threshold
+                    )
+                    if problems:
+                        regressions += 1
+                        verdict = f'{REGRESSION}: ' + '; '.join(problems)
+            print(ROW.format(
+                name=name, ops=result['ops_per_sec'],
+                peak=result['peak_bytes'], verdict=verdict
+            ))
+    finally:
+        server.shutdown()
+        server.server_close()
+    if arguments.save:
+        baseline.update(results)
+        with open(arguments.baseline, 'w', encoding='utf-8') as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
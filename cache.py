@@ -0,0 +1,142 @@
+import threading
+import time
+from contextlib import contextmanager
+
+SWEEP_THRESHOLD = 64
+
+
+class SingleFlightCache:
+    """Кэш ответов с объединением одновременных запросов.
+
+    Одновременные вызовы с одинаковым ключом ждут один запрос
+    и получают его результат. Успешный результат хранится ttl секунд;
+    просроченные записи вычищаются, когда число записей вдвое
+    превышает оставшееся после прошлой чистки. Внутри блока sharing()
+    результаты общие для одинаковых ключей и при ttl=0.
+    """
+
+    def __init__(self, ttl, clock=time.monotonic):
+        """Кэш с временем жизни записей ttl секунд."""
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._in_flight = {}
+        self._next_sweep = SWEEP_THRESHOLD
+        self._shared = None
+
+    @contextmanager
+    def sharing(self):
+        """Блок, в котором каждый ключ запрашивается не больше раза."""
+        with self._lock:
+            self._shared = {}
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._shared = None
+
+    def get(self, key, fetch):
+        """Результат fetch() для ключа: из кэша или из общего запроса."""
+        with self._lock:
+            if self._shared is not None and key in self._shared:
+                self.hits += 1
+                return self._shared[key]
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > self.clock():
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                self.misses += 1
+                flight = self._in_flight[key] = _Flight()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return flight.wait()
+        try:
+            value = fetch()
+        except BaseException as error:
+            with self._lock:
+                del self._in_flight[key]
+            flight.fail(error)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            self._store(key, value)
+        flight.resolve(value)
+        return value
+
+    def _store(self, key, value):
+        if self._shared is not None:
+            self._shared[key] = value
+        if self.ttl > 0:
+            now = self.clock()
+            if len(self._entries) >= self._next_sweep:
+                self._sweep(now)
+            self._entries[key] = (now + self.ttl, value)
+
+    def _sweep(self, now):
+        for key in [
+            key for key, (expires, _) in self._entries.items()
+            if expires <= now
+        ]:
+            del self._entries[key]
+        self._next_sweep = max(SWEEP_THRESHOLD, 2 * len(self._entries))
+
+    def clear(self):
+        """Сброс сохранённых ответов."""
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_rate(self):
+        """Доля вызовов, обслуженных без отдельного запроса."""
+        total = self.hits + self.misses + self.coalesced
+        if not total:
+            return 0.0
+        return (self.hits + self.coalesced) / total
+
+    def stats(self):
+        """Счётчики кэша."""
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            coalesced=self.coalesced,
+            hit_rate=self.hit_rate,
+            size=len(self._entries)
+        )
+
+
+class _Flight:
+    """Запрос, выполняющийся в данный момент."""
+
+    def __init__(self):
+        """Пустой результат."""
+        self._done = threading.Event()
+        self._value = None
+        self._error = None
+
+    def resolve(self, value):
+        """Передача результата ожидающим."""
+        self._value = value
+        self._done.set()
+
+    def fail(self, error):
+        """Передача исключения ожидающим."""
+        self._error = error
+        self._done.set()
+
+    def wait(self):
+        """Ожидание результата запроса."""
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._value
@@ -0,0 +1,49 @@
+import time
+
+
+class SystemClock:
+    """Реальное время процесса."""
+
+    def time(self):
+        """Текущее время Unix в секундах."""
+        return time.time()
+
+    def monotonic(self):
+        """Монотонное время в секундах."""
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        """Ожидание в реальном времени."""
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """Время, которое идёт только при sleep и advance.
+
+    Позволяет прогонять тысячи циклов опроса в секунду в тестах
+    и бенчмарках тем же кодом, что работает в реальном времени.
+    """
+
+    def __init__(self, start=0.0):
+        """Часы, показывающие start."""
+        self.now = float(start)
+        self.sleeps = 0
+
+    def time(self):
+        """Текущее виртуальное время."""
+        return self.now
+
+    def monotonic(self):
+        """Виртуальное время монотонно само по себе."""
+        return self.now
+
+    def sleep(self, seconds):
+        """Мгновенный сдвиг времени на seconds."""
+        self.sleeps += 1
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        """Сдвиг времени вперёд."""
+        if seconds < 0:
+            raise ValueError(f'Время не идёт назад: {seconds}')
+        self.now += seconds
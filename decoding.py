@@ -0,0 +1,182 @@
+import codecs
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+STREAM_CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r'
+
+UNEXPECTED_CHAR = 'Ожидался символ {expected!r}'
+UNEXPECTED_END = 'Неожиданный конец ответа'
+
+_decoder = json.JSONDecoder()
+_STREAMED = object()
+
+
+def loads(data):
+    """Разбор JSON быстрым декодером, если он установлен."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def decode_response(response, max_homeworks=0, keep=()):
+    """Разбор тела ответа API.
+
+    При max_homeworks > 0 ответ разбирается потоково: первые
+    max_homeworks работ попадают в результат целиком, от остальных
+    остаются только ключи из keep.
+    """
+    if max_homeworks > 0:
+        return parse_answer(
+            response.iter_content(STREAM_CHUNK_SIZE),
+            max_homeworks=max_homeworks,
+            keep=keep
+        )
+    content = getattr(response, 'content', None)
+    if orjson is not None and isinstance(content, bytes):
+        return loads(content)
+    return response.json()
+
+
+def parse_answer(chunks, max_homeworks=None, keep=()):
+    """Потоковый разбор ответа без построения полного списка работ.
+
+    Работы после первых max_homeworks сокращаются до ключей из keep,
+    а при пустом keep отбрасываются. Ответ, который не является
+    JSON-объектом, возвращается как есть, чтобы его отклонила
+    та же проверка, что и при полном разборе.
+    """
+    reader = _Reader(chunks)
+    if reader.peek() != '{':
+        return reader.value()
+    answer = {}
+    homeworks = []
+    for homework in _iter_object(reader, answer):
+        if max_homeworks is None or len(homeworks) < max_homeworks:
+            homeworks.append(homework)
+        elif keep:
+            homeworks.append(_reduce(homework, keep))
+    if answer.get('homeworks') is _STREAMED:
+        answer['homeworks'] = homeworks
+    return answer
+
+
+def iter_homeworks(chunks, fields):
+    """Работы из ответа по одной.
+
+    Остальные ключи верхнего уровня (current_date, code, error)
+    записываются в словарь fields по мере чтения.
+    """
+    return _iter_object(_Reader(chunks), fields)
+
+
+def _reduce(homework, keep):
+    if not isinstance(homework, dict):
+        return homework
+    return {key: homework[key] for key in keep if key in homework}
+
+
+def _iter_object(reader, fields):
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.advance()
+        return
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if key == 'homeworks' and reader.peek() == '[':
+            fields[key] = _STREAMED
+            yield from reader.array()
+        else:
+            fields[key] = reader.value()
+        if reader.peek() == '}':
+            reader.advance()
+            return
+        reader.expect(',')
+
+
+class _Reader:
+    """Буфер над последовательностью фрагментов ответа."""
+
+    def __init__(self, chunks):
+        """Чтение из итератора байтовых или строковых фрагментов."""
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self._decoder.decode(b'', final=True)
+        elif isinstance(chunk, bytes):
+            text = self._decoder.decode(chunk)
+        else:
+            text = chunk
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Следующий значащий символ или пустая строка в конце."""
+        while True:
+            while (
+                self.pos < len(self.buffer)
+                and self.buffer[self.pos] in WHITESPACE
+            ):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def advance(self):
+        """Пропуск текущего символа."""
+        self.pos += 1
+
+    def expect(self, expected):
+        """Пропуск ожидаемого символа."""
+        if self.peek() != expected:
+            raise self.error(UNEXPECTED_CHAR.format(expected=expected))
+        self.advance()
+
+    def value(self):
+        """Очередное JSON-значение целиком."""
+        if not self.peek():
+            raise self.error(UNEXPECTED_END)
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            if end < len(self.buffer) or self.eof:
+                self.pos = end
+                return value
+            self._fill()
+
+    def array(self):
+        """Элементы JSON-массива по одному."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.advance()
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ']':
+                self.advance()
+                return
+            self.expect(',')
+
+    def error(self, message):
+        """Ошибка разбора в текущей позиции."""
+        return json.JSONDecodeError(message, self.buffer, self.pos)
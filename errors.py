@@ -0,0 +1,76 @@
+"""Текст ошибок и сообщений для журнала и Telegram.
+
+Параметры запросов и ответы API попадают в текст только после скрытия
+секретов и обрезки длинных значений. Текст собирается лениво: LazyText
+хранит шаблон и поля и форматирует их при первом str() — когда ошибку
+пишут в журнал или отправляют; отброшенная запись DEBUG не стоит ничего.
+"""
+SECRET_KEYS = frozenset({
+    'authorization', 'token', 'practicum_token', 'telegram_token'
+})
+SECRET_SCHEMES = ('OAuth ', 'Bearer ')
+MASK = '***'
+MAX_FIELD_LENGTH = 500
+TELEGRAM_MESSAGE_LIMIT = 4096
+TRUNCATED = '… [+{count}]'
+
+
+def redact(value):
+    """Копия value, где значения секретных ключей скрыты."""
+    if isinstance(value, dict):
+        return {
+            key: _mask(item) if str(key).lower() in SECRET_KEYS
+            else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return type(value)(redact(item) for item in value)
+    return value
+
+
+def _mask(value):
+    if isinstance(value, str):
+        for scheme in SECRET_SCHEMES:
+            if value.startswith(scheme):
+                return scheme + MASK
+    return MASK
+
+
+def truncate(text, limit=MAX_FIELD_LENGTH):
+    """Текст не длиннее limit символов с пометкой об обрезке."""
+    if len(text) <= limit:
+        return text
+    cut = limit - len(TRUNCATED.format(count=len(text)))
+    if cut <= 0:
+        return text[:limit]
+    return text[:cut] + TRUNCATED.format(count=len(text) - cut)
+
+
+class LazyText:
+    """Текст по шаблону, который собирается при первом str().
+
+    Поля скрывают секреты и обрезаются до MAX_FIELD_LENGTH; после
+    форматирования ссылки на поля отпускаются.
+    """
+
+    __slots__ = ('template', 'fields', '_text')
+
+    def __init__(self, template, **fields):
+        """Текст template.format(**fields) без форматирования сейчас."""
+        self.template = template
+        self.fields = fields
+        self._text = None
+
+    def __str__(self):
+        """Отформатированный текст."""
+        if self._text is None:
+            self._text = self.template.format(**{
+                name: truncate(str(redact(value)))
+                for name, value in self.fields.items()
+            })
+            self.fields = None
+        return self._text
+
+    def __repr__(self):
+        """Текст в кавычках, как у строки."""
+        return repr(str(self))
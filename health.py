@@ -0,0 +1,154 @@
+import json
+import logging
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CYCLE_STUCK = 'Шаг цикла опроса выполняется {seconds:.0f} с, прерываем цикл'
+HEALTH_SERVER_STARTED = 'Проверка состояния доступна на {host}:{port}'
+HEALTH_PATH = '/health'
+
+
+class Watchdog(threading.Thread):
+    """Сторож основного цикла.
+
+    Считает задержку цикла относительно расписания и время с последнего
+    успешного опроса; если шаг цикла дольше deadline, вызывает on_stuck.
+    Шаг — опрос одного подписчика или отправка пачки сообщений, поэтому
+    цикл по длинному списку подписчиков не прерывается целиком.
+    """
+
+    def __init__(self, period, deadline=0, on_stuck=None,
+                 clock=time.monotonic, check_interval=1.0):
+        """Сторож цикла с периодом period секунд."""
+        super().__init__(name='watchdog', daemon=True)
+        self.period = period
+        self.deadline = deadline
+        self.on_stuck = on_stuck
+        self.clock = clock
+        self.check_interval = check_interval
+        self.started_at = clock()
+        self.cycle_started_at = None
+        self.step_started_at = None
+        self.last_cycle_finished_at = None
+        self.last_success_at = None
+        self.stuck_cycles = 0
+        self._aborted = False
+        self._stopped = threading.Event()
+
+    def cycle_started(self):
+        """Отметка начала цикла опроса."""
+        self._aborted = False
+        self.cycle_started_at = self.step_started_at = self.clock()
+
+    def step_started(self):
+        """Отметка начала шага цикла: deadline отсчитывается заново."""
+        if self.cycle_started_at is not None:
+            self._aborted = False
+            self.step_started_at = self.clock()
+
+    def cycle_finished(self, success):
+        """Отметка конца цикла; success — опрос API прошёл успешно."""
+        now = self.clock()
+        self.cycle_started_at = self.step_started_at = None
+        self.last_cycle_finished_at = now
+        if success:
+            self.last_success_at = now
+
+    @property
+    def cycle_running(self):
+        """Цикл опроса выполняется прямо сейчас."""
+        return self.cycle_started_at is not None
+
+    def loop_lag(self):
+        """Отставание цикла от расписания в секундах."""
+        now = self.clock()
+        started_at = self.cycle_started_at
+        if started_at is not None:
+            return now - started_at
+        if self.last_cycle_finished_at is None:
+            return now - self.started_at
+        return max(0.0, now - self.last_cycle_finished_at - self.period)
+
+    def since_last_success(self):
+        """Секунды с последнего успешного опроса или None."""
+        if self.last_success_at is None:
+            return None
+        return self.clock() - self.last_success_at
+
+    def healthy(self):
+        """Цикл идёт по расписанию."""
+        return self.loop_lag() <= (self.deadline or self.period)
+
+    def status(self):
+        """Состояние для проверки здоровья."""
+        return dict(
+            healthy=self.healthy(),
+            loop_lag=self.loop_lag(),
+            since_last_success=self.since_last_success(),
+            cycle_running=self.cycle_running,
+            stuck_cycles=self.stuck_cycles
+        )
+
+    def check(self):
+        """Прерывание цикла, шаг которого превысил deadline."""
+        started_at = self.step_started_at
+        if not self.deadline or started_at is None or self._aborted:
+            return
+        running_for = self.clock() - started_at
+        if running_for <= self.deadline:
+            return
+        self._aborted = True
+        self.stuck_cycles += 1
+        logging.error(CYCLE_STUCK.format(seconds=running_for))
+        if self.on_stuck is not None:
+            self.on_stuck()
+
+    def run(self):
+        """Периодическая проверка цикла."""
+        while not self._stopped.wait(self.check_interval):
+            self.check()
+
+    def stop(self):
+        """Остановка сторожа."""
+        self._stopped.set()
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    """Ответ на GET /health состоянием сторожа."""
+
+    watchdog = None
+
+    def do_GET(self):
+        """Состояние в JSON: 200, если цикл здоров, иначе 503."""
+        if self.path != HEALTH_PATH:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        status = self.watchdog.status()
+        body = json.dumps(status).encode()
+        self.send_response(
+            HTTPStatus.OK if status['healthy']
+            else HTTPStatus.SERVICE_UNAVAILABLE
+        )
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Запросы проверки пишутся в журнал на уровне DEBUG."""
+        logging.debug(format, *args)
+
+
+def serve_health(watchdog, port, host='127.0.0.1'):
+    """Запуск HTTP-сервера проверки состояния в фоновом потоке."""
+    handler = type('Handler', (HealthHandler,), dict(watchdog=watchdog))
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(
+        target=server.serve_forever, name='health', daemon=True
+    ).start()
+    logging.info(HEALTH_SERVER_STARTED.format(
+        host=host, port=server.server_address[1]
+    ))
+    return server
@@ -0,0 +1,322 @@
+"""Журнал смен статусов проверки домашних работ.
+
+Журнал только дописывается и состоит из двух файлов в каталоге:
+    names.log        строки "вид<TAB>имя": словарь подписчиков, работ
+                     и статусов; номер строки вида — идентификатор;
+    transitions.log  записи фиксированной длины: время, подписчик,
+                     работа, прежний и новый статус.
+
+Подписчик хранится как хэш токена, сам токен на диск не попадает.
+Недописанный хвост файлов обрезает только бот при открытии журнала;
+запросы из командной строки открывают журнал только для чтения
+и пропускают такой хвост, не мешая работающему боту.
+
+Запуск: python history.py DIR latency [--tenant T] [--since D] [--until D]
+"""
+import argparse
+import bisect
+import hashlib
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime, timezone
+from functools import lru_cache
+
+RECORD = struct.Struct('<dIIBB')
+NAMES_FILE = 'names.log'
+TRANSITIONS_FILE = 'transitions.log'
+TENANT, HOMEWORK, STATUS = 't', 'h', 's'
+NO_STATUS = 0
+REVIEWING = 'reviewing'
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+PERCENTILES = (50, 90, 99)
+OBSERVED_FIELDS = ('homework_name', 'status', 'date_updated')
+
+TOO_MANY_STATUSES = 'В журнале не может быть больше 255 статусов'
+LATENCY_ROW = 'p{percentile}: {seconds:.0f} с ({hours:.1f} ч)'
+NO_REVIEWS = 'Нет завершённых проверок в выбранном интервале'
+SUMMARY = 'Записей: {records}, подписчиков: {tenants}, работ: {homeworks}'
+
+
+@lru_cache(maxsize=65536)
+def tenant_key(token):
+    """Идентификатор подписчика без раскрытия токена."""
+    return hashlib.sha256(str(token).encode()).hexdigest()[:16]
+
+
+def parse_date(value):
+    """Время из date_updated API или None."""
+    try:
+        return datetime.strptime(value, DATE_FORMAT).replace(
+            tzinfo=timezone.utc
+        ).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class TransitionLog:
+    """Журнал смен статусов с индексами по времени и подписчику."""
+
+    def __init__(self, directory, read_only=False):
+        """Открытие журнала в каталоге directory (создаётся при нужде).
+
+        С read_only файлы не создаются, не обрезаются и не открываются
+        для записи.
+        """
+        if not read_only:
+            os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.read_only = read_only
+        self.names = {TENANT: [], HOMEWORK: [], STATUS: [None]}
+        self.ids = {TENANT: {}, HOMEWORK: {}, STATUS: {None: NO_STATUS}}
+        self.timestamps = array('d')
+        self.tenants = array('I')
+        self.homeworks = array('I')
+        self.old_statuses = array('B')
+        self.new_statuses = array('B')
+        self.last_statuses = {}
+        self._sorted = True
+        self._tenant_index = None
+        self._names_file = None
+        self._records_file = None
+        self._load()
+        if not read_only:
+            self._names_file = open(
+                os.path.join(directory, NAMES_FILE), 'a', encoding='utf-8'
+            )
+            self._records_file = open(
+                os.path.join(directory, TRANSITIONS_FILE), 'ab'
+            )
+
+    def _load(self):
+        # Записи читаются раньше имён: бот дописывает имена до записей,
+        # поэтому имена для всех прочитанных записей уже на диске.
+        data = self._read(TRANSITIONS_FILE)
+        names = self._read(NAMES_FILE)
+        complete_names = names.rfind(b'\n') + 1
+        complete = len(data) - len(data) % RECORD.size
+        if not self.read_only:
+            self._truncate(NAMES_FILE, complete_names, len(names))
+            self._truncate(TRANSITIONS_FILE, complete, len(data))
+        for line in names[:complete_names].decode('utf-8').split('\n')[:-1]:
+            kind, _, name = line.partition('\t')
+            self._register(kind, name)
+        for record in RECORD.iter_unpack(memoryview(data)[:complete]):
+            self._add(*record)
+
+    def _read(self, name):
+        try:
+            with open(os.path.join(self.directory, name), 'rb') as file:
+                return file.read()
+        except FileNotFoundError:
+            return b''
+
+    def _truncate(self, name, complete, size):
+        if complete != size:
+            with open(os.path.join(self.directory, name), 'r+b') as file:
+                file.truncate(complete)
+
+    def _register(self, kind, name):
+        identifier = len(self.names[kind])
+        self.names[kind].append(name)
+        self.ids[kind][name] = identifier
+        return identifier
+
+    def _id(self, kind, name):
+        if isinstance(name, str):
+            name = ' '.join(name.splitlines())
+        identifier = self.ids[kind].get(name)
+        if identifier is not None:
+            return identifier
+        if kind == STATUS and len(self.names[STATUS]) > 255:
+            raise ValueError(TOO_MANY_STATUSES)
+        self._names_file.write(f'{kind}\t{name}\n')
+        return self._register(kind, name)
+
+    def _add(self, timestamp, tenant, homework, old, new):
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            self._sorted = False
+        self._tenant_index = None
+        self.timestamps.append(timestamp)
+        self.tenants.append(tenant)
+        self.homeworks.append(homework)
+        self.old_statuses.append(old)
+        self.new_statuses.append(new)
+        self.last_statuses[tenant, homework] = new
+
+    def last_status(self, token, homework_name):
+        """Последний записанный статус работы подписчика или None."""
+        tenant = self.ids[TENANT].get(tenant_key(token))
+        homework = self.ids[HOMEWORK].get(' '.join(homework_name.splitlines()))
+        if tenant is None or homework is None:
+            return None
+        status = self.last_statuses.get((tenant, homework), NO_STATUS)
+        return self.names[STATUS][status]
+
+    def extend(self, transitions):
+        """Запись пачки смен (token, работа, старый, новый, время)."""
+        chunk = bytearray()
+        for token, homework_name, old, new, timestamp in transitions:
+            record = (
+                timestamp,
+                self._id(TENANT, tenant_key(token)),
+                self._id(HOMEWORK, homework_name),
+                self._id(STATUS, old),
+                self._id(STATUS, new),
+            )
+            chunk += RECORD.pack(*record)
+            self._add(*record)
+        self._names_file.flush()
+        self._records_file.write(chunk)
+        self._records_file.flush()
+
+    def observe(self, token, homeworks, now=None):
+        """Запись смен статусов из списка работ ответа API.
+
+        Возвращает число записанных смен.
+        """
+        now = time.time() if now is None else now
+        transitions = []
+        for homework in homeworks:
+            if not isinstance(homework, dict):
+                continue
+            name = homework.get('homework_name')
+            status = homework.get('status')
+            if name is None or status is None:
+                continue
+            old = self.last_status(token, name)
+            if old == status:
+                continue
+            timestamp = parse_date(homework.get('date_updated')) or now
+            transitions.append((token, name, old, status, timestamp))
+        if transitions:
+            self.extend(transitions)
+        return len(transitions)
+
+    def close(self):
+        """Закрытие файлов журнала."""
+        if self.read_only:
+            return
+        self._names_file.close()
+        self._records_file.close()
+
+    def __len__(self):
+        """Число записей в журнале."""
+        return len(self.timestamps)
+
+    def _time_order(self):
+        if not self._sorted:
+            order = sorted(
+                range(len(self.timestamps)), key=self.timestamps.__getitem__
+            )
+            for column in (
+                'timestamps', 'tenants', 'homeworks',
+                'old_statuses', 'new_statuses'
+            ):
+                values = getattr(self, column)
+                setattr(self, column, array(
+                    values.typecode, (values[index] for index in order)
+                ))
+            self._sorted = True
+
+    def _tenant_positions(self, tenant_id):
+        if self._tenant_index is None:
+            index = {}
+            for position, tenant in enumerate(self.tenants):
+                index.setdefault(tenant, array('L')).append(position)
+            self._tenant_index = index
+        return self._tenant_index.get(tenant_id, array('L'))
+
+    def review_latencies(self, tenant=None, since=None, until=None):
+        """Длительности проверок, завершившихся в [since, until).
+
+        tenant — токен или хэш подписчика из tenant_key.
+        """
+        self._time_order()
+        tenant_id = None
+        if tenant is not None:
+            tenant_id = self.ids[TENANT].get(tenant)
+            if tenant_id is None:
+                tenant_id = self.ids[TENANT].get(tenant_key(tenant))
+            if tenant_id is None:
+                return []
+        reviewing = self.ids[STATUS].get(REVIEWING)
+        end = len(self.timestamps)
+        if until is not None:
+            end = bisect.bisect_left(self.timestamps, until)
+        if tenant_id is None:
+            positions = range(end)
+        else:
+            positions = self._tenant_positions(tenant_id)
+            positions = positions[:bisect.bisect_left(positions, end)]
+        started = {}
+        latencies = []
+        timestamps = self.timestamps
+        tenants = self.tenants
+        homeworks = self.homeworks
+        new_statuses = self.new_statuses
+        for index in positions:
+            key = (tenants[index], homeworks[index])
+            if new_statuses[index] == reviewing:
+                started[key] = timestamps[index]
+                continue
+            start = started.pop(key, None)
+            if start is not None and (
+                since is None or timestamps[index] >= since
+            ):
+                latencies.append(timestamps[index] - start)
+        return latencies
+
+    def summary(self):
+        """Размеры журнала."""
+        return dict(
+            records=len(self),
+            tenants=len(self.names[TENANT]),
+            homeworks=len(self.names[HOMEWORK])
+        )
+
+
+def percentiles(values, points=PERCENTILES):
+    """Перцентили по методу ближайшего ранга."""
+    values = sorted(values)
+    result = {}
+    for point in points:
+        rank = max(0, -(-point * len(values) // 100) - 1)
+        result[point] = values[rank]
+    return result
+
+
+def main(argv=None):
+    """Запросы к журналу из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory')
+    parser.add_argument('command', choices=('latency', 'summary'))
+    parser.add_argument('--tenant')
+    parser.add_argument('--since', type=datetime.fromisoformat)
+    parser.add_argument('--until', type=datetime.fromisoformat)
+    arguments = parser.parse_args(argv)
+    log = TransitionLog(arguments.directory, read_only=True)
+    try:
+        if arguments.command == 'summary':
+            print(SUMMARY.format(**log.summary()))
+            return
+        latencies = log.review_latencies(
+            tenant=arguments.tenant,
+            since=arguments.since and arguments.since.timestamp(),
+            until=arguments.until and arguments.until.timestamp()
+        )
+        if not latencies:
+            print(NO_REVIEWS)
+            return
+        for point, seconds in percentiles(latencies).items():
+            print(LATENCY_ROW.format(
+                percentile=point, seconds=seconds, hours=seconds / 3600
+            ))
+    finally:
+        log.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
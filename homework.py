@@ -1,12 +1,34 @@
+import json
 import logging
+import signal
 import sys
 import os
+import threading
 import time
+from collections import deque
 
 import requests
 import telegram
 from dotenv import load_dotenv
 
+from admin import serve_admin
+from cache import SingleFlightCache
+from clock import SystemClock
+from decoding import decode_response
+from errors import TELEGRAM_MESSAGE_LIMIT, LazyText, truncate
+from health import Watchdog, serve_health
+from history import OBSERVED_FIELDS, TransitionLog, percentiles, tenant_key
+from lifecycle import Interrupted, Lifecycle
+from memory import MemoryMonitor
+from pipeline import ProcessPipeline
+from profiling import CycleProfiler
+from roster import Roster, RosterDiff, RosterError
+from schema import compile_schema, homework_statuses_schema, validate_many
+from state import PollState
+from telegram_async import AsyncBot
+from templates import DEFAULT_LOCALE, Templates
+from tracing import SPAN_KIND_CLIENT, JsonLinesExporter, Tracer
+
 load_dotenv()
 
 
@@ -22,11 +44,44 @@ class ServiceError(Exception):
     pass
 
 
+class StuckCycleError(BaseException):
+    """Цикл опроса прерван сторожем.
+
+    Наследует BaseException, чтобы обработчики ошибок опроса
+    и отправки не перехватывали прерывание и цикл завершался.
+    """
+
+    pass
+
+
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 
-RETRY_PERIOD = 600
+RETRY_PERIOD = int(os.getenv('RETRY_PERIOD', 600))
+API_CACHE_TTL = float(os.getenv('API_CACHE_TTL', 0))
+STREAM_HOMEWORKS = int(os.getenv('STREAM_HOMEWORKS', 0))
+REQUEST_TIMEOUT = float(os.getenv('REQUEST_TIMEOUT', 30))
+WATCHDOG_DEADLINE = float(os.getenv('WATCHDOG_DEADLINE', 0))
+HEALTH_PORT = int(os.getenv('HEALTH_PORT', 0))
+STATE_FILE = os.getenv('STATE_FILE')
+HISTORY_DIR = os.getenv('HISTORY_DIR')
+TRACE_FILE = os.getenv('TRACE_FILE')
+TRACE_SAMPLE_RATIO = float(os.getenv('TRACE_SAMPLE_RATIO', 1))
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+PROFILE_CYCLES = int(os.getenv('PROFILE_CYCLES', 1))
+ROSTER_FILE = os.getenv('ROSTER_FILE')
+TELEGRAM_ASYNC = int(os.getenv('TELEGRAM_ASYNC', 0))
+TELEGRAM_POOL_SIZE = int(os.getenv('TELEGRAM_POOL_SIZE', 16))
+TELEGRAM_RATE_LIMIT = float(os.getenv('TELEGRAM_RATE_LIMIT', 30))
+ADMIN_SOCKET = os.getenv('ADMIN_SOCKET')
+PIPELINE = int(os.getenv('PIPELINE', 0))
+PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', 0))
+MEMORY_SNAPSHOT_INTERVAL = float(os.getenv('MEMORY_SNAPSHOT_INTERVAL', 0))
+MEMORY_SNAPSHOT_DIR = os.getenv('MEMORY_SNAPSHOT_DIR')
+ADMIN_TENANTS = 100
+LATENCY_WINDOW = 100
+MAX_FETCH_WINDOW = int(os.getenv('MAX_FETCH_WINDOW', 30 * 24 * 60 * 60))
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
@@ -36,11 +91,29 @@ HOMEWORK_VERDICTS = {
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
 
+SYSTEM_CLOCK = SystemClock()
+API_CACHE = SingleFlightCache(ttl=API_CACHE_TTL)
+TRACER = Tracer(
+    exporter=JsonLinesExporter.open(TRACE_FILE) if TRACE_FILE else None,
+    sample_ratio=TRACE_SAMPLE_RATIO
+)
+RESPONSE_VALIDATOR = compile_schema(
+    homework_statuses_schema(HOMEWORK_VERDICTS)
+)
+
 ENVIRONMENT_VARIABLES = [
     'PRACTICUM_TOKEN',
     'TELEGRAM_TOKEN',
     'TELEGRAM_CHAT_ID'
 ]
+ROSTER_VARIABLES = ['TELEGRAM_TOKEN']
+RELOADABLE = ENVIRONMENT_VARIABLES + [
+    'HEADERS',
+    'RETRY_PERIOD',
+    'HOMEWORK_VERDICTS',
+    'RESPONSE_VALIDATOR',
+    'TEMPLATES'
+]
 
 MISSING_TOKEN = 'Отсутсвует переменная окружения: {tokens}'
 REVIEW_VERDICT = 'Изменился статус проверки работы "{name}". {verdict}'
@@ -64,6 +137,20 @@ SERVICE_ERROR = (
     'отказ от обслуживания с параметрами {parameters} '
     '{key} {value}'
 )
+CACHE_STATS = 'Кэш ответов API: {stats}'
+CYCLE_ABORTED = 'Шаг цикла опроса дольше {deadline} с, цикл прерван'
+VERDICTS_TYPE = 'Файл {path} должен содержать словарь статус: вердикт'
+CONFIG_RELOADED = 'Настройки перечитаны'
+RELOAD_ERROR = 'Ошибка {error} при перечитывании настроек, оставлены прежние'
+RETRY_PERIOD_ERROR = 'RETRY_PERIOD должен быть больше нуля: {period}'
+STOPPED = 'Бот остановлен'
+ROSTER_LOADED = 'Подписчиков: {count}, загрузка {seconds:.3f} с'
+ROSTER_APPLIED = (
+    'Подписчики: добавлено {added}, удалено {removed}, '
+    'сменили язык {changed}'
+)
+
+TEMPLATES = Templates.build(REVIEW_VERDICT, HOMEWORK_VERDICTS)
 
 
 def check_tokens():
@@ -71,7 +158,7 @@ def check_tokens():
     missing_variables = [
         name
         for name
-        in ENVIRONMENT_VARIABLES
+        in (ROSTER_VARIABLES if ROSTER_FILE else ENVIRONMENT_VARIABLES)
         if globals()[name] is None
     ]
     if missing_variables:
@@ -82,12 +169,21 @@ def check_tokens():
 
 def send_message(bot, message):
     """Отправка сообщения."""
+    return send_chat_message(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_chat_message(bot, chat_id, message):
+    """Отправка сообщения в чат chat_id."""
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
-        logging.debug(MESSAGE_SEND.format(message=message))
+        with TRACER.span('telegram.send_message', kind=SPAN_KIND_CLIENT):
+            bot.send_message(
+                chat_id, truncate(message, TELEGRAM_MESSAGE_LIMIT)
+            )
+        logging.debug(LazyText(MESSAGE_SEND, message=message))
         return True
     except Exception as error:
-        logging.error(MESSAGE_ERROR.format(
+        logging.error(LazyText(
+            MESSAGE_ERROR,
             error=error,
             message=message
         ))
@@ -96,36 +192,90 @@ def send_message(bot, message):
 
 def get_api_answer(timestamp):
     """Запрос к API."""
+    return request_api_answer(HEADERS, timestamp)
+
+
+def request_api_answer(headers, timestamp):
+    """Запрос к API с заголовками подписчика."""
+    response, parameters = _fetch(headers, timestamp, STREAM_HOMEWORKS)
+    with TRACER.span('practicum.decode'):
+        response = decode_response(
+            response, STREAM_HOMEWORKS, OBSERVED_FIELDS
+        )
+    for key in ['code', 'error']:
+        if key in response:
+            raise ServiceError(
+                LazyText(
+                    SERVICE_ERROR,
+                    parameters=parameters,
+                    key=key,
+                    value=response[key]
+                )
+            )
+    return response
+
+
+def request_api_body(headers, timestamp):
+    """Тело ответа API без разбора, для конвейера."""
+    return _fetch(headers, timestamp)[0].content
+
+
+def _fetch(headers, timestamp, stream=False):
     parameters = dict(
         url=ENDPOINT,
-        headers=HEADERS,
-        params={'from_date': timestamp}
+        headers=headers,
+        params={'from_date': timestamp},
+        timeout=REQUEST_TIMEOUT
     )
+    if stream:
+        parameters['stream'] = True
     try:
-        response = requests.get(**parameters)
+        with TRACER.span(
+            'practicum.request', kind=SPAN_KIND_CLIENT, from_date=timestamp
+        ) as span:
+            response = requests.get(**parameters)
+            span.set_attribute('http.status_code', response.status_code)
     except requests.exceptions.RequestException as error:
-        raise ConnectionError(ENDPOINT_ERROR.format(
+        raise ConnectionError(LazyText(
+            ENDPOINT_ERROR,
             error=error,
             parameters=parameters
         ))
     if response.status_code != 200:
-        raise EndpointError(CONNECTION_ERROR.format(
+        raise EndpointError(LazyText(
+            CONNECTION_ERROR,
             status_code=response.status_code,
             parameters=parameters
         ))
-    response = response.json()
-    for key in ['code', 'error']:
-        if key in response:
-            raise ServiceError(
-                SERVICE_ERROR.format(
-                    parameters=parameters,
-                    key=key,
-                    value=response[key]
-                )
-            )
+    return response, parameters
+
+
+def get_cached_api_answer(timestamp, token=None):
+    """Запрос к API, общий для подписчиков с одним токеном.
+
+    Без token запрос идёт с токеном из окружения.
+    """
+    if token is None:
+        response = API_CACHE.get(
+            (PRACTICUM_TOKEN, timestamp),
+            lambda: get_api_answer(timestamp)
+        )
+    else:
+        response = API_CACHE.get((token, timestamp), lambda: (
+            request_api_answer({'Authorization': f'OAuth {token}'}, timestamp)
+        ))
+    if API_CACHE.ttl > 0:
+        logging.debug(CACHE_STATS.format(stats=API_CACHE.stats()))
     return response
 
 
+def get_cached_api_body(timestamp, token):
+    """Тело ответа API, общее для подписчиков с одним токеном."""
+    return API_CACHE.get(('body', token, timestamp), lambda: (
+        request_api_body({'Authorization': f'OAuth {token}'}, timestamp)
+    ))
+
+
 def check_response(response):
     """Проверка ответа API."""
     if not isinstance(response, dict):
@@ -138,41 +288,707 @@ def check_response(response):
     return homeworks
 
 
+def check_responses(responses):
+    """Проверка пачки ответов API за один проход.
+
+    Возвращает все найденные дефекты: номер ответа -> список дефектов.
+    """
+    return validate_many(RESPONSE_VALIDATOR, responses)
+
+
 def parse_status(homework):
     """Выводл информации о ревью."""
+    return render_status(homework, DEFAULT_LOCALE)
+
+
+def render_status(homework, locale):
+    """Сообщение о статусе работы на языке locale."""
     if 'homework_name' not in homework:
         raise KeyError(KEY_MISSING)
     status = homework['status']
     if status in HOMEWORK_VERDICTS:
-        return REVIEW_VERDICT.format(
-            name=homework['homework_name'],
-            verdict=HOMEWORK_VERDICTS[status]
-        )
+        return TEMPLATES.render(locale, homework['homework_name'], status)
     raise ValueError(REVIEW_STATUS.format(status=status))
 
 
-def main():
-    """Основная логика работы бота."""
-    check_tokens()
-    bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    timestamp = 0
-    last_message = ''
-    while True:
-        try:
-            response = get_api_answer(timestamp)
+def update_verdicts():
+    """Вердикты ревью и шаблоны уведомлений.
+
+    Вердикты берутся из файла HOMEWORK_VERDICTS_FILE, если он задан,
+    дополнительные языки — из MESSAGES_FILE.
+    """
+    global HOMEWORK_VERDICTS, RESPONSE_VALIDATOR, TEMPLATES
+    path = os.getenv('HOMEWORK_VERDICTS_FILE')
+    if path:
+        with open(path, encoding='utf-8') as file:
+            verdicts = json.load(file)
+        if not isinstance(verdicts, dict) or not all(
+            isinstance(key, str) and isinstance(value, str)
+            for key, value in verdicts.items()
+        ):
+            raise ValueError(VERDICTS_TYPE.format(path=path))
+        HOMEWORK_VERDICTS = verdicts
+        RESPONSE_VALIDATOR = compile_schema(
+            homework_statuses_schema(HOMEWORK_VERDICTS)
+        )
+    TEMPLATES = Templates.build(
+        REVIEW_VERDICT, HOMEWORK_VERDICTS, os.getenv('MESSAGES_FILE')
+    )
+
+
+def reload_config():
+    """Перечитывание настроек из окружения и .env без перезапуска.
+
+    Возвращает бота с новым токеном. При ошибке в новых настройках
+    остаются прежние, включая окружение, и возвращается None.
+    """
+    global PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID
+    global HEADERS, RETRY_PERIOD
+    previous = {name: globals()[name] for name in RELOADABLE}
+    environment = dict(os.environ)
+    try:
+        load_dotenv(override=True)
+        PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
+        TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
+        TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+        HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+        RETRY_PERIOD = int(os.getenv('RETRY_PERIOD', RETRY_PERIOD))
+        if RETRY_PERIOD <= 0:
+            raise ValueError(RETRY_PERIOD_ERROR.format(period=RETRY_PERIOD))
+        check_tokens()
+        update_verdicts()
+        bot = create_bot()
+    except (OSError, ValueError, telegram.error.TelegramError) as error:
+        globals().update(previous)
+        restore_environ(environment)
+        logging.error(RELOAD_ERROR.format(error=error))
+        return None
+    API_CACHE.clear()
+    logging.info(CONFIG_RELOADED)
+    return bot
+
+
+def restore_environ(environment):
+    """Возврат os.environ к сохранённому словарю environment."""
+    for name in set(os.environ) - set(environment):
+        del os.environ[name]
+    for name, value in environment.items():
+        if os.environ.get(name) != value:
+            os.environ[name] = value
+
+
+def start_watchdog():
+    """Запуск сторожа основного цикла и проверки состояния."""
+    main_thread = threading.main_thread()
+    watchdog = Watchdog(
+        period=RETRY_PERIOD,
+        deadline=WATCHDOG_DEADLINE,
+        on_stuck=lambda: signal.pthread_kill(
+            main_thread.ident, signal.SIGUSR1
+        )
+    )
+
+    def abort_stuck_cycle(signum, frame):
+        if watchdog.cycle_running:
+            raise StuckCycleError(
+                CYCLE_ABORTED.format(deadline=WATCHDOG_DEADLINE)
+            )
+
+    if WATCHDOG_DEADLINE:
+        signal.signal(signal.SIGUSR1, abort_stuck_cycle)
+    if WATCHDOG_DEADLINE or HEALTH_PORT:
+        watchdog.start()
+    if HEALTH_PORT:
+        serve_health(watchdog, HEALTH_PORT)
+    return watchdog
+
+
+def poll(bot, state, history=None, clock=SYSTEM_CLOCK, tenant=None,
+         deliver=True, now=None, from_date=None):
+    """Один цикл опроса API и отправки сообщения.
+
+    Смены статусов записываются в журнал history, если он задан,
+    с временем по часам clock. Без tenant используются токен и чат
+    из окружения. При deliver=False новое сообщение только остаётся
+    в state.pending для отправки пачкой. now и from_date — время цикла
+    и начало окна запроса, общие для подписчиков; по умолчанию они
+    берутся по часам clock и водяному знаку state.
+    Возвращает True, если ответ API получен и прошёл проверку.
+    """
+    started = clock.monotonic()
+    now = clock.time() if now is None else now
+    if from_date is None:
+        from_date = state.from_date(now, MAX_FETCH_WINDOW)
+    try:
+        with TRACER.span('poll', from_date=from_date):
+            return _poll(
+                bot, state, history, tenant, deliver, now, from_date
+            )
+    finally:
+        state.latency = clock.monotonic() - started
+
+
+def _notify(bot, tenant, message):
+    if tenant is None:
+        return send_message(bot, message)
+    return send_chat_message(bot, tenant.chat_id, message)
+
+
+def _poll(bot, state, history, tenant, deliver, now, from_date):
+    success = False
+    token = None if tenant is None else tenant.token
+    try:
+        response = get_cached_api_answer(from_date, token)
+        with TRACER.span('check_response') as span:
             homeworks = check_response(response)
-            if homeworks:
-                message = parse_status(homeworks[0])
-                if message != last_message and send_message(bot, message):
-                    last_message = message
-                    timestamp = response.get('current_date', timestamp)
+            if span.recording:
+                span.set_attribute('homeworks', len(homeworks))
+        success = True
+        if history is not None:
+            history.observe(token or PRACTICUM_TOKEN, homeworks, now)
+        if homeworks:
+            with TRACER.span('parse_status'):
+                if tenant is None:
+                    message = parse_status(homeworks[0])
+                else:
+                    message = render_status(homeworks[0], tenant.locale)
+            state.pending = '' if message == state.last_message else message
+        state.advance(response.get('current_date'))
+        _deliver(bot, state, tenant, deliver)
+    except Exception as error:
+        _report_error(bot, state, tenant, error, deliver)
+    return success
+
+
+def _deliver(bot, state, tenant, deliver):
+    if deliver and state.pending and _notify(bot, tenant, state.pending):
+        state.last_message = state.pending
+        state.pending = ''
+    state.save()
+
+
+def _report_error(bot, state, tenant, error, deliver=True):
+    message = PROGRAM_CRASH.format(error=error)
+    logging.error(message)
+    state.last_error = message
+    if message == state.last_message:
+        return
+    if not deliver:
+        state.pending_error = message
+    elif _notify(bot, tenant, message):
+        state.last_message = message
+
+
+def _latency_summary(latencies):
+    if not latencies:
+        return {}
+    summary = {
+        f'p{point}': value for point, value in percentiles(latencies).items()
+    }
+    summary['last'] = latencies[-1]
+    return summary
+
+
+def _tenant_snapshot(tenant, state):
+    if tenant is None:
+        token, chat_id, locale = PRACTICUM_TOKEN, TELEGRAM_CHAT_ID, None
+    else:
+        token, chat_id, locale = tenant
+    return dict(
+        tenant=tenant_key(token),
+        chat_id=chat_id,
+        locale=locale or DEFAULT_LOCALE,
+        latency=state.latency,
+        last_error=state.last_error,
+        **state.to_dict()
+    )
+
+
+def create_bot():
+    """Бот Telegram: асинхронный клиент при TELEGRAM_ASYNC."""
+    if TELEGRAM_ASYNC:
+        return AsyncBot(
+            TELEGRAM_TOKEN, pool_size=TELEGRAM_POOL_SIZE,
+            rate=TELEGRAM_RATE_LIMIT
+        )
+    return telegram.Bot(token=TELEGRAM_TOKEN)
+
+
+def load_roster():
+    """Список подписчиков из ROSTER_FILE или None.
+
+    Ошибки в списке при запуске останавливают бота.
+    """
+    if not ROSTER_FILE:
+        return None
+    started = time.perf_counter()
+    try:
+        roster = Roster.load(ROSTER_FILE)
+    except RosterError as error:
+        logging.critical(error)
+        raise
+    logging.info(ROSTER_LOADED.format(
+        count=len(roster), seconds=time.perf_counter() - started
+    ))
+    return roster
+
+
+class PollLoop:
+    """Цикл опроса, не привязанный к источнику времени.
+
+    В работе время идёт по SystemClock, в тестах и бенчмарках —
+    по VirtualClock, где тысячи циклов проходят за секунду.
+    Цикл выполняется под lock; список подписчиков и задержки циклов
+    меняются под коротким states_lock, чтобы команды администратора
+    читали их, не дожидаясь конца цикла.
+    """
+
+    def __init__(self, bot, clock=SYSTEM_CLOCK, state=None, history=None,
+                 watchdog=None, profiler=None, lifecycle=None, roster=None,
+                 memory=None, pipeline=False):
+        """Цикл для бота bot с часами clock.
+
+        С roster опрашиваются подписчики из списка, каждый со своим
+        состоянием; иначе — токен и чат из окружения с состоянием state.
+        С pipeline ответы подписчиков разбираются в ProcessPipeline.
+        Монитор памяти memory проверяется после каждого цикла.
+        """
+        self.bot = bot
+        self.clock = clock
+        self.state = state if state is not None else PollState()
+        self.history = history
+        self.watchdog = watchdog or Watchdog(
+            period=RETRY_PERIOD, clock=clock.monotonic
+        )
+        self.profiler = profiler or CycleProfiler(
+            PROFILE_DIR, cycles=PROFILE_CYCLES, clock=clock.time
+        )
+        self.lifecycle = lifecycle or Lifecycle()
+        self.roster = roster
+        self.memory = memory
+        self.use_pipeline = pipeline
+        self._pipeline = None
+        self._pipeline_source = None
+        self.states = {}
+        self.tenants = {}
+        self.states_lock = threading.Lock()
+        if roster is not None:
+            self.apply_roster(RosterDiff(added=roster.tenants, removed=()))
+        self.cycles = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.next_poll_at = None
+        self.lock = threading.RLock()
+
+    def apply_roster(self, diff):
+        """Состояния для добавленных подписчиков, удаление выбывших.
+
+        Состояния хранятся по (токен, chat_id): у подписчика, сменившего
+        только язык, обновляется язык, а состояние остаётся прежним.
+        Состояния остальных подписчиков не меняются.
+        """
+        added = {tenant.key: tenant for tenant in diff.added}
+        changed = 0
+        with self.states_lock:
+            for tenant in diff.removed:
+                if tenant.key in added:
+                    changed += 1
+                    continue
+                self.states.pop(tenant.key, None)
+                self.tenants.pop(tenant.key, None)
+            for key, tenant in added.items():
+                self.tenants[key] = tenant
+                self.states.setdefault(key, PollState())
+        logging.info(ROSTER_APPLIED.format(
+            added=len(added) - changed,
+            removed=len(diff.removed) - changed,
+            changed=changed
+        ))
+
+    def refresh_roster(self):
+        """Применение изменений списка подписчиков, если они есть."""
+        if self.roster is None or not self.roster.changed():
+            return
+        try:
+            self.apply_roster(self.roster.refresh())
+        except RosterError as error:
+            logging.error(error)
+
+    def poll_all(self):
+        """Опрос всех подписчиков или токена из окружения."""
+        if self.roster is None:
+            return poll(self.bot, self.state, self.history, self.clock)
+        batched = isinstance(self.bot, AsyncBot)
+        now = self.clock.time()
+        from_dates = self.from_dates(now)
+        with API_CACHE.sharing():
+            if self.use_pipeline:
+                success = self.poll_pipeline(now, from_dates, not batched)
+            else:
+                results = []
+                for tenant, state in self.tenant_states():
+                    self.watchdog.step_started()
+                    results.append(poll(
+                        self.bot, state, self.history, self.clock, tenant,
+                        not batched, now, from_dates[tenant.token]
+                    ))
+                success = not results or any(results)
+        if batched:
+            self.watchdog.step_started()
+            self.deliver_pending()
+        return success
+
+    def from_dates(self, now):
+        """Начало окна запроса для каждого токена на время now.
+
+        Подписчики с одним токеном запрашивают API с самого раннего
+        из своих водяных знаков: в цикле ответ для токена запрашивается
+        один раз, а после него водяные знаки подписчиков совпадают.
+        Повтор уже отправленного статуса отсекается сравнением
+        с последним сообщением.
+        """
+        from_dates = {}
+        for tenant, state in self.tenant_states():
+            from_date = state.from_date(now, MAX_FETCH_WINDOW)
+            from_dates[tenant.token] = min(
+                from_date, from_dates.get(tenant.token, from_date)
+            )
+        return from_dates
+
+    def pipeline(self):
+        """Конвейер для текущих шаблонов и вердиктов.
+
+        После перечитывания настроек конвейер создаётся заново.
+        """
+        source = (TEMPLATES, HOMEWORK_VERDICTS)
+        if self._pipeline is None or any(
+            new is not old for new, old in zip(source, self._pipeline_source)
+        ):
+            self.close_pipeline()
+            self._pipeline = ProcessPipeline(
+                TEMPLATES, HOMEWORK_VERDICTS, workers=PIPELINE_WORKERS,
+                keep_homeworks=self.history is not None
+            )
+            self._pipeline_source = source
+        return self._pipeline
+
+    def poll_pipeline(self, now, from_dates, deliver=True):
+        """Опрос подписчиков через конвейер.
+
+        Тела ответов запрашиваются в этом процессе с началом окна
+        from_dates[токен], разбор, проверка и сравнение с последним
+        сообщением идут в пуле процессов.
+        """
+        fetched = []
+        for tenant, state in self.tenant_states():
+            self.watchdog.step_started()
+            started = self.clock.monotonic()
+            try:
+                body = get_cached_api_body(
+                    from_dates[tenant.token], tenant.token
+                )
+            except Exception as error:
+                _report_error(self.bot, state, tenant, error, deliver)
+                continue
+            finally:
+                state.latency = self.clock.monotonic() - started
+            fetched.append((tenant, state, body))
+        self.watchdog.step_started()
+        with TRACER.span('pipeline.process', tenants=len(fetched)):
+            results = self.pipeline().process([
+                (index, body, tenant.locale, state.last_message)
+                for index, (tenant, state, body) in enumerate(fetched)
+            ])
+        successes = [
+            self.apply_result(tenant, state, result, now, deliver)
+            for (tenant, state, _), result in zip(fetched, results)
+        ]
+        return not self.states or any(successes)
+
+    def apply_result(self, tenant, state, result, now, deliver=True):
+        """Результат конвейера в состоянии подписчика, как в poll()."""
+        if result.defects:
+            _report_error(
+                self.bot, state, tenant, '; '.join(result.defects), deliver
+            )
+            return False
+        try:
+            if self.history is not None:
+                self.history.observe(tenant.token, result.homeworks, now)
+            if result.error is not None:
+                _report_error(self.bot, state, tenant, result.error, deliver)
+                return True
+            if result.message is not None:
+                state.pending = result.message
+            state.advance(result.current_date)
+            _deliver(self.bot, state, tenant, deliver)
         except Exception as error:
-            message = PROGRAM_CRASH.format(error=error)
-            logging.error(message)
-            if message != last_message and send_message(bot, message):
-                last_message = message
+            _report_error(self.bot, state, tenant, error, deliver)
+        return True
+
+    def deliver_pending(self):
+        """Одновременная отправка ожидающих сообщений во все чаты.
+
+        Сообщения об ошибках уходят той же пачкой после уведомлений
+        и, как при отправке по одному, не повторяются при сбое.
+        """
+        tenants = self.tenant_states()
+        waiting = [
+            (tenant, state, 'pending') for tenant, state in tenants
+            if state.pending
+        ] + [
+            (tenant, state, 'pending_error') for tenant, state in tenants
+            if state.pending_error
+        ]
+        if not waiting:
+            return
+        try:
+            with TRACER.span('telegram.send_many', kind=SPAN_KIND_CLIENT,
+                             messages=len(waiting)):
+                results = self.bot.send_many([
+                    (tenant.chat_id, truncate(getattr(state, field),
+                                              TELEGRAM_MESSAGE_LIMIT))
+                    for tenant, state, field in waiting
+                ])
+        except TimeoutError as error:
+            results = [error] * len(waiting)
+        for (tenant, state, field), result in zip(waiting, results):
+            message = getattr(state, field)
+            if field == 'pending_error':
+                state.pending_error = ''
+            if isinstance(result, Exception):
+                logging.error(LazyText(
+                    MESSAGE_ERROR, error=result, message=message
+                ))
+                continue
+            state.last_message = message
+            if field == 'pending':
+                state.pending = ''
+                state.save()
+
+    def tenant_states(self):
+        """Пары (подписчик, состояние); без списка — (None, state)."""
+        if self.roster is None:
+            return [(None, self.state)]
+        return [
+            (self.tenants[key], state) for key, state in self.states.items()
+        ]
+
+    def flush(self):
+        """Отправка ожидающих сообщений и сохранение состояния.
+
+        Выполняется в основном потоке: из run() по запросу
+        request_flush() или в конце цикла.
+        """
+        self.lifecycle.flush_requested = False
+        if self.roster is not None and isinstance(self.bot, AsyncBot):
+            self.deliver_pending()
+        for tenant, state in self.tenant_states():
+            if state.pending and _notify(self.bot, tenant, state.pending):
+                state.last_message = state.pending
+                state.pending = ''
+            state.save()
+
+    def request_flush(self):
+        """Отправка ожидающих сообщений основным циклом.
+
+        Команда не ждёт сети: спящий цикл просыпается для отправки,
+        идущий цикл отправляет сообщения в конце.
+        """
+        self.lifecycle.flush_from_thread()
+        return dict(
+            requested=True, pending=self.pending_count(),
+            cycle_running=self.watchdog.cycle_running
+        )
+
+    def pending_count(self, tenants=None):
+        """Число сообщений, ожидающих отправки."""
+        if tenants is None:
+            tenants = self.copy_tenant_states()
+        return sum(bool(state.pending) for _, state in tenants)
+
+    def copy_tenant_states(self):
+        """Копия пар (подписчик, состояние) для другого потока."""
+        with self.states_lock:
+            return self.tenant_states()
+
+    def request_poll(self):
+        """Внеочередной опрос, не дожидаясь RETRY_PERIOD."""
+        self.lifecycle.poll_from_thread()
+        return dict(requested=True, cycle_running=self.watchdog.cycle_running)
+
+    def snapshot(self):
+        """Состояние цикла для администратора.
+
+        Подписчики упорядочены по времени последнего опроса, самые
+        медленные первыми; показываются первые ADMIN_TENANTS.
+        """
+        with self.states_lock:
+            tenants = self.tenant_states()
+            latencies = list(self.latencies)
+            cycles = self.cycles
+        tenants.sort(key=lambda item: item[1].latency or 0, reverse=True)
+        return dict(
+            cycles=cycles,
+            next_poll_at=self.next_poll_at,
+            retry_period=RETRY_PERIOD,
+            health=self.watchdog.status(),
+            queues=dict(
+                pending_messages=self.pending_count(tenants),
+                api_cache=API_CACHE.stats()
+            ),
+            cycle_latency=_latency_summary(latencies),
+            tenant_count=len(tenants),
+            tenants=[
+                _tenant_snapshot(tenant, state)
+                for tenant, state in tenants[:ADMIN_TENANTS]
+            ]
+        )
+
+    def admin_commands(self):
+        """Команды сокета администрирования."""
+        commands = dict(
+            state=self.snapshot, poll=self.request_poll,
+            flush=self.request_flush
+        )
+        if self.memory is not None:
+            commands['memory'] = lambda: self.memory.snapshot()._asdict()
+        return commands
+
+    def cycle(self):
+        """Один цикл: перечитывание настроек по запросу и опрос.
+
+        Цикл, прерванный сторожем, завершается сразу и считается
+        неудачным; подписчики после зависшего ждут следующего цикла.
+        """
+        with self.lock:
+            started = self.clock.monotonic()
+            self.watchdog.cycle_started()
+            success = False
+            try:
+                success = self._cycle()
+            except StuckCycleError as error:
+                logging.error(error)
+            finally:
+                self.watchdog.cycle_finished(success)
+            if self.lifecycle.flush_requested:
+                self.flush()
+            with self.states_lock:
+                self.cycles += 1
+                self.latencies.append(self.clock.monotonic() - started)
+            return success
+
+    def _cycle(self):
+        self.lifecycle.poll_requested = False
+        if self.lifecycle.reload_requested:
+            self.lifecycle.reload_requested = False
+            bot = reload_config()
+            if bot is not None:
+                self.close_bot()
+                self.bot = bot
+                self.watchdog.period = RETRY_PERIOD
+        self.refresh_roster()
+        self.profiler.cycle_started()
+        try:
+            success = self.poll_all()
+            if self.memory is not None:
+                self.memory.check()
         finally:
-            time.sleep(RETRY_PERIOD)
+            self.profiler.cycle_finished()
+        return success
+
+    def run(self, wait=None, cycles=None):
+        """Циклы до остановки или до cycles циклов.
+
+        Между циклами вызывается wait; по умолчанию —
+        clock.sleep(RETRY_PERIOD). Сигнал остановки прерывает ожидание.
+        """
+        wait = wait or (lambda: self.clock.sleep(RETRY_PERIOD))
+        done = 0
+        while not self.lifecycle.stopping and (
+            cycles is None or done < cycles
+        ):
+            self.cycle()
+            done += 1
+            self.next_poll_at = self.clock.time() + RETRY_PERIOD
+            self.sleep(wait)
+
+    def sleep(self, wait):
+        """Сон между циклами с отправкой по запросу request_flush().
+
+        После отправки сон продолжается до next_poll_at.
+        """
+        while True:
+            try:
+                with self.lifecycle.sleeping():
+                    wait()
+                return
+            except Interrupted:
+                if not self.lifecycle.flush_only:
+                    return
+            with self.lock:
+                self.flush()
+            wait = (lambda: self.clock.sleep(
+                max(0, self.next_poll_at - self.clock.time())
+            ))
+
+    def close_bot(self):
+        """Закрытие соединений асинхронного клиента Telegram."""
+        if isinstance(self.bot, AsyncBot):
+            self.bot.close()
+
+    def close_pipeline(self):
+        """Остановка пула процессов конвейера."""
+        if self._pipeline is not None:
+            self._pipeline.close()
+            self._pipeline = None
+
+    def close(self):
+        """Сохранение состояния, закрытие журнала, соединений и пула."""
+        self.close_bot()
+        self.close_pipeline()
+        self.state.save()
+        if self.history is not None:
+            self.history.close()
+
+
+def main():
+    """Основная логика работы бота."""
+    check_tokens()
+    if TELEGRAM_ASYNC:
+        bot = create_bot()
+    else:
+        bot = telegram.Bot(token=TELEGRAM_TOKEN)
+    update_verdicts()
+    memory = None
+    if MEMORY_SNAPSHOT_INTERVAL:
+        memory = MemoryMonitor(MEMORY_SNAPSHOT_INTERVAL, MEMORY_SNAPSHOT_DIR)
+        memory.start()
+    loop = PollLoop(
+        bot,
+        memory=memory,
+        pipeline=PIPELINE,
+        roster=load_roster(),
+        state=PollState.load(STATE_FILE),
+        history=TransitionLog(HISTORY_DIR) if HISTORY_DIR else None,
+        watchdog=start_watchdog()
+    )
+    previous_handlers = loop.lifecycle.install(
+        {signal.SIGUSR2: loop.profiler.handle_signal}
+    )
+    admin = (
+        serve_admin(ADMIN_SOCKET, loop.admin_commands())
+        if ADMIN_SOCKET else None
+    )
+    try:
+        loop.run(lambda: time.sleep(RETRY_PERIOD))
+    finally:
+        if admin is not None:
+            admin.close()
+        Lifecycle.restore(previous_handlers)
+        loop.close()
+        if memory is not None:
+            memory.stop()
+    logging.info(STOPPED)
 
 
 if __name__ == '__main__':
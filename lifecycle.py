@@ -0,0 +1,145 @@
+import logging
+import signal
+import threading
+from contextlib import contextmanager
+
+STOP_REQUESTED = 'Получен сигнал {signal}: завершаем текущий цикл и выходим'
+RELOAD_REQUESTED = 'Получен сигнал {signal}: перечитываем настройки'
+POLL_REQUESTED = 'Получен сигнал {signal}: внеочередной опрос'
+FLUSH_REQUESTED = 'Получен сигнал {signal}: отправка ожидающих сообщений'
+
+STOP_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+RELOAD_SIGNALS = (signal.SIGHUP,)
+POLL_SIGNALS = (signal.SIGURG,)
+FLUSH_SIGNALS = (signal.SIGWINCH,)
+
+
+class Interrupted(Exception):
+    """Ожидание следующего цикла прервано сигналом."""
+
+    pass
+
+
+class Lifecycle:
+    """Сигналы остановки и перезагрузки основного цикла.
+
+    Во время цикла сигнал только выставляет флаг, и цикл доходит до конца.
+    Во время сна обработчик бросает Interrupted, поэтому остановка
+    и перезагрузка не ждут RETRY_PERIOD. Запрос отправки ожидающих
+    сообщений прерывает сон, но не начинает внеочередной цикл.
+    """
+
+    def __init__(self):
+        """Ни остановка, ни перезагрузка не запрошены."""
+        self.stopping = False
+        self.reload_requested = False
+        self.poll_requested = False
+        self.flush_requested = False
+        self.installed = False
+        self._sleeping = False
+
+    @property
+    def pending(self):
+        """Запрошена остановка, перезагрузка, опрос или отправка."""
+        return (
+            self.stopping or self.reload_requested or self.poll_requested
+            or self.flush_requested
+        )
+
+    @property
+    def flush_only(self):
+        """Запрошена только отправка ожидающих сообщений."""
+        return self.flush_requested and not (
+            self.stopping or self.reload_requested or self.poll_requested
+        )
+
+    def install(self, handlers=None):
+        """Установка обработчиков; возвращает прежние обработчики.
+
+        handlers — дополнительные обработчики: сигнал -> функция.
+        """
+        previous = {}
+        for signum, handler in (handlers or {}).items():
+            previous[signum] = signal.signal(signum, handler)
+        for signum in STOP_SIGNALS:
+            previous[signum] = signal.signal(signum, self.request_stop)
+        for signum in RELOAD_SIGNALS:
+            previous[signum] = signal.signal(signum, self.request_reload)
+        for signum in POLL_SIGNALS:
+            previous[signum] = signal.signal(signum, self.request_poll)
+        for signum in FLUSH_SIGNALS:
+            previous[signum] = signal.signal(signum, self.request_flush)
+        self.installed = True
+        return previous
+
+    @staticmethod
+    def restore(previous):
+        """Возврат прежних обработчиков сигналов."""
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+    def request_stop(self, signum=None, frame=None):
+        """Запрос плавной остановки."""
+        logging.info(STOP_REQUESTED.format(signal=_signal_name(signum)))
+        self.stopping = True
+        self._wake()
+
+    def request_reload(self, signum=None, frame=None):
+        """Запрос перечитывания настроек."""
+        logging.info(RELOAD_REQUESTED.format(signal=_signal_name(signum)))
+        self.reload_requested = True
+        self._wake()
+
+    def request_poll(self, signum=None, frame=None):
+        """Запрос внеочередного опроса."""
+        logging.info(POLL_REQUESTED.format(signal=_signal_name(signum)))
+        self.poll_requested = True
+        self._wake()
+
+    def request_flush(self, signum=None, frame=None):
+        """Запрос отправки ожидающих сообщений."""
+        logging.info(FLUSH_REQUESTED.format(signal=_signal_name(signum)))
+        self.flush_requested = True
+        self._wake()
+
+    def poll_from_thread(self):
+        """Внеочередной опрос по запросу из другого потока.
+
+        Сигнал отправляется основному потоку, чтобы прервать его сон;
+        без установленных обработчиков выставляется только флаг.
+        """
+        if self.installed:
+            signal.pthread_kill(threading.main_thread().ident, POLL_SIGNALS[0])
+        else:
+            self.poll_requested = True
+
+    def flush_from_thread(self):
+        """Отправка ожидающих сообщений по запросу из другого потока."""
+        if self.installed:
+            signal.pthread_kill(
+                threading.main_thread().ident, FLUSH_SIGNALS[0]
+            )
+        else:
+            self.flush_requested = True
+
+    def _wake(self):
+        if self._sleeping:
+            self._sleeping = False
+            raise Interrupted
+
+    @contextmanager
+    def sleeping(self):
+        """Сон между циклами, прерываемый сигналами."""
+        self._sleeping = True
+        try:
+            if self.pending:
+                raise Interrupted
+            yield
+        finally:
+            self._sleeping = False
+
+
+def _signal_name(signum):
+    if signum is None:
+        return '-'
+    return signal.Signals(signum).name
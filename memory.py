@@ -0,0 +1,153 @@
+"""Снимки tracemalloc для поиска утечек памяти в долгой работе.
+
+Раз в interval секунд монитор снимает статистику tracemalloc и пишет
+в журнал места с наибольшим объёмом выделенной памяти и с наибольшим
+ростом с прошлого снимка. Если задан каталог, снимки сохраняются
+для разбора через tracemalloc.Snapshot.load(). Перед снимком
+выполняется сборка мусора, чтобы циклические ссылки, которые ещё
+не собраны, не выглядели как рост.
+
+Снимок по команде администратора снимается из другого потока, поэтому
+снимки сериализуются блокировкой монитора. Ошибка записи снимка
+в каталог пишется в журнал и не прерывает основной цикл.
+"""
+import gc
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import namedtuple
+
+TOP = 10
+FRAMES = 1
+FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+SNAPSHOT_FILE = 'memory-{number:04d}.tracemalloc'
+
+MemoryReport = namedtuple(
+    'MemoryReport', ('current', 'peak', 'growth', 'top', 'growing')
+)
+Site = namedtuple('Site', ('where', 'size', 'count'))
+
+MEMORY_REPORT = (
+    'Память: {current} Б, пик {peak} Б, '
+    'рост с прошлого снимка {growth:+} Б'
+)
+TOP_SITE = 'Больше всего памяти: {size} Б в {count} блоках, {where}'
+GROWING_SITE = 'Рост: {size:+} Б, {count:+} блоков, {where}'
+MEMORY_ERROR = 'Не удалось сохранить снимок памяти: {error}'
+
+
+def _where(statistic):
+    frame = statistic.traceback[0]
+    return f'{frame.filename}:{frame.lineno}'
+
+
+class MemoryMonitor:
+    """Периодические снимки tracemalloc с отчётом о росте памяти."""
+
+    def __init__(self, interval, directory=None, top=TOP, frames=FRAMES,
+                 clock=time.monotonic):
+        """Монитор со снимками раз в interval секунд по часам clock."""
+        self.interval = interval
+        self.directory = directory
+        self.top = top
+        self.frames = frames
+        self.clock = clock
+        self.snapshots = 0
+        self.last_report = None
+        self._previous = None
+        self._taken_at = None
+        self._started = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Запуск tracemalloc и начальный снимок."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        self._previous = self._take()
+        self._taken_at = self.clock()
+
+    def _take(self):
+        return tracemalloc.take_snapshot().filter_traces(FILTERS)
+
+    def check(self):
+        """Снимок, если с прошлого прошло interval секунд; иначе None.
+
+        Ошибка сохранения снимка пишется в журнал, отчёт возвращается.
+        """
+        with self._lock:
+            if self.clock() - self._taken_at < self.interval:
+                return None
+            report = self._snapshot()
+            try:
+                self._dump()
+            except OSError as error:
+                logging.error(MEMORY_ERROR.format(error=error))
+            return report
+
+    def snapshot(self):
+        """Снимок, отчёт о росте с прошлого снимка и запись в журнал."""
+        with self._lock:
+            report = self._snapshot()
+            self._dump()
+            return report
+
+    def _snapshot(self):
+        gc.collect()
+        snapshot = self._take()
+        current, peak = tracemalloc.get_traced_memory()
+        differences = snapshot.compare_to(self._previous, 'lineno')
+        report = MemoryReport(
+            current=current,
+            peak=peak,
+            growth=sum(statistic.size_diff for statistic in differences),
+            top=[
+                Site(_where(statistic), statistic.size, statistic.count)
+                for statistic in snapshot.statistics('lineno')[:self.top]
+            ],
+            growing=[
+                Site(_where(statistic), statistic.size_diff,
+                     statistic.count_diff)
+                for statistic in differences[:self.top]
+                if statistic.size_diff > 0
+            ]
+        )
+        self.snapshots += 1
+        self._previous = snapshot
+        self._taken_at = self.clock()
+        self.last_report = report
+        self.log(report)
+        return report
+
+    def _dump(self):
+        if self.directory:
+            self._previous.dump(os.path.join(
+                self.directory, SNAPSHOT_FILE.format(number=self.snapshots)
+            ))
+
+    @staticmethod
+    def log(report):
+        """Отчёт в журнал на уровне INFO."""
+        logging.info(MEMORY_REPORT.format(**report._asdict()))
+        for site in report.top:
+            logging.info(TOP_SITE.format(**site._asdict()))
+        for site in report.growing:
+            logging.info(GROWING_SITE.format(**site._asdict()))
+
+    def stop(self):
+        """Остановка tracemalloc, если его запустил монитор."""
+        with self._lock:
+            self._previous = None
+            if self._started:
+                tracemalloc.stop()
+                self._started = False
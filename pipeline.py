@@ -0,0 +1,160 @@
+"""Разбор, проверка и сравнение ответов API в пуле процессов.
+
+Сетевой ввод-вывод остаётся в основном процессе: в пул уходят пачки
+сырых тел ответов с языком подписчика и последним отправленным ему
+сообщением, обратно возвращается только новый текст уведомления.
+Проверки те же, что в homework.poll: отказ сервиса и список homeworks
+делают ответ неудачным, а ошибка в первой работе — только уведомление.
+Уведомление строится по первой работе ответа шаблонами Templates
+и не повторяет последнее отправленное.
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from decoding import loads
+from schema import compile_schema, poll_response_schema
+
+BATCH_SIZE = 256
+SERVICE_KEYS = ('code', 'error')
+
+TenantResult = namedtuple(
+    'TenantResult',
+    ('key', 'current_date', 'message', 'homeworks', 'defects', 'error')
+)
+
+SERVICE_ERROR = 'Отказ от обслуживания: {key} {value}'
+NAME_MISSING = 'Отсутствует ключ "homework_name"'
+UNKNOWN_STATUS = 'Некорректный статус проверки: {status}'
+
+_processor = None
+
+
+class BatchProcessor:
+    """Обработка пачки ответов: разбор, проверка, сравнение."""
+
+    def __init__(self, templates, verdicts, keep_homeworks=False):
+        """Шаблоны и вердикты как в homework.render_status.
+
+        С keep_homeworks в результат попадает список работ ответа
+        для журнала смен статусов.
+        """
+        self.templates = templates
+        self.verdicts = verdicts
+        self.keep_homeworks = keep_homeworks
+        self.validate = compile_schema(poll_response_schema())
+
+    def process(self, batch):
+        """Результаты для пачки (ключ, тело, язык, последнее сообщение)."""
+        return [self.process_one(*item) for item in batch]
+
+    def process_one(self, key, body, locale, last_message):
+        """Результат для ответа одного подписчика.
+
+        message — новое значение PollState.pending: пустое, если
+        сообщение совпадает с last_message, и None, если работ в ответе
+        нет. defects — ответ не прошёл проверку; error — ответ принят,
+        но уведомление по первой работе не построено.
+        """
+        try:
+            answer = loads(body)
+        except ValueError as error:
+            return TenantResult(key, None, None, None, [str(error)], None)
+        defects = self.check(answer)
+        if defects:
+            return TenantResult(key, None, None, None, defects, None)
+        homeworks = answer['homeworks']
+        kept = homeworks if self.keep_homeworks else None
+        message = None
+        if homeworks:
+            try:
+                message = self.render(homeworks[0], locale)
+            except Exception as error:
+                return TenantResult(key, None, None, kept, [], str(error))
+            if message == last_message:
+                message = ''
+        return TenantResult(
+            key, answer.get('current_date'), message, kept, [], None
+        )
+
+    def render(self, homework, locale):
+        """Уведомление о работе, как homework.render_status."""
+        if 'homework_name' not in homework:
+            raise KeyError(NAME_MISSING)
+        status = homework['status']
+        if status not in self.verdicts:
+            raise ValueError(UNKNOWN_STATUS.format(status=status))
+        return self.templates.render(
+            locale, homework['homework_name'], status
+        )
+
+    def check(self, answer):
+        """Отказ сервиса или дефекты списка работ."""
+        if isinstance(answer, dict):
+            refusals = [
+                SERVICE_ERROR.format(key=key, value=answer[key])
+                for key in SERVICE_KEYS if key in answer
+            ]
+            if refusals:
+                return refusals
+        return self.validate(answer)
+
+
+def _init_worker(templates, verdicts, keep_homeworks):
+    global _processor
+    _processor = BatchProcessor(templates, verdicts, keep_homeworks)
+
+
+def _process_batch(batch):
+    return _processor.process(batch)
+
+
+class ProcessPipeline:
+    """Конвейер обработки ответов многих подписчиков.
+
+    При workers=0 пачки обрабатываются в текущем процессе.
+    Состояние подписчиков остаётся в основном процессе: в пачку
+    передаётся только последнее отправленное сообщение.
+    """
+
+    def __init__(self, templates, verdicts, workers=0,
+                 batch_size=BATCH_SIZE, keep_homeworks=False):
+        """Конвейер с пулом из workers процессов."""
+        self.batch_size = batch_size
+        self._inline = None
+        self._executor = None
+        if workers:
+            self._executor = ProcessPoolExecutor(
+                workers,
+                initializer=_init_worker,
+                initargs=(templates, dict(verdicts), keep_homeworks)
+            )
+        else:
+            self._inline = BatchProcessor(templates, verdicts, keep_homeworks)
+
+    def process(self, items):
+        """Результаты для (ключ, тело, язык, последнее сообщение).
+
+        Результаты идут в порядке items.
+        """
+        batches = [
+            items[start:start + self.batch_size]
+            for start in range(0, len(items), self.batch_size)
+        ]
+        if self._executor is None:
+            chunks = map(self._inline.process, batches)
+        else:
+            chunks = self._executor.map(_process_batch, batches)
+        return [result for chunk in chunks for result in chunk]
+
+    def close(self):
+        """Остановка пула процессов."""
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        """Конвейер как менеджер контекста."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Остановка пула при выходе из блока."""
+        self.close()
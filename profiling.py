@@ -0,0 +1,129 @@
+"""Профилирование нескольких циклов опроса по запросу.
+
+После request() следующие cycles циклов профилируются двумя способами:
+поток-сэмплер снимает стек основного потока каждые interval секунд
+(результат — свёрнутые стеки для flamegraph.pl / speedscope),
+а cProfile собирает статистику вызовов (результат — файл pstats).
+"""
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILE_REQUESTED = 'Запрошено профилирование {cycles} циклов'
+PROFILE_SAVED = 'Профиль {cycles} циклов сохранён: {paths}'
+PROFILE_ERROR = 'Ошибка {error} при сохранении профиля в {directory}'
+
+
+class CycleProfiler:
+    """Профилировщик циклов основного потока."""
+
+    def __init__(self, directory, cycles=1, interval=0.005,
+                 thread=None, clock=time.time):
+        """Профили пишутся в directory."""
+        self.directory = directory
+        self.cycles = cycles
+        self.interval = interval
+        self.thread = thread or threading.main_thread()
+        self.clock = clock
+        self.remaining = 0
+        self.stacks = Counter()
+        self._profile = None
+        self._profiled = 0
+        self._sampling = threading.Event()
+        self._sampler = None
+
+    @property
+    def active(self):
+        """Идёт профилирование."""
+        return self._profile is not None
+
+    def request(self, cycles=None):
+        """Профилировать следующие cycles циклов.
+
+        Безопасно вызывать из обработчика сигнала и из другого потока.
+        """
+        self.remaining = cycles or self.cycles
+        logging.info(PROFILE_REQUESTED.format(cycles=self.remaining))
+
+    def handle_signal(self, signum, frame):
+        """Обработчик сигнала, запускающего профилирование."""
+        self.request()
+
+    def cycle_started(self):
+        """Начало цикла: включение профилировщиков при запросе."""
+        if not self.remaining:
+            return
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+            self.stacks = Counter()
+            self._profiled = 0
+        self._sampling.set()
+        if self._sampler is None:
+            self._sampler = threading.Thread(
+                target=self._sample, name='profiler', daemon=True
+            )
+            self._sampler.start()
+        self._profile.enable()
+
+    def cycle_finished(self):
+        """Конец цикла: после последнего запрошенного цикла — выгрузка.
+
+        Ошибка записи профиля только попадает в журнал.
+        """
+        if self._profile is None:
+            return
+        self._profile.disable()
+        self._sampling.clear()
+        self._profiled += 1
+        self.remaining = max(0, self.remaining - 1)
+        if self.remaining:
+            return
+        try:
+            return self.dump()
+        except Exception as error:
+            logging.error(PROFILE_ERROR.format(
+                error=error, directory=self.directory
+            ))
+        finally:
+            self._profile = None
+
+    def _sample(self):
+        while True:
+            self._sampling.wait()
+            frame = sys._current_frames().get(self.thread.ident)
+            if frame is not None and self._sampling.is_set():
+                self.stacks[collapse(frame)] += 1
+            del frame
+            time.sleep(self.interval)
+
+    def dump(self):
+        """Запись свёрнутых стеков и pstats; возвращает пути файлов."""
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(
+            self.directory, f'profile-{int(self.clock() * 1000)}'
+        )
+        paths = (f'{base}.collapsed', f'{base}.pstats')
+        with open(paths[0], 'w', encoding='utf-8') as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f'{stack} {count}\n')
+        self._profile.dump_stats(paths[1])
+        logging.info(PROFILE_SAVED.format(
+            cycles=self._profiled, paths=', '.join(paths)
+        ))
+        return paths
+
+
+def collapse(frame):
+    """Стек кадра в свёрнутом формате: корень;...;вершина."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(
+            f'{os.path.basename(code.co_filename)}:{code.co_name}'
+        )
+        frame = frame.f_back
+    return ';'.join(reversed(names))
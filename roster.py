@@ -0,0 +1,178 @@
+"""Список подписчиков: токен Практикума, чат Telegram и язык.
+
+Источник — текстовый файл со строками "токен chat_id [язык]" (пустые
+строки и строки с # пропускаются) или база SQLite (.sqlite, .sqlite3,
+.db) с таблицей tenants(practicum_token, chat_id[, locale]). Без языка
+используется язык по умолчанию. Все записи проверяются разом, ошибки
+собираются в одно исключение. Изменения источника определяются
+по времени изменения и размеру файла и применяются разницей:
+добавленные и удалённые подписчики.
+"""
+import os
+import re
+import sqlite3
+from collections import namedtuple
+
+from templates import DEFAULT_LOCALE
+
+SQLITE_SUFFIXES = ('.sqlite', '.sqlite3', '.db')
+SELECT_TENANTS = (
+    'SELECT rowid, practicum_token, chat_id, {locale} FROM tenants'
+)
+TABLE_COLUMNS = 'PRAGMA table_info(tenants)'
+TOKEN_PATTERN = re.compile(r'[\x21-\x7e]+')
+CHAT_ID_PATTERN = re.compile(r'-?\d+|@\w{5,}')
+LOCALE_PATTERN = re.compile(r'[a-z]{2,3}(-[A-Za-z]{2})?')
+
+RosterDiff = namedtuple('RosterDiff', ('added', 'removed'))
+
+ROSTER_INVALID = 'Ошибки в списке подписчиков {path}:\n{defects}'
+ROSTER_UNREADABLE = 'Ошибка {error} при чтении списка подписчиков {path}'
+BAD_LINE = 'строка {line}: ожидается "токен chat_id [язык]"'
+BAD_TOKEN = 'строка {line}: некорректный токен'
+BAD_CHAT_ID = 'строка {line}: некорректный chat_id {chat_id!r}'
+BAD_LOCALE = 'строка {line}: некорректный язык {locale!r}'
+DUPLICATE = 'строка {line}: повтор строки {first}'
+MAX_DEFECTS = 20
+MORE_DEFECTS = '... и ещё {count}'
+
+
+class Tenant(namedtuple(
+    'Tenant', ('token', 'chat_id', 'locale'), defaults=(DEFAULT_LOCALE,)
+)):
+    """Подписчик: токен Практикума, чат и язык уведомлений."""
+
+    __slots__ = ()
+
+    @property
+    def key(self):
+        """Подписчик без языка: смена языка его не меняет."""
+        return self.token, self.chat_id
+
+
+class RosterError(ValueError):
+    """Список подписчиков не прочитан или не прошёл проверку."""
+
+    pass
+
+
+def read_rows(path):
+    """Строки источника: (номер строки, токен, chat_id, язык)."""
+    if path.endswith(SQLITE_SUFFIXES):
+        connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            columns = {row[1] for row in connection.execute(TABLE_COLUMNS)}
+            query = SELECT_TENANTS.format(
+                locale='locale' if 'locale' in columns else 'NULL'
+            )
+            return [
+                (line, token, None if chat_id is None else str(chat_id),
+                 locale)
+                for line, token, chat_id, locale in connection.execute(query)
+            ]
+        finally:
+            connection.close()
+    rows = []
+    with open(path, encoding='utf-8') as file:
+        for line, text in enumerate(file, 1):
+            fields = text.split()
+            if not fields or fields[0].startswith('#'):
+                continue
+            if len(fields) not in (2, 3):
+                rows.append((line, None, None, None))
+                continue
+            rows.append((line, *fields, None)[:4])
+    return rows
+
+
+def validate(rows):
+    """Подписчики по порядку источника и список всех ошибок."""
+    tenants = []
+    lines = {}
+    defects = []
+    for line, token, chat_id, locale in rows:
+        if token is None and chat_id is None:
+            defects.append(BAD_LINE.format(line=line))
+        elif not isinstance(token, str) or not TOKEN_PATTERN.fullmatch(
+            token
+        ):
+            defects.append(BAD_TOKEN.format(line=line))
+        elif chat_id is None or not CHAT_ID_PATTERN.fullmatch(chat_id):
+            defects.append(BAD_CHAT_ID.format(line=line, chat_id=chat_id))
+        elif locale is not None and (
+            not isinstance(locale, str) or not LOCALE_PATTERN.fullmatch(locale)
+        ):
+            defects.append(BAD_LOCALE.format(line=line, locale=locale))
+        else:
+            if (token, chat_id) in lines:
+                defects.append(DUPLICATE.format(
+                    line=line, first=lines[token, chat_id]
+                ))
+                continue
+            lines[token, chat_id] = line
+            tenants.append(Tenant(token, chat_id, locale or DEFAULT_LOCALE))
+    return tenants, defects
+
+
+class Roster:
+    """Список подписчиков из файла path, следящий за его изменениями."""
+
+    def __init__(self, path):
+        """Пустой список; подписчики появляются после refresh()."""
+        self.path = path
+        self.tenants = frozenset()
+        self._signature = None
+
+    @classmethod
+    def load(cls, path):
+        """Проверенный список; RosterError со всеми ошибками."""
+        roster = cls(path)
+        roster.refresh()
+        return roster
+
+    def signature(self):
+        """Время изменения и размер источника."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def changed(self):
+        """Источник изменился с последнего refresh()."""
+        return self.signature() != self._signature
+
+    def refresh(self):
+        """Перечитывание источника; разница с прежним списком.
+
+        При ошибках прежний список сохраняется и бросается RosterError.
+        """
+        signature = self.signature()
+        try:
+            tenants, defects = validate(read_rows(self.path))
+        except (OSError, sqlite3.Error, UnicodeDecodeError) as error:
+            raise RosterError(
+                ROSTER_UNREADABLE.format(error=error, path=self.path)
+            )
+        if defects:
+            shown = defects[:MAX_DEFECTS]
+            if len(defects) > MAX_DEFECTS:
+                shown.append(
+                    MORE_DEFECTS.format(count=len(defects) - MAX_DEFECTS)
+                )
+            raise RosterError(ROSTER_INVALID.format(
+                path=self.path, defects='\n'.join(shown)
+            ))
+        current = frozenset(tenants)
+        diff = RosterDiff(
+            added=[tenant for tenant in tenants
+                   if tenant not in self.tenants],
+            removed=sorted(self.tenants - current)
+        )
+        self.tenants = current
+        self._signature = signature
+        return diff
+
+    def __len__(self):
+        """Число подписчиков."""
+        return len(self.tenants)
@@ -0,0 +1,184 @@
+"""Декларативная схема ответа API и её компиляция в валидатор.
+
+Узел схемы — словарь с ключами:
+    type      ожидаемый тип или кортеж типов;
+    keys      схемы ключей словаря;
+    required  ключ обязателен;
+    forbidden ключи, наличие которых считается дефектом;
+    items     схема элементов списка;
+    enum      допустимые значения.
+"""
+
+WRONG_TYPE = '{path}: неверный тип {actual}, ожидался {expected}'
+MISSING_KEY = '{path}: отсутствует ключ "{key}"'
+FORBIDDEN_KEY = '{path}: ответ содержит ключ "{key}" со значением {value!r}'
+UNKNOWN_VALUE = '{path}: недопустимое значение {value!r}'
+
+ROOT = 'response'
+
+
+def homework_statuses_schema(statuses):
+    """Схема ответа homework_statuses с допустимыми статусами statuses."""
+    return {
+        'type': dict,
+        'forbidden': ('code', 'error'),
+        'keys': {
+            'homeworks': {
+                'type': list,
+                'required': True,
+                'items': {
+                    'type': dict,
+                    'keys': {
+                        'homework_name': {'type': str, 'required': True},
+                        'status': {
+                            'type': str,
+                            'required': True,
+                            'enum': tuple(statuses)
+                        },
+                    },
+                },
+            },
+            'current_date': {'type': int},
+        },
+    }
+
+
+def poll_response_schema():
+    """Схема ответа в объёме проверок check_response.
+
+    Проверяется только список homeworks: работы разбираются по одной
+    при отправке уведомления, как в homework.poll.
+    """
+    return {
+        'type': dict,
+        'keys': {'homeworks': {'type': list, 'required': True}},
+    }
+
+
+def compile_schema(schema):
+    """Валидатор, возвращающий список всех дефектов значения.
+
+    Схема один раз превращается в исходный код функции без рекурсии
+    и вложенных вызовов, поэтому проверка пачки ответов дешева.
+    """
+    compiler = _Compiler()
+    compiler.emit('def validate(value):')
+    compiler.emit('defects = []', 1)
+    compiler.node(schema, 'value', _escape(ROOT), 1)
+    compiler.emit('return defects', 1)
+    namespace = dict(compiler.constants)
+    exec('\n'.join(compiler.lines), namespace)
+    return namespace['validate']
+
+
+def validate_many(validate, responses):
+    """Дефекты пачки ответов: номер ответа -> список дефектов."""
+    report = {}
+    for index, response in enumerate(responses):
+        defects = validate(response)
+        if defects:
+            report[index] = defects
+    return report
+
+
+class _Compiler:
+    """Генератор исходного кода валидатора."""
+
+    def __init__(self):
+        """Пустая программа."""
+        self.lines = []
+        self.constants = dict(
+            WRONG_TYPE=WRONG_TYPE,
+            MISSING_KEY=MISSING_KEY,
+            FORBIDDEN_KEY=FORBIDDEN_KEY,
+            UNKNOWN_VALUE=UNKNOWN_VALUE,
+        )
+        self.counter = 0
+
+    def emit(self, line, depth=0):
+        """Строка кода с отступом depth."""
+        self.lines.append('    ' * depth + line)
+
+    def name(self, prefix):
+        """Уникальное имя переменной."""
+        self.counter += 1
+        return f'{prefix}{self.counter}'
+
+    def constant(self, value):
+        """Имя константы, доступной валидатору."""
+        name = self.name('_c')
+        self.constants[name] = value
+        return name
+
+    def node(self, schema, var, template, depth):
+        """Проверка значения var по узлу схемы.
+
+        template — шаблон f-строки пути к значению.
+        """
+        path = 'f' + repr(template)
+        expected = schema.get('type', object)
+        if not isinstance(expected, tuple):
+            expected = (expected,)
+        condition = f'not isinstance({var}, {self.constant(expected)})'
+        if bool not in expected and object not in expected and any(
+            issubclass(bool, item) for item in expected
+        ):
+            condition += f' or {var}.__class__ is bool'
+        expected_name = ' | '.join(item.__name__ for item in expected)
+        self.emit(f'if {condition}:', depth)
+        self.emit(
+            f'defects.append(WRONG_TYPE.format(path={path}, '
+            f'actual=type({var}).__name__, expected={expected_name!r}))',
+            depth + 1
+        )
+        self.emit('else:', depth)
+        depth += 1
+        body_start = len(self.lines)
+        for key in schema.get('forbidden', ()):
+            self.emit(f'if {key!r} in {var}:', depth)
+            self.emit(
+                f'defects.append(FORBIDDEN_KEY.format(path={path}, '
+                f'key={key!r}, value={var}[{key!r}]))',
+                depth + 1
+            )
+        for key, child in schema.get('keys', {}).items():
+            self.key(child, var, key, template, depth)
+        if 'items' in schema:
+            index = self.name('i')
+            item = self.name('v')
+            self.emit(f'for {index}, {item} in enumerate({var}):', depth)
+            self.node(
+                schema['items'], item,
+                f'{template}[{{{index}}}]', depth + 1
+            )
+        if 'enum' in schema:
+            allowed = self.constant(frozenset(schema['enum']))
+            self.emit(f'if {var} not in {allowed}:', depth)
+            self.emit(
+                f'defects.append(UNKNOWN_VALUE.format(path={path}, '
+                f'value={var}))',
+                depth + 1
+            )
+        if len(self.lines) == body_start:
+            self.lines.pop()
+
+    def key(self, schema, var, key, template, depth):
+        """Проверка ключа key словаря var."""
+        child = self.name('v')
+        path = 'f' + repr(template)
+        self.emit(f'if {key!r} in {var}:', depth)
+        self.emit(f'{child} = {var}[{key!r}]', depth + 1)
+        self.node(
+            schema, child, f'{template}.{_escape(key)}', depth + 1
+        )
+        if schema.get('required', False):
+            self.emit('else:', depth)
+            self.emit(
+                f'defects.append(MISSING_KEY.format(path={path}, '
+                f'key={key!r}))',
+                depth + 1
+            )
+
+
+def _escape(text):
+    return str(text).replace('{', '{{').replace('}', '}}')
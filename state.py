@@ -0,0 +1,84 @@
+import json
+import logging
+import os
+
+STATE_LOADED = 'Состояние восстановлено из {path}: {state}'
+STATE_SAVE_ERROR = 'Ошибка {error} при сохранении состояния в {path}'
+STATE_LOAD_ERROR = 'Ошибка {error} при чтении состояния из {path}'
+
+
+class PollState:
+    """Водяной знак опроса, последнее и ожидающее отправки сообщения.
+
+    Водяной знак timestamp сдвигается после каждого принятого ответа
+    API независимо от доставки; недоставленное сообщение хранится
+    в pending до успешной отправки. Последняя ошибка, время опроса
+    и сообщение об ошибке для отправки пачкой (pending_error)
+    не сохраняются.
+    Если задан path, состояние переживает перезапуск процесса.
+    """
+
+    def __init__(self, path=None, timestamp=0, last_message='', pending=''):
+        """Состояние с файлом path."""
+        self.path = path
+        self.timestamp = timestamp
+        self.last_message = last_message
+        self.pending = pending
+        self.last_error = ''
+        self.pending_error = ''
+        self.latency = None
+
+    def from_date(self, now, window=0):
+        """Начало окна запроса: водяной знак, но не раньше now - window."""
+        if not window:
+            return self.timestamp
+        return max(self.timestamp, int(now - window))
+
+    def advance(self, current_date):
+        """Сдвиг водяного знака на current_date ответа API.
+
+        Значение без числа, как и его отсутствие, знак не меняет:
+        иначе следующие запросы уходили бы с негодным from_date.
+        """
+        if isinstance(current_date, (int, float)) and not isinstance(
+            current_date, bool
+        ):
+            self.timestamp = current_date
+
+    @classmethod
+    def load(cls, path):
+        """Состояние из файла path или начальное, если файла нет."""
+        state = cls(path)
+        if not path or not os.path.exists(path):
+            return state
+        try:
+            with open(path, encoding='utf-8') as file:
+                data = json.load(file)
+            state.timestamp = int(data['timestamp'])
+            state.last_message = str(data['last_message'])
+            state.pending = str(data.get('pending', ''))
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            logging.error(STATE_LOAD_ERROR.format(error=error, path=path))
+            return cls(path)
+        logging.info(STATE_LOADED.format(path=path, state=data))
+        return state
+
+    def to_dict(self):
+        """Состояние для сохранения."""
+        return dict(
+            timestamp=self.timestamp,
+            last_message=self.last_message,
+            pending=self.pending
+        )
+
+    def save(self):
+        """Атомарная запись состояния в файл."""
+        if not self.path:
+            return
+        temporary = f'{self.path}.tmp'
+        try:
+            with open(temporary, 'w', encoding='utf-8') as file:
+                json.dump(self.to_dict(), file, ensure_ascii=False)
+            os.replace(temporary, self.path)
+        except OSError as error:
+            logging.error(STATE_SAVE_ERROR.format(error=error, path=self.path))
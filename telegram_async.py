@@ -0,0 +1,252 @@
+"""Асинхронный клиент Bot API Telegram поверх потоков asyncio.
+
+Сообщения во многие чаты отправляются одновременно через общий пул
+постоянных соединений HTTP/1.1. AsyncBot запускает цикл событий
+в фоновом потоке и даёт синхронный send_message(chat_id, text), как у
+telegram.Bot, поэтому homework.send_message(bot, message) работает
+с ним без изменений; send_many() отправляет пачку сообщений разом.
+
+Отправка идёт не чаще rate сообщений в секунду. На ответ 429 клиент
+выдерживает паузу retry_after для всех запросов и повторяет сообщение.
+Повторно после обрыва соединения запрос отправляется, только если
+в ответ не пришло ни байта: иначе сообщение могло быть доставлено.
+"""
+import asyncio
+import json
+import ssl
+import threading
+from urllib.parse import urlsplit
+
+API_URL = 'https://api.telegram.org'
+POOL_SIZE = 16
+TIMEOUT = 30
+RATE = 30
+TOO_MANY_REQUESTS = 429
+RATE_LIMIT_RETRIES = 3
+MAX_RETRY_AFTER = 60
+# Соединение, запись запроса и чтение ответа ограничены по отдельности.
+EXCHANGE_STAGES = 3
+
+API_ERROR = 'Bot API {status}: {description}'
+CONNECTION_CLOSED = 'Соединение закрыто сервером'
+RUN_TIMEOUT = 'Отправка не завершилась за {seconds:.0f} с'
+
+
+class TelegramApiError(Exception):
+    """Bot API отказал в выполнении метода."""
+
+    pass
+
+
+class ConnectionClosed(ConnectionResetError):
+    """Соединение закрыто до того, как пришёл хотя бы байт ответа."""
+
+    pass
+
+
+async def read_response(reader):
+    """Код, заголовки и тело ответа HTTP/1.1."""
+    try:
+        status_line = await reader.readline()
+    except ConnectionError as error:
+        raise ConnectionClosed(error)
+    if not status_line:
+        raise ConnectionClosed(CONNECTION_CLOSED)
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if not size:
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        return status, headers, b''.join(chunks)
+    length = int(headers.get('content-length', 0))
+    return status, headers, await reader.readexactly(length)
+
+
+class TelegramClient:
+    """Клиент Bot API с пулом из pool_size постоянных соединений."""
+
+    def __init__(self, token, api_url=API_URL, pool_size=POOL_SIZE,
+                 timeout=TIMEOUT, rate=RATE):
+        """Клиент бота token для сервера api_url.
+
+        rate — наибольшее число сообщений в секунду, 0 — без ограничения.
+        """
+        parts = urlsplit(api_url)
+        secure = parts.scheme == 'https'
+        self.host = parts.hostname
+        self.port = parts.port or (443 if secure else 80)
+        self.ssl = ssl.create_default_context() if secure else None
+        self.prefix = f'{parts.path.rstrip("/")}/bot{token}/'
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.rate = rate
+        self.connections_opened = 0
+        self._idle = []
+        self._slots = asyncio.Semaphore(pool_size)
+        self._next_send = 0.0
+        self._resume_at = 0.0
+
+    def deadline(self, messages=1):
+        """Наибольшее время отправки messages сообщений."""
+        attempt = EXCHANGE_STAGES * self.timeout + MAX_RETRY_AFTER
+        rounds = -(-messages // self.pool_size)
+        pacing = messages / self.rate if self.rate else 0
+        return pacing + rounds * (RATE_LIMIT_RETRIES + 1) * attempt
+
+    async def _connect(self):
+        while self._idle:
+            connection = self._idle.pop()
+            if not connection[1].is_closing():
+                return connection, True
+        self.connections_opened += 1
+        connection = await asyncio.wait_for(asyncio.open_connection(
+            self.host, self.port, ssl=self.ssl
+        ), self.timeout)
+        return connection, False
+
+    async def _exchange(self, request):
+        connection, reused = await self._connect()
+        reader, writer = connection
+        keep = False
+        try:
+            await self._send(writer, request)
+            status, headers, body = await asyncio.wait_for(
+                read_response(reader), self.timeout
+            )
+            keep = headers.get('connection', '').lower() != 'close'
+            return status, body
+        except ConnectionClosed:
+            if not reused:
+                raise
+            return await self._exchange(request)
+        finally:
+            if keep:
+                self._idle.append(connection)
+            else:
+                writer.close()
+
+    async def _send(self, writer, request):
+        try:
+            writer.write(request)
+            await asyncio.wait_for(writer.drain(), self.timeout)
+        except ConnectionError as error:
+            raise ConnectionClosed(error)
+
+    async def _pace(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self._next_send, self._resume_at)
+        if self.rate:
+            self._next_send = start + 1 / self.rate
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def call(self, method, **parameters):
+        """Результат метода Bot API.
+
+        При 429 запрос повторяется после паузы retry_after, если она
+        не длиннее MAX_RETRY_AFTER.
+        """
+        body = json.dumps(parameters, ensure_ascii=False).encode()
+        request = (
+            f'POST {self.prefix}{method} HTTP/1.1\r\n'
+            f'Host: {self.host}\r\n'
+            'Content-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            '\r\n'
+        ).encode() + body
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            await self._pace()
+            async with self._slots:
+                status, payload = await self._exchange(request)
+            answer = json.loads(payload)
+            retry_after = (answer.get('parameters') or {}).get('retry_after')
+            if (
+                status != TOO_MANY_REQUESTS or not retry_after
+                or retry_after > MAX_RETRY_AFTER
+                or attempt == RATE_LIMIT_RETRIES
+            ):
+                break
+            self._resume_at = max(
+                self._resume_at,
+                asyncio.get_running_loop().time() + retry_after
+            )
+        if not answer.get('ok'):
+            raise TelegramApiError(API_ERROR.format(
+                status=status, description=answer.get('description')
+            ))
+        return answer['result']
+
+    async def send_message(self, chat_id, text):
+        """Отправка сообщения в чат chat_id."""
+        return await self.call('sendMessage', chat_id=chat_id, text=text)
+
+    async def send_many(self, messages):
+        """Одновременная отправка пар (chat_id, текст).
+
+        Результаты в порядке сообщений; ошибки возвращаются, а не бросаются.
+        """
+        return await asyncio.gather(
+            *(self.send_message(chat_id, text) for chat_id, text in messages),
+            return_exceptions=True
+        )
+
+    async def close(self):
+        """Закрытие свободных соединений."""
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+class AsyncBot:
+    """Синхронный фасад TelegramClient с циклом событий в своём потоке."""
+
+    def __init__(self, token, **options):
+        """Бот token; options передаются в TelegramClient."""
+        self.client = TelegramClient(token, **options)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name='telegram', daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, coroutine, timeout):
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise TimeoutError(RUN_TIMEOUT.format(seconds=timeout))
+
+    def send_message(self, chat_id, text):
+        """Отправка сообщения, как telegram.Bot.send_message."""
+        return self._run(
+            self.client.send_message(chat_id, text), self.client.deadline()
+        )
+
+    def send_many(self, messages):
+        """Одновременная отправка пар (chat_id, текст)."""
+        return self._run(
+            self.client.send_many(messages),
+            self.client.deadline(len(messages))
+        )
+
+    def close(self):
+        """Закрытие соединений и остановка цикла событий."""
+        self._run(self.client.close(), self.client.timeout)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
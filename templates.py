@@ -0,0 +1,118 @@
+"""Тексты уведомлений о смене статуса на нескольких языках.
+
+Шаблоны компилируются один раз: для каждого языка и статуса вердикт
+подставляется заранее, при отправке остаётся вставить имя работы.
+Готовые сообщения кэшируются по (язык, работа, статус), поэтому
+рассылка одного статуса по многим чатам не форматирует текст повторно.
+
+Файл MESSAGES_FILE — JSON вида
+{"язык": {"template": "... {name} ... {verdict}", "verdicts": {...}}}.
+"""
+import json
+from functools import lru_cache
+
+DEFAULT_LOCALE = 'ru'
+CACHE_SIZE = 4096
+NAME_MARKER = '\0'
+LOCALES = {
+    'en': {
+        'template': 'Review status of "{name}" has changed. {verdict}',
+        'verdicts': {
+            'approved': 'The work has been reviewed: '
+                        'the reviewer liked everything. Hooray!',
+            'reviewing': 'The work has been taken for review.',
+            'rejected': 'The work has been reviewed: '
+                        'the reviewer has comments.',
+        },
+    },
+}
+
+UNKNOWN_STATUS = 'Некорректный статус проверки: {status}'
+TEMPLATE_INVALID = 'Шаблон языка {locale} должен содержать {{name}}: {error}'
+LOCALES_TYPE = 'Файл {path} должен содержать словарь язык: шаблон и вердикты'
+
+
+def compile_locale(locale, template, verdicts):
+    """Статус -> (текст до имени работы, текст после)."""
+    compiled = {}
+    for status, verdict in verdicts.items():
+        try:
+            text = template.format(name=NAME_MARKER, verdict=verdict)
+        except (KeyError, IndexError, ValueError) as error:
+            raise ValueError(
+                TEMPLATE_INVALID.format(locale=locale, error=error)
+            )
+        if text.count(NAME_MARKER) != 1:
+            raise ValueError(
+                TEMPLATE_INVALID.format(locale=locale, error=template)
+            )
+        head, _, tail = text.partition(NAME_MARKER)
+        compiled[status] = head, tail
+    return compiled
+
+
+def load_locales(path):
+    """Языки из JSON-файла path."""
+    with open(path, encoding='utf-8') as file:
+        locales = json.load(file)
+    if not isinstance(locales, dict) or not all(
+        isinstance(spec, dict)
+        and isinstance(spec.get('template'), str)
+        and isinstance(spec.get('verdicts'), dict)
+        for spec in locales.values()
+    ):
+        raise ValueError(LOCALES_TYPE.format(path=path))
+    return locales
+
+
+class Templates:
+    """Скомпилированные шаблоны уведомлений с кэшем готовых сообщений.
+
+    Неизвестный язык и отсутствующий в языке статус берутся из языка
+    по умолчанию.
+    """
+
+    def __init__(self, locales, default=DEFAULT_LOCALE,
+                 cache_size=CACHE_SIZE):
+        """Шаблоны из словаря язык -> {template, verdicts}."""
+        self.source = locales
+        self.default = default
+        self.cache_size = cache_size
+        self.compiled = {
+            locale: compile_locale(
+                locale, spec['template'], spec['verdicts']
+            )
+            for locale, spec in locales.items()
+        }
+        self.render = lru_cache(maxsize=cache_size)(self._render)
+
+    def __reduce__(self):
+        """Передача в другой процесс: шаблоны компилируются заново."""
+        return type(self), (self.source, self.default, self.cache_size)
+
+    @classmethod
+    def build(cls, template, verdicts, path=None):
+        """Шаблоны по умолчанию, встроенные и из файла path.
+
+        Язык по умолчанию строится из template и verdicts.
+        """
+        locales = dict(LOCALES)
+        if path:
+            locales.update(load_locales(path))
+        locales[DEFAULT_LOCALE] = dict(template=template, verdicts=verdicts)
+        return cls(locales)
+
+    @property
+    def locales(self):
+        """Доступные языки."""
+        return sorted(self.compiled)
+
+    def _render(self, locale, name, status):
+        default = self.compiled[self.default]
+        parts = self.compiled.get(locale, default).get(status)
+        if parts is None:
+            parts = default.get(status)
+        if parts is None:
+            raise ValueError(UNKNOWN_STATUS.format(status=status))
+        head, tail = parts
+        return f'{head}{name}{tail}'
@@ -0,0 +1,183 @@
+import signal
+import threading
+import time
+
+import pytest
+
+import utils
+from admin import AdminServer, main, request, serve_admin
+from benchmarks.bench_loop import simulated
+from clock import SystemClock, VirtualClock
+
+REAL_SLEEP = time.sleep
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        REAL_SLEEP(0.01)
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / 'admin.sock')
+
+
+class TestAdminServer:
+
+    def test_commands(self, socket_path, capsys):
+        server = serve_admin(socket_path, {'ping': lambda: 'pong'})
+        try:
+            assert request(socket_path, 'ping') == {
+                'ok': True, 'result': 'pong'
+            }
+            reply = request(socket_path, 'drop')
+            assert not reply['ok'] and 'ping' in reply['error']
+            assert main([socket_path, 'ping']) == 0
+            assert '"pong"' in capsys.readouterr().out
+        finally:
+            server.close()
+
+    def test_stale_socket_is_replaced(self, socket_path):
+        AdminServer(socket_path, {}).server_close()
+        server = serve_admin(socket_path, {'ping': lambda: 'pong'})
+        server.close()
+
+
+class TestPollLoopAdmin:
+
+    def test_state_and_flush(self, socket_path, homework_module):
+        bot = utils.MockTelegramBot()
+        loop = homework_module.PollLoop(bot, clock=VirtualClock())
+        loop.state.pending = 'Ожидает отправки'
+        loop.state.last_error = 'Сбой'
+        server = serve_admin(socket_path, loop.admin_commands())
+        try:
+            state = request(socket_path, 'state')['result']
+            assert state['queues']['pending_messages'] == 1
+            [tenant] = state['tenants']
+            assert tenant['last_error'] == 'Сбой'
+            assert homework_module.PRACTICUM_TOKEN not in str(state), (
+                'Токен не должен попадать в ответ сокета.'
+            )
+            assert request(socket_path, 'flush')['result'] == {
+                'requested': True, 'pending': 1, 'cycle_running': False
+            }
+        finally:
+            server.close()
+        assert loop.lifecycle.flush_requested
+        loop.flush()
+        assert bot.text == 'Ожидает отправки'
+        assert loop.state.last_message == 'Ожидает отправки'
+        assert not loop.lifecycle.flush_requested
+
+    def test_flush_wakes_sleep_without_poll(self, socket_path,
+                                            homework_module):
+        clock = SystemClock()
+        bot = utils.MockTelegramBot()
+        loop = homework_module.PollLoop(bot, clock=clock)
+        main_thread = threading.main_thread().ident
+        replies = []
+
+        def operator():
+            wait_for(lambda: loop.next_poll_at is not None)
+            loop.state.pending = 'Ожидает отправки'
+            replies.append(request(socket_path, 'flush')['result'])
+            wait_for(lambda: loop.state.last_message == 'Ожидает отправки')
+            signal.pthread_kill(main_thread, signal.SIGTERM)
+
+        previous = loop.lifecycle.install()
+        server = serve_admin(socket_path, loop.admin_commands())
+        thread = threading.Thread(target=operator)
+        try:
+            with simulated(clock):
+                thread.start()
+                loop.run(lambda: REAL_SLEEP(30))
+        finally:
+            thread.join()
+            server.close()
+            loop.lifecycle.restore(previous)
+        assert replies[0]['pending'] == 1
+        assert bot.text == 'Ожидает отправки'
+        assert loop.cycles == 1, (
+            'Команда flush не должна начинать внеочередной опрос.'
+        )
+
+    def test_flush_during_cycle_does_not_block(self, socket_path,
+                                               homework_module):
+        clock = VirtualClock()
+        loop = homework_module.PollLoop(
+            utils.MockTelegramBot(), clock=clock
+        )
+        entered = threading.Event()
+        release = threading.Event()
+        replies = []
+
+        def operator():
+            entered.wait(5)
+            started = time.monotonic()
+            replies.append(request(socket_path, 'flush', timeout=2))
+            replies.append(request(socket_path, 'state', timeout=2))
+            replies.append(time.monotonic() - started)
+            release.set()
+
+        server = serve_admin(socket_path, loop.admin_commands())
+        thread = threading.Thread(target=operator)
+        try:
+            with simulated(clock) as practicum:
+
+                def slow_get(url, params=None, **kwargs):
+                    entered.set()
+                    release.wait(5)
+                    return practicum(url, params, **kwargs)
+
+                homework_module.requests.get = slow_get
+                thread.start()
+                loop.cycle()
+        finally:
+            thread.join()
+            server.close()
+        flush, state, seconds = replies
+        assert seconds < 2, (
+            'Команды сокета не должны ждать конца цикла.'
+        )
+        assert flush['result']['cycle_running']
+        assert state['result']['health']['cycle_running']
+        assert not loop.lifecycle.flush_requested, (
+            'Запрошенная отправка должна выполняться в конце цикла.'
+        )
+
+    def test_poll_interrupts_sleep(self, socket_path, homework_module):
+        clock = VirtualClock()
+        loop = homework_module.PollLoop(
+            utils.MockTelegramBot(), clock=clock
+        )
+        main_thread = threading.main_thread().ident
+        snapshots = []
+
+        def operator():
+            wait_for(lambda: loop.next_poll_at is not None)
+            request(socket_path, 'poll')
+            wait_for(lambda: loop.cycles == 2)
+            snapshots.append(request(socket_path, 'state')['result'])
+            signal.pthread_kill(main_thread, signal.SIGTERM)
+
+        previous = loop.lifecycle.install()
+        server = serve_admin(socket_path, loop.admin_commands())
+        thread = threading.Thread(target=operator)
+        started = time.monotonic()
+        try:
+            with simulated(clock):
+                thread.start()
+                loop.run(lambda: REAL_SLEEP(30))
+        finally:
+            thread.join()
+            server.close()
+            loop.lifecycle.restore(previous)
+        assert time.monotonic() - started < 10, (
+            'Команда poll должна прерывать сон между циклами.'
+        )
+        assert loop.cycles == 2
+        assert snapshots[0]['cycles'] == 2
+        assert 'p50' in snapshots[0]['cycle_latency']
@@ -0,0 +1,22 @@
+from benchmarks import suite
+
+
+class TestRegressionThresholds:
+    BASELINE = {'ops_per_sec': 1000.0, 'peak_bytes': 1000}
+
+    def test_within_thresholds(self):
+        result = {'ops_per_sec': 800.0, 'peak_bytes': 1050}
+        assert suite.compare(result, self.BASELINE) == []
+
+    def test_slower_and_bigger_is_regression(self):
+        result = {'ops_per_sec': 700.0, 'peak_bytes': 1200}
+        problems = suite.compare(result, self.BASELINE)
+        assert len(problems) == 2, (
+            'Падение пропускной способности и рост памяти сверх порога '
+            'должны считаться регрессией.'
+        )
+
+    def test_measure_reports_throughput_and_memory(self):
+        result = suite.measure(lambda: [0] * 1000)
+        assert result['ops_per_sec'] > 0
+        assert result['peak_bytes'] >= 8000
@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+
+from cache import SingleFlightCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSingleFlightCache:
+
+    def test_cached_value_until_ttl(self):
+        clock = FakeClock()
+        cache = SingleFlightCache(ttl=10, clock=clock)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return {'homeworks': []}
+
+        cache.get(('token', 0), fetch)
+        cache.get(('token', 0), fetch)
+        assert len(calls) == 1, (
+            'Повторный запрос с тем же ключом должен браться из кэша.'
+        )
+        clock.now = 11
+        cache.get(('token', 0), fetch)
+        assert len(calls) == 2, (
+            'Запись кэша должна устаревать через ttl секунд.'
+        )
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 2
+
+    def test_zero_ttl_does_not_store(self):
+        cache = SingleFlightCache(ttl=0)
+        calls = []
+        cache.get('key', lambda: calls.append(1))
+        cache.get('key', lambda: calls.append(1))
+        assert len(calls) == 2
+        assert cache.hit_rate == 0
+
+    def test_sharing_block_with_zero_ttl(self):
+        cache = SingleFlightCache(ttl=0)
+        calls = []
+        with cache.sharing():
+            cache.get('key', lambda: calls.append(1))
+            cache.get('key', lambda: calls.append(1))
+        cache.get('key', lambda: calls.append(1))
+        assert len(calls) == 2, (
+            'Внутри sharing() ключ должен запрашиваться один раз, '
+            'после блока результаты не хранятся.'
+        )
+        assert cache.stats()['hits'] == 1
+
+    def test_keys_are_separate(self):
+        cache = SingleFlightCache(ttl=10)
+        assert cache.get(('a', 0), lambda: 'a') == 'a'
+        assert cache.get(('b', 0), lambda: 'b') == 'b'
+        assert cache.get(('a', 1), lambda: 'c') == 'c'
+
+    def test_expired_keys_are_swept(self):
+        clock = FakeClock()
+        cache = SingleFlightCache(ttl=10, clock=clock)
+        for timestamp in range(10000):
+            clock.now = timestamp
+            cache.get(('token', timestamp), lambda: {'homeworks': []})
+        assert cache.stats()['size'] < 200, (
+            'Просроченные ответы для прежних ключей должны удаляться.'
+        )
+
+    def test_concurrent_callers_share_one_request(self):
+        cache = SingleFlightCache(ttl=0)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def slow_fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'response'
+
+        leader = threading.Thread(
+            target=lambda: results.append(cache.get('key', slow_fetch))
+        )
+        leader.start()
+        started.wait(5)
+        followers = [
+            threading.Thread(
+                target=lambda: results.append(cache.get('key', slow_fetch))
+            )
+            for _ in range(5)
+        ]
+        for follower in followers:
+            follower.start()
+        while cache.coalesced < len(followers):
+            threading.Event().wait(0.001)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+        assert len(calls) == 1, (
+            'Одновременные вызовы должны выполнять один запрос.'
+        )
+        assert results == ['response'] * 6
+        assert cache.hit_rate == pytest.approx(5 / 6)
+
+    def test_error_is_shared_and_not_cached(self):
+        cache = SingleFlightCache(ttl=10)
+
+        def broken_fetch():
+            raise ConnectionError('down')
+
+        with pytest.raises(ConnectionError):
+            cache.get('key', broken_fetch)
+        assert cache.get('key', lambda: 'ok') == 'ok', (
+            'Ошибка запроса не должна сохраняться в кэше.'
+        )
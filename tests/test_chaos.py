@@ -0,0 +1,31 @@
+from benchmarks import chaos
+
+
+class TestChaos:
+
+    def test_server_errors_recover_next_cycle(self, homework_module):
+        report = chaos.run_scenario(
+            'server_errors', chaos.SCENARIOS['server_errors']
+        )
+        assert report.time_to_recover == homework_module.RETRY_PERIOD, (
+            'После окончания сбоя бот должен восстановиться '
+            'в следующем цикле.'
+        )
+        assert report.wasted_requests == 3
+        assert report.duplicate_notifications == 0
+
+    def test_telegram_down_delivers_after_recovery(self):
+        report = chaos.run_scenario(
+            'telegram_down', chaos.SCENARIOS['telegram_down']
+        )
+        assert report.time_to_recover is not None
+        assert report.wasted_requests == 0
+        assert report.notifications == 2
+
+    def test_flapping_does_not_repeat_notifications(self):
+        report = chaos.run_scenario('flapping', [
+            chaos.OK, chaos.SERVER_ERROR, chaos.OK, chaos.SERVER_ERROR
+        ])
+        assert report.duplicate_notifications == 0, (
+            'Одна и та же ошибка не должна отправляться повторно.'
+        )
@@ -0,0 +1,44 @@
+import pytest
+
+import utils
+from benchmarks.bench_loop import simulate
+from clock import VirtualClock
+
+
+class TestVirtualClock:
+
+    def test_sleep_advances_instantly(self):
+        clock = VirtualClock(start=100)
+        clock.sleep(600)
+        clock.advance(5)
+        assert clock.time() == clock.monotonic() == 705
+        assert clock.sleeps == 1
+
+    def test_time_does_not_go_back(self):
+        with pytest.raises(ValueError):
+            VirtualClock().advance(-1)
+
+
+class TestPollLoop:
+
+    def test_simulated_cycles(self, homework_module):
+        bot = utils.MockTelegramBot()
+        loop, practicum = simulate(1000, bot=bot)
+        assert loop.cycles == practicum.requests == 1000
+        assert loop.clock.time() == 1000 * homework_module.RETRY_PERIOD, (
+            'Между циклами часы должны сдвигаться на RETRY_PERIOD.'
+        )
+        assert loop.state.last_message == homework_module.parse_status(
+            {'homework_name': 'hw99', 'status': 'approved'}
+        )
+        assert loop.watchdog.healthy(), (
+            'Сторож должен видеть успешные циклы по виртуальным часам.'
+        )
+
+    def test_stop_ends_loop(self, homework_module):
+        loop = homework_module.PollLoop(
+            utils.MockTelegramBot(), clock=VirtualClock()
+        )
+        loop.lifecycle.request_stop()
+        loop.run(cycles=10)
+        assert loop.cycles == 0
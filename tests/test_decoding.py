@@ -0,0 +1,149 @@
+import json
+
+import pytest
+
+import decoding
+import homework
+from history import TransitionLog
+
+
+def chunks_of(data, size):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+class TestStreamingDecoder:
+    ANSWER = {
+        'homeworks': [
+            {'homework_name': 'hw1', 'status': 'approved', 'id': 1},
+            {'homework_name': 'Работа №2', 'status': 'rejected', 'id': 2},
+            {'homework_name': 'hw3', 'status': 'reviewing', 'id': 3},
+        ],
+        'current_date': 1000198991
+    }
+
+    @pytest.mark.parametrize('chunk_size', [1, 2, 7, 4096])
+    def test_parse_answer_matches_json(self, chunk_size):
+        body = json.dumps(self.ANSWER, ensure_ascii=False).encode()
+        result = decoding.parse_answer(chunks_of(body, chunk_size))
+        assert result == self.ANSWER, (
+            'Потоковый разбор должен давать тот же результат, что и json.'
+        )
+
+    def test_max_homeworks_keeps_current_date(self):
+        body = json.dumps(
+            {'homeworks': self.ANSWER['homeworks'], 'current_date': 123}
+        ).encode()
+        result = decoding.parse_answer(chunks_of(body, 5), max_homeworks=1)
+        assert result == {
+            'homeworks': self.ANSWER['homeworks'][:1],
+            'current_date': 123
+        }
+
+    def test_max_homeworks_reduces_the_rest(self):
+        body = json.dumps(self.ANSWER).encode()
+        result = decoding.parse_answer(
+            chunks_of(body, 5), max_homeworks=1, keep=('homework_name',)
+        )
+        assert result['homeworks'] == [
+            self.ANSWER['homeworks'][0],
+            {'homework_name': 'Работа №2'},
+            {'homework_name': 'hw3'},
+        ], 'Работы после max_homeworks должны сокращаться до ключей keep.'
+
+    @pytest.mark.parametrize('body', [[1, 2], None, 'homeworks', 5])
+    def test_non_object_is_returned_as_is(self, body):
+        data = json.dumps(body).encode()
+        assert decoding.parse_answer(chunks_of(data, 3)) == body, (
+            'Ответ, который не является объектом, возвращается как есть.'
+        )
+
+    def test_iter_homeworks_fills_fields(self):
+        body = json.dumps({'current_date': 5, 'homeworks': [{'a': 1}]})
+        fields = {}
+        items = list(decoding.iter_homeworks(chunks_of(body, 3), fields))
+        assert items == [{'a': 1}]
+        assert fields['current_date'] == 5
+
+    @pytest.mark.parametrize('body', [
+        {'code': 'not_authenticated', 'message': 'Нет доступа'},
+        {'homeworks': {'homework_name': 'hw1'}, 'current_date': 1},
+        {},
+    ])
+    def test_non_list_values_are_kept(self, body):
+        data = json.dumps(body).encode()
+        assert decoding.parse_answer(chunks_of(data, 4)) == body
+
+    @pytest.mark.parametrize('body', [
+        b'', b'[1, 2', b'{"homeworks": [1, 2', b'{"current_date": 1,}'
+    ])
+    def test_malformed_body_raises(self, body):
+        with pytest.raises(ValueError):
+            decoding.parse_answer(chunks_of(body, 3))
+
+    def test_truncated_number_is_not_accepted(self):
+        result = decoding.parse_answer([b'{"current_date": 12', b'34}'])
+        assert result == {'current_date': 1234}
+
+
+class TestDecodeResponse:
+
+    class Response:
+        status_code = 200
+
+        def __init__(self, body):
+            self.content = body
+
+        def iter_content(self, chunk_size):
+            return chunks_of(self.content, chunk_size)
+
+        def json(self):
+            return json.loads(self.content)
+
+    def test_fast_and_stream_paths(self):
+        body = json.dumps(TestStreamingDecoder.ANSWER).encode()
+        response = self.Response(body)
+        assert (
+            decoding.decode_response(response)
+            == TestStreamingDecoder.ANSWER
+        )
+        streamed = decoding.decode_response(response, max_homeworks=2)
+        assert len(streamed['homeworks']) == 2
+        assert streamed['current_date'] == 1000198991
+
+
+class TestStreamingMode:
+
+    @pytest.fixture(params=[0, 1], ids=['fast', 'stream'])
+    def answer_with(self, request, monkeypatch):
+        monkeypatch.setattr(homework, 'STREAM_HOMEWORKS', request.param)
+
+        def answer_with(body):
+            response = TestDecodeResponse.Response(
+                json.dumps(body, ensure_ascii=False).encode()
+            )
+            monkeypatch.setattr(
+                homework.requests, 'get', lambda **kwargs: response
+            )
+            return homework.get_api_answer(0)
+
+        return answer_with
+
+    def test_non_object_error_matches_fast_path(self, answer_with):
+        with pytest.raises(TypeError) as error:
+            homework.check_response(answer_with([1, 2]))
+        assert str(error.value) == homework.RESPONSE_TYPE.format(
+            response=list
+        ), 'Ошибка разбора не должна зависеть от режима чтения ответа.'
+
+    def test_history_sees_every_homework(self, answer_with, tmp_path):
+        answer = answer_with(TestStreamingDecoder.ANSWER)
+        homeworks = homework.check_response(answer)
+        assert homeworks[0] == TestStreamingDecoder.ANSWER['homeworks'][0]
+        log = TransitionLog(str(tmp_path))
+        try:
+            assert log.observe('token', homeworks, now=1) == 3, (
+                'В журнал должны попадать все работы ответа, '
+                'а не только первые STREAM_HOMEWORKS.'
+            )
+        finally:
+            log.close()
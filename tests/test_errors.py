@@ -0,0 +1,70 @@
+import pytest
+import requests
+
+import utils
+from errors import LazyText, redact, truncate
+
+
+class CountingValue:
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return 'value'
+
+
+class TestErrorText:
+
+    def test_redact(self):
+        parameters = {
+            'url': 'https://example.com',
+            'headers': {'Authorization': 'OAuth secret'},
+            'params': {'token': 'secret', 'from_date': 0},
+        }
+        redacted = redact(parameters)
+        assert 'secret' not in str(redacted)
+        assert redacted['headers']['Authorization'] == 'OAuth ***'
+        assert parameters['headers']['Authorization'] == 'OAuth secret', (
+            'Исходные параметры запроса не должны меняться.'
+        )
+
+    @pytest.mark.parametrize('limit', [10, 500, 4096])
+    def test_truncate(self, limit):
+        text = truncate('x' * 100000, limit)
+        assert len(text) <= limit
+        assert truncate('short', limit) == 'short'
+
+    def test_lazy_formatting(self):
+        value = CountingValue()
+        text = LazyText('{value}!', value=value)
+        assert value.calls == 0, (
+            'Текст не должен собираться до первого обращения.'
+        )
+        assert str(text) == str(text) == 'value!'
+        assert value.calls == 1
+        assert text.fields is None
+
+
+class TestApiErrors:
+
+    def test_token_not_in_error(self, homework_module, monkeypatch):
+        monkeypatch.setattr(
+            homework_module, 'HEADERS', {'Authorization': 'OAuth secret'}
+        )
+
+        def fail(*args, **kwargs):
+            raise requests.RequestException('x' * 10000)
+
+        monkeypatch.setattr(requests, 'get', fail)
+        with pytest.raises(ConnectionError) as error:
+            homework_module.get_api_answer(0)
+        message = str(error.value)
+        assert 'secret' not in message
+        assert 'OAuth ***' in message
+        assert len(message) < 2000
+
+    def test_long_message_is_cut_for_telegram(self, homework_module):
+        bot = utils.MockTelegramBot()
+        assert homework_module.send_message(bot, 'x' * 10000)
+        assert len(bot.text) <= 4096
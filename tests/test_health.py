@@ -0,0 +1,193 @@
+import json
+import urllib.error
+import urllib.request
+
+from benchmarks.bench_loop import simulated
+from clock import VirtualClock
+from health import Watchdog, serve_health
+from roster import Roster
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestWatchdog:
+
+    def test_loop_lag_and_last_success(self):
+        clock = FakeClock()
+        watchdog = Watchdog(period=600, clock=clock)
+        watchdog.cycle_started()
+        clock.now += 2
+        assert watchdog.loop_lag() == 2
+        watchdog.cycle_finished(success=True)
+        clock.now += 600
+        assert watchdog.loop_lag() == 0, (
+            'Во время сна по расписанию задержки цикла быть не должно.'
+        )
+        clock.now += 50
+        assert watchdog.loop_lag() == 50
+        assert watchdog.since_last_success() == 650
+        assert watchdog.healthy()
+        clock.now += 600
+        assert not watchdog.healthy()
+
+    def test_failed_poll_does_not_update_success(self):
+        clock = FakeClock()
+        watchdog = Watchdog(period=600, clock=clock)
+        watchdog.cycle_started()
+        watchdog.cycle_finished(success=False)
+        assert watchdog.since_last_success() is None
+
+    def test_stuck_cycle_is_aborted_once(self):
+        clock = FakeClock()
+        aborted = []
+        watchdog = Watchdog(
+            period=600, deadline=30, clock=clock,
+            on_stuck=lambda: aborted.append(1)
+        )
+        watchdog.cycle_started()
+        clock.now += 10
+        watchdog.check()
+        assert not aborted
+        clock.now += 25
+        watchdog.check()
+        watchdog.check()
+        assert aborted == [1], (
+            'Зависший цикл должен прерываться один раз.'
+        )
+        assert watchdog.status()['stuck_cycles'] == 1
+        watchdog.cycle_finished(success=False)
+        watchdog.cycle_started()
+        clock.now += 31
+        watchdog.check()
+        assert aborted == [1, 1]
+
+    def test_step_restarts_deadline(self):
+        clock = FakeClock()
+        aborted = []
+        watchdog = Watchdog(
+            period=600, deadline=30, clock=clock,
+            on_stuck=lambda: aborted.append(1)
+        )
+        watchdog.cycle_started()
+        for _ in range(3):
+            clock.now += 20
+            watchdog.check()
+            watchdog.step_started()
+        assert not aborted, (
+            'Срок должен отсчитываться от начала шага, а не цикла.'
+        )
+        clock.now += 31
+        watchdog.check()
+        assert aborted == [1]
+
+    def test_without_deadline_nothing_is_aborted(self):
+        clock = FakeClock()
+        watchdog = Watchdog(
+            period=600, clock=clock, on_stuck=lambda: 1 / 0
+        )
+        watchdog.cycle_started()
+        clock.now += 10 ** 6
+        watchdog.check()
+
+
+class RecordingBot:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+
+
+class TestPollLoopDeadline:
+
+    def run(self, homework_module, tmp_path, delays):
+        path = tmp_path / 'roster.txt'
+        path.write_text('token1 1\ntoken2 2\ntoken3 3\n')
+        clock = VirtualClock(1000)
+        bot = RecordingBot()
+
+        def abort():
+            raise homework_module.StuckCycleError('Запрос завис')
+
+        watchdog = Watchdog(
+            period=600, deadline=5, on_stuck=abort, clock=clock.monotonic
+        )
+        loop = homework_module.PollLoop(
+            bot, clock=clock, watchdog=watchdog,
+            roster=Roster.load(str(path))
+        )
+        with simulated(clock) as practicum:
+
+            def slow_get(url, params=None, **kwargs):
+                clock.advance(delays.pop(0))
+                watchdog.check()
+                return practicum(url, params, **kwargs)
+
+            homework_module.requests.get = slow_get
+            success = loop.cycle()
+        return loop, bot, practicum, success
+
+    def test_abort_inside_request_ends_cycle(self, homework_module,
+                                             tmp_path):
+        loop, bot, practicum, success = self.run(
+            homework_module, tmp_path, [1, 10, 1]
+        )
+        assert practicum.requests == 1, (
+            'Прерванный сторожем цикл не должен опрашивать '
+            'следующих подписчиков.'
+        )
+        assert not success
+        assert loop.cycles == 1
+        assert not loop.watchdog.cycle_running
+        assert not any('Запрос завис' in text for _, text in bot.sent), (
+            'Прерывание сторожем не должно отправляться в чат.'
+        )
+        assert not any(state.last_error for state in loop.states.values())
+
+    def test_deadline_is_per_tenant(self, homework_module, tmp_path):
+        loop, bot, practicum, success = self.run(
+            homework_module, tmp_path, [4, 4, 4]
+        )
+        assert success
+        assert practicum.requests == 3, (
+            'Цикл длиннее срока из быстрых опросов не должен прерываться.'
+        )
+        assert loop.watchdog.stuck_cycles == 0
+
+
+class TestHealthEndpoint:
+
+    def request(self, server, path):
+        host, port = server.server_address
+        try:
+            with urllib.request.urlopen(
+                f'http://{host}:{port}{path}', timeout=5
+            ) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as error:
+            return error.code, None
+
+    def test_health_status_codes(self):
+        clock = FakeClock()
+        watchdog = Watchdog(period=600, clock=clock)
+        server = serve_health(watchdog, port=0)
+        try:
+            watchdog.cycle_started()
+            watchdog.cycle_finished(success=True)
+            status, body = self.request(server, '/health')
+            assert status == 200
+            assert body['healthy'] and body['since_last_success'] == 0
+            clock.now += 1300
+            status, _ = self.request(server, '/health')
+            assert status == 503
+            status, _ = self.request(server, '/other')
+            assert status == 404
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,120 @@
+import pytest
+
+import history
+from history import TransitionLog, percentiles, tenant_key
+
+HOUR = 3600
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = TransitionLog(str(tmp_path))
+    yield log
+    log.close()
+
+
+class TestTransitionLog:
+
+    def test_observe_records_only_changes(self, log):
+        homeworks = [
+            {'homework_name': 'hw1', 'status': 'reviewing'},
+            {'homework_name': 'hw2', 'status': 'approved'},
+            'broken',
+        ]
+        assert log.observe('token', homeworks, now=0) == 2
+        assert log.observe('token', homeworks, now=10) == 0, (
+            'Повторный статус не должен записываться в журнал.'
+        )
+        homeworks[0]['status'] = 'approved'
+        assert log.observe('token', homeworks, now=20) == 1
+        assert log.last_status('token', 'hw1') == 'approved'
+        assert log.last_status('other', 'hw1') is None
+
+    def test_reopen_restores_records(self, tmp_path):
+        log = TransitionLog(str(tmp_path))
+        log.observe('token', [{
+            'homework_name': 'hw1',
+            'status': 'reviewing',
+            'date_updated': '2020-02-13T14:40:57Z'
+        }])
+        log.close()
+        with open(tmp_path / history.TRANSITIONS_FILE, 'ab') as file:
+            file.write(b'\x00' * 5)
+        reopened = TransitionLog(str(tmp_path))
+        assert len(reopened) == 1, (
+            'Недописанная запись в конце журнала должна отбрасываться.'
+        )
+        assert reopened.timestamps[0] == 1581604857
+        assert reopened.last_status('token', 'hw1') == 'reviewing'
+        reopened.close()
+
+    def test_read_only_leaves_partial_tail(self, tmp_path):
+        log = TransitionLog(str(tmp_path))
+        log.extend([('a', 'hw1', None, 'reviewing', 0)])
+        log.close()
+        names = tmp_path / history.NAMES_FILE
+        transitions = tmp_path / history.TRANSITIONS_FILE
+        with open(names, 'a', encoding='utf-8') as file:
+            file.write('h\thw')
+        with open(transitions, 'ab') as file:
+            file.write(b'\x00' * 5)
+        sizes = names.stat().st_size, transitions.stat().st_size
+        reader = TransitionLog(str(tmp_path), read_only=True)
+        assert len(reader) == 1 and reader.summary()['homeworks'] == 1
+        reader.close()
+        assert (names.stat().st_size, transitions.stat().st_size) == sizes, (
+            'Чтение журнала не должно обрезать файлы работающего бота.'
+        )
+        writer = TransitionLog(str(tmp_path))
+        writer.extend([('a', 'hw2', None, 'reviewing', 1)])
+        writer.close()
+        reopened = TransitionLog(str(tmp_path), read_only=True)
+        assert reopened.last_status('a', 'hw2') == 'reviewing', (
+            'Бот должен обрезать недописанную строку имён при открытии.'
+        )
+        assert not TransitionLog(
+            str(tmp_path / 'missing'), read_only=True
+        ).summary()['records']
+        assert not (tmp_path / 'missing').exists()
+
+    def test_token_is_not_stored(self, tmp_path, log):
+        log.observe('secret-token', [
+            {'homework_name': 'hw1', 'status': 'reviewing'}
+        ])
+        content = (tmp_path / history.NAMES_FILE).read_text()
+        assert 'secret-token' not in content
+        assert tenant_key('secret-token') in content
+
+    def test_review_latencies(self, log):
+        log.extend([
+            ('a', 'hw1', None, 'reviewing', 0),
+            ('b', 'hw1', None, 'reviewing', 1 * HOUR),
+            ('a', 'hw1', 'reviewing', 'rejected', 2 * HOUR),
+            ('a', 'hw1', 'rejected', 'reviewing', 3 * HOUR),
+            ('b', 'hw1', 'reviewing', 'approved', 5 * HOUR),
+            ('a', 'hw1', 'reviewing', 'approved', 4 * HOUR),
+        ])
+        assert sorted(log.review_latencies()) == [HOUR, 2 * HOUR, 4 * HOUR]
+        assert sorted(log.review_latencies(tenant='a')) == [HOUR, 2 * HOUR]
+        assert log.review_latencies(tenant=tenant_key('b')) == [4 * HOUR]
+        assert log.review_latencies(tenant='c') == []
+        assert sorted(log.review_latencies(since=3 * HOUR)) == [
+            HOUR, 4 * HOUR
+        ]
+        assert log.review_latencies(until=3 * HOUR) == [2 * HOUR]
+
+    def test_percentiles(self):
+        assert percentiles(range(1, 101)) == {50: 50, 90: 90, 99: 99}
+        assert percentiles([7]) == {50: 7, 90: 7, 99: 7}
+
+    def test_cli(self, tmp_path, capsys):
+        log = TransitionLog(str(tmp_path))
+        log.extend([
+            ('a', 'hw1', None, 'reviewing', 0),
+            ('a', 'hw1', 'reviewing', 'approved', 2 * HOUR),
+        ])
+        log.close()
+        history.main([str(tmp_path), 'latency'])
+        assert 'p50: 7200 с (2.0 ч)' in capsys.readouterr().out
+        history.main([str(tmp_path), 'summary'])
+        assert 'Записей: 2' in capsys.readouterr().out
@@ -0,0 +1,156 @@
+import json
+import os
+import signal
+import time
+
+import pytest
+import requests
+import telegram
+
+import utils
+from benchmarks.bench_loop import simulated
+from clock import VirtualClock
+from lifecycle import Interrupted, Lifecycle
+from state import PollState
+
+REAL_SLEEP = time.sleep
+
+
+@pytest.fixture
+def lifecycle():
+    lifecycle = Lifecycle()
+    previous = lifecycle.install()
+    yield lifecycle
+    Lifecycle.restore(previous)
+
+
+class TestLifecycle:
+
+    def test_signal_interrupts_sleep(self, lifecycle):
+        started = time.monotonic()
+        with pytest.raises(Interrupted):
+            with lifecycle.sleeping():
+                os.kill(os.getpid(), signal.SIGTERM)
+                REAL_SLEEP(5)
+        assert time.monotonic() - started < 1, (
+            'Сигнал остановки должен прерывать сон между циклами.'
+        )
+        assert lifecycle.stopping
+
+    def test_signal_during_cycle_only_sets_flag(self, lifecycle):
+        os.kill(os.getpid(), signal.SIGHUP)
+        assert lifecycle.reload_requested and not lifecycle.stopping
+        with pytest.raises(Interrupted):
+            with lifecycle.sleeping():
+                REAL_SLEEP(5)
+
+
+class TestPollState:
+
+    def test_save_and_load(self, tmp_path):
+        path = str(tmp_path / 'state.json')
+        state = PollState(path, timestamp=123, last_message='Привет')
+        state.save()
+        loaded = PollState.load(path)
+        assert (loaded.timestamp, loaded.last_message) == (123, 'Привет')
+
+    def test_missing_or_broken_file(self, tmp_path):
+        path = tmp_path / 'state.json'
+        assert PollState.load(str(path)).timestamp == 0
+        path.write_text('{')
+        assert PollState.load(str(path)).timestamp == 0
+
+
+class TestGracefulShutdown:
+
+    def test_main_drains_and_persists_watermark(self, monkeypatch, tmp_path,
+                                                homework_module):
+        state_file = tmp_path / 'state.json'
+        monkeypatch.setattr(homework_module, 'STATE_FILE', str(state_file))
+        monkeypatch.setattr(homework_module, 'PRACTICUM_TOKEN', 'sometoken')
+        monkeypatch.setattr(homework_module, 'TELEGRAM_TOKEN', '1234:abcdefg')
+        monkeypatch.setattr(homework_module, 'TELEGRAM_CHAT_ID', '12345')
+        monkeypatch.setattr(telegram, 'Bot', utils.MockTelegramBot)
+        data = {
+            'homeworks': [{'homework_name': 'hw123', 'status': 'approved'}],
+            'current_date': 1000198991
+        }
+
+        def mock_get(*args, **kwargs):
+            response = utils.MockResponseGET(random_timestamp=1000198991)
+            response.json = lambda: data
+            return response
+
+        def sleep_until_signal(seconds):
+            os.kill(os.getpid(), signal.SIGTERM)
+            REAL_SLEEP(5)
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        monkeypatch.setattr(time, 'sleep', sleep_until_signal)
+        started = time.monotonic()
+        homework_module.main()
+        assert time.monotonic() - started < 1
+        saved = json.loads(state_file.read_text())
+        assert saved['timestamp'] == 1000198991
+        assert 'hw123' in saved['last_message']
+        assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
+
+    def test_reload_keeps_previous_config_on_error(self, monkeypatch,
+                                                   homework_module):
+        monkeypatch.setattr(homework_module, 'RETRY_PERIOD', 600)
+        monkeypatch.setenv('RETRY_PERIOD', 'often')
+        homework_module.reload_config()
+        assert homework_module.RETRY_PERIOD == 600
+        monkeypatch.setenv('RETRY_PERIOD', '60')
+        homework_module.reload_config()
+        assert homework_module.RETRY_PERIOD == 60
+
+    def test_reload_with_invalid_token_keeps_bot(self, monkeypatch,
+                                                 homework_module):
+        monkeypatch.setattr(homework_module, 'TELEGRAM_TOKEN', '1234:abcdefg')
+        monkeypatch.setenv('TELEGRAM_TOKEN', 'garbage')
+        clock = VirtualClock()
+        bot = utils.MockTelegramBot()
+        loop = homework_module.PollLoop(bot, clock=clock)
+        loop.lifecycle.reload_requested = True
+        with simulated(clock):
+            loop.run(cycles=1)
+        assert loop.cycles == 1 and loop.bot is bot, (
+            'Неверный токен при перечитывании не должен останавливать бота.'
+        )
+        assert homework_module.TELEGRAM_TOKEN == '1234:abcdefg'
+
+    def test_reload_rolls_back_dotenv(self, monkeypatch, homework_module):
+        monkeypatch.setattr(homework_module, 'RETRY_PERIOD', 600)
+        monkeypatch.delenv('RETRY_PERIOD', raising=False)
+
+        def load_dotenv(override=False):
+            os.environ['RETRY_PERIOD'] = '-5'
+
+        monkeypatch.setattr(homework_module, 'load_dotenv', load_dotenv)
+        assert homework_module.reload_config() is None
+        assert homework_module.RETRY_PERIOD == 600
+        assert 'RETRY_PERIOD' not in os.environ, (
+            'Значения из .env должны откатываться вместе с настройками.'
+        )
+
+    def test_reload_verdicts(self, monkeypatch, tmp_path, homework_module):
+        verdicts = {'approved': 'Approved!'}
+        path = tmp_path / 'verdicts.json'
+        path.write_text(json.dumps(verdicts))
+        monkeypatch.setattr(
+            homework_module, 'HOMEWORK_VERDICTS',
+            homework_module.HOMEWORK_VERDICTS
+        )
+        monkeypatch.setattr(
+            homework_module, 'RESPONSE_VALIDATOR',
+            homework_module.RESPONSE_VALIDATOR
+        )
+        monkeypatch.setattr(
+            homework_module, 'TEMPLATES', homework_module.TEMPLATES
+        )
+        monkeypatch.setenv('HOMEWORK_VERDICTS_FILE', str(path))
+        homework_module.update_verdicts()
+        assert homework_module.parse_status(
+            {'homework_name': 'hw', 'status': 'approved'}
+        ).endswith('Approved!')
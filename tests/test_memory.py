@@ -0,0 +1,138 @@
+import logging
+import threading
+import tracemalloc
+
+import pytest
+
+import utils
+from admin import request, serve_admin
+from benchmarks.bench_loop import simulated
+from benchmarks.bench_soak import check_flat, soak
+from clock import VirtualClock
+from memory import MemoryMonitor
+from templates import DEFAULT_LOCALE, Templates
+
+
+@pytest.fixture
+def monitor():
+    clock = VirtualClock()
+    monitor = MemoryMonitor(interval=60, clock=clock.monotonic)
+    monitor.start()
+    yield monitor, clock
+    monitor.stop()
+
+
+class TestMemoryMonitor:
+
+    def test_growth_between_snapshots(self, monitor):
+        monitor, clock = monitor
+        assert monitor.check() is None, (
+            'Снимок не должен сниматься раньше interval секунд.'
+        )
+        leaked = [bytearray(1000) for _ in range(200)]
+        clock.advance(60)
+        report = monitor.check()
+        assert report is not None and monitor.snapshots == 1
+        assert report.growth >= 200 * 1000
+        assert report.growing[0].where.startswith(__file__), (
+            'Место роста должно указывать на строку с выделением памяти.'
+        )
+        assert report.growing[0].count >= 200
+        del leaked
+        assert monitor.snapshot().growth < 0
+
+    def test_snapshots_saved_to_directory(self, tmp_path):
+        monitor = MemoryMonitor(interval=0, directory=str(tmp_path))
+        monitor.start()
+        try:
+            kept = [bytearray(1000) for _ in range(10)]
+            monitor.snapshot()
+        finally:
+            monitor.stop()
+        assert len(kept) == 10
+        assert not tracemalloc.is_tracing(), (
+            'Монитор должен останавливать запущенный им tracemalloc.'
+        )
+        [path] = tmp_path.iterdir()
+        assert tracemalloc.Snapshot.load(str(path)).traces
+
+    def test_concurrent_snapshots(self, monitor):
+        monitor, clock = monitor
+        clock.advance(60)
+        errors = []
+
+        def take():
+            try:
+                for _ in range(5):
+                    monitor.snapshot()
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=take) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for _ in range(5):
+            monitor.check()
+            clock.advance(60)
+        for thread in threads:
+            thread.join()
+        assert not errors
+        assert monitor.snapshots >= 15, (
+            'Снимки из разных потоков не должны мешать друг другу.'
+        )
+
+
+class TestPollLoopMemory:
+
+    def test_memory_command(self, tmp_path, homework_module, monitor):
+        monitor, _ = monitor
+        path = str(tmp_path / 'admin.sock')
+        loop = homework_module.PollLoop(
+            utils.MockTelegramBot(), clock=VirtualClock()
+        )
+        assert 'memory' not in loop.admin_commands()
+        loop.memory = monitor
+        server = serve_admin(path, loop.admin_commands())
+        try:
+            result = request(path, 'memory')['result']
+        finally:
+            server.close()
+        assert set(result) == {'current', 'peak', 'growth', 'top', 'growing'}
+        assert monitor.snapshots == 1
+
+    def test_dump_error_does_not_stop_loop(self, homework_module, monitor,
+                                           caplog):
+        monitor, _ = monitor
+        monitor.interval = 0
+        monitor.directory = '/dev/null/memory'
+        clock = VirtualClock()
+        loop = homework_module.PollLoop(
+            utils.MockTelegramBot(), clock=clock, memory=monitor
+        )
+        with simulated(clock):
+            loop.run(cycles=2)
+        assert loop.cycles == 2, (
+            'Ошибка записи снимка памяти не должна останавливать бота.'
+        )
+        assert monitor.snapshots == 2
+        assert 'Не удалось сохранить снимок памяти' in caplog.text
+
+
+class TestSoak:
+
+    def test_memory_is_flat(self, homework_module, monkeypatch):
+        monkeypatch.setattr(homework_module, 'TEMPLATES', Templates({
+            DEFAULT_LOCALE: dict(
+                template=homework_module.REVIEW_VERDICT,
+                verdicts=homework_module.HOMEWORK_VERDICTS
+            )
+        }, cache_size=16))
+        cache = homework_module.API_CACHE
+        logging.disable(logging.CRITICAL)
+        try:
+            reports = soak(cycles=2000, checkpoints=4, warmup=500)
+        finally:
+            logging.disable(logging.NOTSET)
+        assert homework_module.API_CACHE is cache
+        assert len(reports) == 5
+        check_flat(reports, 2000)
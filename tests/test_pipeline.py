@@ -0,0 +1,168 @@
+import json
+import pickle
+
+import pytest
+
+from benchmarks.bench_loop import SimulatedResponse, simulated
+from clock import VirtualClock
+from pipeline import ProcessPipeline
+from roster import Roster
+from templates import Templates
+
+VERDICTS = {
+    'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
+    'reviewing': 'Работа взята на проверку ревьюером.',
+}
+TEMPLATE = 'Изменился статус проверки работы "{name}". {verdict}'
+TEMPLATES = Templates.build(TEMPLATE, VERDICTS)
+
+
+def body(*statuses, current_date=100):
+    return json.dumps({
+        'homeworks': [
+            {'homework_name': f'hw{number}', 'status': status}
+            for number, status in enumerate(statuses)
+        ],
+        'current_date': current_date
+    }).encode()
+
+
+class RecordingBot:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+
+
+class TestProcessPipeline:
+
+    @pytest.mark.parametrize('workers', [0, 1])
+    def test_first_homework_against_last_message(self, workers):
+        reviewing = TEMPLATE.format(name='hw0', verdict=VERDICTS['reviewing'])
+        with ProcessPipeline(TEMPLATES, VERDICTS, workers=workers,
+                             batch_size=2) as pipeline:
+            results = pipeline.process([
+                (0, body('reviewing', 'approved'), 'ru', ''),
+                (1, body('reviewing'), 'ru', reviewing),
+                (2, body(), 'ru', reviewing),
+                (3, body('approved'), 'en', ''),
+                (4, b'{broken', 'ru', ''),
+            ])
+        assert [result.key for result in results] == [0, 1, 2, 3, 4]
+        assert results[0].message == reviewing, (
+            'Уведомление должно строиться только по первой работе ответа.'
+        )
+        assert results[1].message == '', (
+            'Совпадающее с последним сообщение не должно повторяться.'
+        )
+        assert results[2].message is None
+        assert results[2].current_date == 100
+        assert results[3].message == TEMPLATES.render('en', 'hw0', 'approved')
+        assert results[4].defects, (
+            'Ошибка разбора ответа должна возвращаться как дефект.'
+        )
+        assert results[0].homeworks is None
+
+    def test_response_defects_and_render_errors(self):
+        with ProcessPipeline(TEMPLATES, VERDICTS,
+                             keep_homeworks=True) as pipeline:
+            unknown, refused, shape, valid = pipeline.process([
+                (0, body('unknown'), 'ru', ''),
+                (1, json.dumps({'code': 'not_authenticated'}).encode(),
+                 'ru', ''),
+                (2, json.dumps({'homeworks': {}}).encode(), 'ru', ''),
+                (3, body('approved', 'unknown'), 'ru', ''),
+            ])
+        assert unknown.message is None and not unknown.defects
+        assert 'unknown' in unknown.error, (
+            'Ошибка в первой работе не должна делать ответ неудачным.'
+        )
+        assert unknown.homeworks == [
+            {'homework_name': 'hw0', 'status': 'unknown'}
+        ]
+        assert 'not_authenticated' in refused.defects[0]
+        assert shape.defects
+        assert valid.error is None and not valid.defects, (
+            'Как и poll(), конвейер проверяет только первую работу.'
+        )
+        assert valid.message == TEMPLATES.render('ru', 'hw0', 'approved')
+
+    def test_templates_are_picklable(self):
+        copy = pickle.loads(pickle.dumps(TEMPLATES))
+        assert copy.render('en', 'hw', 'approved') == TEMPLATES.render(
+            'en', 'hw', 'approved'
+        )
+
+
+class TestPollLoopPipeline:
+
+    def run(self, homework_module, path, pipeline, cycles=12, answer=None):
+        clock = VirtualClock()
+        bot = RecordingBot()
+        with simulated(clock):
+            if answer is not None:
+                homework_module.requests.get = (
+                    lambda *args, **kwargs: SimulatedResponse(answer)
+                )
+            loop = homework_module.PollLoop(
+                bot, clock=clock, roster=Roster.load(str(path)),
+                pipeline=pipeline
+            )
+            loop.run(cycles=cycles)
+            loop.close()
+        states = {
+            tenant: (state.timestamp, state.last_message, state.pending,
+                     state.last_error)
+            for tenant, state in loop.states.items()
+        }
+        return bot.sent, states
+
+    @pytest.mark.parametrize('workers', [0, 1])
+    def test_same_as_sequential_poll(self, tmp_path, homework_module,
+                                     monkeypatch, workers):
+        monkeypatch.setattr(homework_module, 'PIPELINE_WORKERS', workers)
+        path = tmp_path / 'roster.txt'
+        path.write_text('token1 1\ntoken1 2 en\ntoken2 3\n')
+        expected = self.run(homework_module, path, pipeline=False)
+        assert self.run(homework_module, path, pipeline=True) == expected, (
+            'Конвейер должен отправлять те же уведомления, что и poll().'
+        )
+        assert len(expected[0]) == 9
+
+    @pytest.mark.parametrize('answer', [
+        {'homeworks': [
+            {'homework_name': 'hw0', 'status': 'approved'},
+            {'homework_name': 'hw1', 'status': 'unknown'},
+        ], 'current_date': 500},
+        {'homeworks': [{'homework_name': 'hw0', 'status': 'reviewing'}],
+         'current_date': 500.5},
+        {'homeworks': [{'homework_name': 'hw0', 'status': 'unknown'}],
+         'current_date': 500},
+        {'homeworks': [{'status': 'approved'}], 'current_date': 500},
+        {'homeworks': [], 'current_date': 'вчера'},
+        {'homeworks': {}, 'current_date': 500},
+        {'code': 'not_authenticated'},
+    ])
+    def test_same_checks_as_poll(self, tmp_path, homework_module, answer):
+        path = tmp_path / 'roster.txt'
+        path.write_text('token1 1\ntoken2 2 en\n')
+
+        def outcome(pipeline):
+            sent, states = self.run(
+                homework_module, path, pipeline=pipeline, cycles=2,
+                answer=answer
+            )
+            crash = homework_module.PROGRAM_CRASH.format(error='')
+            return (
+                [text for _, text in sent if not text.startswith(crash)],
+                {
+                    tenant: (timestamp, pending, bool(last_error))
+                    for tenant, (timestamp, _, pending, last_error)
+                    in states.items()
+                }
+            )
+
+        assert outcome(True) == outcome(False), (
+            'Конвейер должен принимать и отклонять те же ответы, что poll().'
+        )
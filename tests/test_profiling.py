@@ -0,0 +1,94 @@
+import os
+import pstats
+import signal
+
+import utils
+from benchmarks.bench_loop import simulated
+from clock import VirtualClock
+from profiling import CycleProfiler
+
+
+def busy_cycle():
+    total = 0
+    for number in range(300000):
+        total += number * number
+    return total
+
+
+class TestCycleProfiler:
+
+    def test_idle_without_request(self, tmp_path):
+        profiler = CycleProfiler(str(tmp_path))
+        profiler.cycle_started()
+        busy_cycle()
+        assert profiler.cycle_finished() is None
+        assert not os.listdir(tmp_path)
+
+    def test_profiles_requested_cycles(self, tmp_path):
+        profiler = CycleProfiler(str(tmp_path), interval=0.001)
+        profiler.request(cycles=2)
+        profiler.cycle_started()
+        busy_cycle()
+        assert profiler.cycle_finished() is None, (
+            'Профиль должен сохраняться после последнего запрошенного цикла.'
+        )
+        profiler.cycle_started()
+        busy_cycle()
+        collapsed, stats = profiler.cycle_finished()
+        assert not profiler.active
+        with open(collapsed, encoding='utf-8') as file:
+            lines = file.read().splitlines()
+        assert any('busy_cycle' in line for line in lines)
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            assert int(count) > 0
+        calls = pstats.Stats(stats).stats
+        busy = [
+            value for key, value in calls.items() if key[2] == 'busy_cycle'
+        ]
+        assert busy and busy[0][1] == 2
+
+    def test_signal_requests_profile(self, tmp_path):
+        profiler = CycleProfiler(str(tmp_path), cycles=3)
+        previous = signal.signal(signal.SIGUSR2, profiler.handle_signal)
+        try:
+            os.kill(os.getpid(), signal.SIGUSR2)
+        finally:
+            signal.signal(signal.SIGUSR2, previous)
+        assert profiler.remaining == 3
+
+    def test_dump_error_does_not_stop_loop(self, homework_module):
+        profiler = CycleProfiler('/dev/null/profiles')
+        profiler.request()
+        clock = VirtualClock()
+        loop = homework_module.PollLoop(
+            utils.MockTelegramBot(), clock=clock, profiler=profiler
+        )
+        with simulated(clock):
+            loop.run(cycles=2)
+        assert loop.cycles == 2, (
+            'Ошибка записи профиля не должна останавливать бота.'
+        )
+        assert not profiler.active
+        assert not loop.watchdog.cycle_running
+
+    def test_stuck_cycle_is_finished(self, homework_module, tmp_path,
+                                     monkeypatch):
+        profiler = CycleProfiler(str(tmp_path))
+        profiler.request()
+        clock = VirtualClock()
+        loop = homework_module.PollLoop(
+            utils.MockTelegramBot(), clock=clock, profiler=profiler
+        )
+
+        def stuck():
+            raise homework_module.StuckCycleError('Цикл прерван')
+
+        monkeypatch.setattr(loop, 'poll_all', stuck)
+        with simulated(clock):
+            loop.run(cycles=2)
+        assert loop.cycles == 2, (
+            'Прерванный сторожем цикл не должен останавливать бота.'
+        )
+        assert not loop.watchdog.cycle_running
+        assert not profiler.active
@@ -0,0 +1,160 @@
+import os
+import sqlite3
+
+import pytest
+
+import utils
+from benchmarks.bench_loop import simulated
+from cache import SingleFlightCache
+from clock import VirtualClock
+from roster import Roster, RosterError, Tenant
+
+
+def write(path, text, mtime):
+    path.write_text(text, encoding='utf-8')
+    os.utime(path, ns=(mtime, mtime))
+
+
+class TestRoster:
+
+    def test_all_defects_reported_at_once(self, tmp_path):
+        path = tmp_path / 'roster.txt'
+        write(path, (
+            '# токен chat_id\n'
+            'token1 100\n'
+            'token2\n'
+            'token3 chat\n'
+            'token1 100\n'
+        ), 1)
+        with pytest.raises(RosterError) as error:
+            Roster.load(str(path))
+        for line in ('строка 3', 'строка 4', 'строка 5'):
+            assert line in str(error.value), (
+                'Все ошибки списка должны попадать в одно исключение.'
+            )
+
+    def test_refresh_returns_diff(self, tmp_path):
+        path = tmp_path / 'roster.txt'
+        write(path, 'token1 100\ntoken2 -200\n', 1)
+        roster = Roster.load(str(path))
+        assert len(roster) == 2
+        assert not roster.changed()
+        write(path, 'token2 -200\ntoken3 @channel\n', 2)
+        assert roster.changed()
+        diff = roster.refresh()
+        assert diff.added == [Tenant('token3', '@channel')]
+        assert diff.removed == [Tenant('token1', '100')]
+
+    def test_invalid_refresh_keeps_tenants(self, tmp_path):
+        path = tmp_path / 'roster.txt'
+        write(path, 'token1 100\n', 1)
+        roster = Roster.load(str(path))
+        write(path, 'token1\n', 2)
+        with pytest.raises(RosterError):
+            roster.refresh()
+        assert roster.tenants == {Tenant('token1', '100')}
+
+    def test_sqlite(self, tmp_path):
+        path = str(tmp_path / 'roster.db')
+        connection = sqlite3.connect(path)
+        connection.execute(
+            'CREATE TABLE tenants (practicum_token TEXT, chat_id INTEGER)'
+        )
+        connection.executemany(
+            'INSERT INTO tenants VALUES (?, ?)',
+            [('token1', 100), ('token2', 200)]
+        )
+        connection.commit()
+        connection.close()
+        assert Roster.load(path).tenants == {
+            Tenant('token1', '100'), Tenant('token2', '200')
+        }
+
+
+class RecordingBot:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+
+
+class TestPollLoopRoster:
+
+    def test_tenants_applied_incrementally(self, tmp_path, homework_module):
+        path = tmp_path / 'roster.txt'
+        write(path, 'token1 100\ntoken2 200\n', 1)
+        clock = VirtualClock()
+        bot = utils.MockTelegramBot()
+        with simulated(clock) as practicum:
+            loop = homework_module.PollLoop(
+                bot, clock=clock, roster=Roster.load(str(path))
+            )
+            loop.run(cycles=1)
+            assert practicum.requests == 2
+            kept = loop.states['token2', '200']
+            write(path, 'token2 200\ntoken3 300\n', 2)
+            loop.run(cycles=1)
+        assert set(loop.states) == {('token2', '200'), ('token3', '300')}
+        assert loop.states['token2', '200'] is kept, (
+            'Состояние оставшихся подписчиков не должно сбрасываться.'
+        )
+        assert bot.chat_id == '300'
+
+    def test_locale_change_keeps_state(self, tmp_path, homework_module):
+        path = tmp_path / 'roster.txt'
+        write(path, 'token1 100\n', 1)
+        clock = VirtualClock(1000)
+        bot = utils.MockTelegramBot()
+        with simulated(clock) as practicum:
+            loop = homework_module.PollLoop(
+                bot, clock=clock, roster=Roster.load(str(path))
+            )
+            loop.run(cycles=1)
+            state = loop.states['token1', '100']
+            bot.text = None
+            write(path, 'token1 100 en\n', 2)
+            loop.run(cycles=1)
+        assert loop.states['token1', '100'] is state, (
+            'Смена языка не должна сбрасывать состояние подписчика.'
+        )
+        assert loop.tenants['token1', '100'].locale == 'en'
+        assert practicum.from_date > 0
+        assert bot.text is None, (
+            'Смена языка не должна повторять последнее уведомление.'
+        )
+
+    @pytest.mark.parametrize('pipeline', [False, True])
+    def test_tenants_share_token_response(self, tmp_path, homework_module,
+                                          monkeypatch, pipeline):
+        path = tmp_path / 'roster.txt'
+        write(path, 'token1 100\ntoken1 200 en\ntoken1 300\n', 1)
+        cache = SingleFlightCache(ttl=0)
+        monkeypatch.setattr(homework_module, 'API_CACHE', cache)
+        clock = VirtualClock(1000)
+        bot = RecordingBot()
+        with simulated(clock) as practicum:
+
+            def slow_get(url, params=None, **kwargs):
+                clock.advance(0.6)
+                return practicum(url, params, **kwargs)
+
+            homework_module.requests.get = slow_get
+            loop = homework_module.PollLoop(
+                bot, clock=clock, roster=Roster.load(str(path)),
+                pipeline=pipeline
+            )
+            loop.states['token1', '200'].timestamp = 500
+            loop.run(cycles=5)
+            loop.close()
+        assert practicum.requests == 5, (
+            'Подписчики с одним токеном должны получать один ответ API '
+            'за цикл.'
+        )
+        assert cache.hits == 10
+        assert len({
+            state.timestamp for state in loop.states.values()
+        }) == 1
+        assert sorted(chat for chat, _ in bot.sent) == [
+            '100', '100', '200', '200', '300', '300'
+        ], 'Каждый чат должен получить оба статуса работы по одному разу.'
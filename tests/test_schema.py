@@ -0,0 +1,92 @@
+import pytest
+
+import schema
+
+
+class TestResponseSchema:
+    STATUSES = ('approved', 'reviewing', 'rejected')
+
+    @pytest.fixture
+    def validate(self):
+        return schema.compile_schema(
+            schema.homework_statuses_schema(self.STATUSES)
+        )
+
+    def test_valid_response_has_no_defects(self, validate):
+        response = {
+            'homeworks': [
+                {'homework_name': 'hw1', 'status': 'approved', 'id': 1},
+                {'homework_name': 'hw2', 'status': 'reviewing'},
+            ],
+            'current_date': 1000198991
+        }
+        assert validate(response) == []
+        assert validate({'homeworks': []}) == []
+
+    def test_all_defects_are_reported(self, validate):
+        response = {
+            'homeworks': [
+                {'status': 'approved'},
+                {'homework_name': 'hw2', 'status': 'unknown'},
+                'hw3',
+            ],
+            'current_date': True,
+            'code': 'not_authenticated'
+        }
+        defects = validate(response)
+        assert len(defects) == 5, (
+            'Валидатор должен возвращать все дефекты ответа, '
+            'а не только первый.'
+        )
+        assert any('code' in defect for defect in defects)
+        assert any(
+            defect.startswith('response.homeworks[1].status')
+            for defect in defects
+        )
+        assert any(
+            defect.startswith('response.homeworks[2]:')
+            for defect in defects
+        )
+
+    @pytest.mark.parametrize('response, expected', [
+        ([], 'response: неверный тип list, ожидался dict'),
+        ({}, 'response: отсутствует ключ "homeworks"'),
+        (
+            {'homeworks': {'homework_name': 'hw1'}},
+            'response.homeworks: неверный тип dict, ожидался list'
+        ),
+    ])
+    def test_structure_defects(self, validate, response, expected):
+        assert validate(response) == [expected]
+
+    def test_validate_many(self, validate):
+        responses = [
+            {'homeworks': []},
+            [],
+            {'homeworks': [{'homework_name': 'hw', 'status': 'approved'}]},
+            {'homeworks': [{'homework_name': 'hw', 'status': None}]},
+        ]
+        report = schema.validate_many(validate, responses)
+        assert sorted(report) == [1, 3]
+
+    def test_keys_with_braces_in_path(self):
+        validate = schema.compile_schema({
+            'type': dict,
+            'keys': {'{odd}': {'type': int, 'required': True}}
+        })
+        assert validate({'{odd}': 'x'}) == [
+            'response.{odd}: неверный тип str, ожидался int'
+        ]
+
+
+class TestCheckResponses:
+
+    def test_uses_homework_verdicts(self, homework_module):
+        responses = [
+            {'homeworks': [
+                {'homework_name': 'hw', 'status': status}
+                for status in homework_module.HOMEWORK_VERDICTS
+            ]},
+            {'homeworks': [{'homework_name': 'hw', 'status': 'unknown'}]},
+        ]
+        assert list(homework_module.check_responses(responses)) == [1]
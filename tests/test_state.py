@@ -0,0 +1,75 @@
+import json
+
+import utils
+from benchmarks.bench_loop import simulated
+from clock import VirtualClock
+from state import PollState
+
+
+class FlakyBot(utils.MockTelegramBot):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+        self.delivered = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('Telegram недоступен')
+        self.delivered.append(text)
+
+
+class TestPollState:
+
+    def test_from_date_is_bounded(self):
+        state = PollState(timestamp=100)
+        assert state.from_date(10000) == 100
+        assert state.from_date(10000, window=1000) == 9000
+        assert state.from_date(1000, window=1000) == 100
+
+    def test_advance_skips_non_numbers(self):
+        state = PollState(timestamp=100)
+        for current_date in (None, 'вчера', True, [200]):
+            state.advance(current_date)
+        assert state.timestamp == 100
+        state.advance(200.5)
+        assert state.timestamp == 200.5
+
+    def test_old_state_file_is_loaded(self, tmp_path):
+        path = tmp_path / 'state.json'
+        path.write_text(json.dumps({'timestamp': 5, 'last_message': 'a'}))
+        state = PollState.load(str(path))
+        assert (state.timestamp, state.pending) == (5, '')
+        state.pending = 'b'
+        state.save()
+        assert PollState.load(str(path)).pending == 'b'
+
+
+class TestFetchWatermark:
+
+    def test_watermark_advances_when_send_fails(self, homework_module):
+        clock = VirtualClock(start=10 ** 6)
+        bot = FlakyBot(failures=2)
+        state = PollState()
+        with simulated(clock) as practicum:
+            for _ in range(3):
+                homework_module.poll(bot, state, clock=clock)
+                assert state.timestamp == int(clock.time()), (
+                    'Водяной знак должен сдвигаться после каждого '
+                    'принятого ответа, даже если отправка не удалась.'
+                )
+                clock.sleep(homework_module.RETRY_PERIOD)
+            assert practicum.answer(state.timestamp)['homeworks'] == []
+        assert len(bot.delivered) == 1, (
+            'Недоставленное сообщение должно быть отправлено повторно.'
+        )
+        assert state.pending == ''
+        assert state.last_message == bot.delivered[0]
+
+    def test_window_is_bounded(self, homework_module, monkeypatch):
+        monkeypatch.setattr(homework_module, 'MAX_FETCH_WINDOW', 3600)
+        clock = VirtualClock(start=10 ** 6)
+        with simulated(clock) as practicum:
+            homework_module.poll(utils.MockTelegramBot(), PollState(),
+                                 clock=clock)
+        assert practicum.from_date == 10 ** 6 - 3600
@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.bench_loop import simulated
+from benchmarks.bench_telegram import TOKEN, StandInBotApi
+from clock import VirtualClock
+from roster import Roster
+from telegram_async import AsyncBot, TelegramApiError
+
+
+@pytest.fixture
+def stand_in():
+    server = StandInBotApi(latency=0.01).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def bot(stand_in):
+    bot = AsyncBot(TOKEN, api_url=stand_in.url, pool_size=4, rate=0)
+    yield bot
+    bot.close()
+
+
+class TestAsyncBot:
+
+    def test_send_message_contract(self, homework_module, stand_in, bot,
+                                   monkeypatch):
+        monkeypatch.setattr(homework_module, 'TELEGRAM_CHAT_ID', '100')
+        assert homework_module.send_message(bot, 'Первое') is True
+        assert homework_module.send_message(bot, 'Второе') is True
+        assert stand_in.received == [('100', 'Первое'), ('100', 'Второе')]
+        assert bot.client.connections_opened == 1, (
+            'Соединение должно переиспользоваться.'
+        )
+        stand_in.failing.add('100')
+        assert homework_module.send_message(bot, 'Третье') is False
+
+    def test_send_many(self, stand_in, bot):
+        stand_in.failing.add('3')
+        results = bot.send_many([(str(chat), 'Текст') for chat in range(20)])
+        assert isinstance(results[3], TelegramApiError)
+        assert sum(
+            not isinstance(result, Exception) for result in results
+        ) == 19
+        assert bot.client.connections_opened <= 4, (
+            'Число соединений ограничено размером пула.'
+        )
+
+    def test_reconnect_after_server_closed(self, stand_in, bot):
+        bot.send_message('1', 'До')
+        stand_in.loop.call_soon_threadsafe(
+            lambda: [writer.close() for writer in stand_in._writers]
+        )
+        bot.send_message('1', 'После')
+        assert stand_in.received[-1] == ('1', 'После')
+
+    def test_retry_after_too_many_requests(self, stand_in, bot):
+        stand_in.throttled = 2
+        started = time.monotonic()
+        bot.send_message('1', 'Текст')
+        assert time.monotonic() - started >= 2 * stand_in.retry_after, (
+            'Повтор после 429 должен ждать retry_after.'
+        )
+        assert stand_in.received == [('1', 'Текст')], (
+            'Сообщение должно быть доставлено ровно один раз.'
+        )
+
+    def test_partial_response_not_retried(self, stand_in, bot):
+        bot.send_message('1', 'До')
+        stand_in.truncated = 1
+        with pytest.raises(asyncio.IncompleteReadError):
+            bot.send_message('1', 'Оборванный')
+        assert stand_in.received == [('1', 'До'), ('1', 'Оборванный')], (
+            'Запрос, на который пришла часть ответа, не должен повторяться.'
+        )
+
+    def test_rate_limit(self, stand_in):
+        bot = AsyncBot(TOKEN, api_url=stand_in.url, rate=50)
+        try:
+            started = time.monotonic()
+            bot.send_many([('1', 'Текст')] * 6)
+            assert time.monotonic() - started >= 5 / 50
+        finally:
+            bot.close()
+
+    def test_run_deadline(self, stand_in, bot, monkeypatch):
+        stand_in.latency = 0.5
+        monkeypatch.setattr(
+            bot.client, 'deadline', lambda messages=1: 0.05
+        )
+        with pytest.raises(TimeoutError):
+            bot.send_message('1', 'Текст')
+
+
+class TestRosterFanOut:
+
+    def test_pending_sent_in_one_batch(self, tmp_path, homework_module,
+                                       stand_in, bot):
+        path = tmp_path / 'roster.txt'
+        path.write_text(''.join(
+            f'token{number} {number} en\n' for number in range(10)
+        ))
+        clock = VirtualClock()
+        with simulated(clock):
+            loop = homework_module.PollLoop(
+                bot, clock=clock, roster=Roster.load(str(path))
+            )
+            loop.run(cycles=1)
+        assert sorted(chat for chat, _ in stand_in.received) == [
+            str(number) for number in range(10)
+        ]
+        assert all(
+            state.last_message and not state.pending
+            for state in loop.states.values()
+        )
+
+    def test_errors_sent_in_batch(self, tmp_path, homework_module,
+                                  stand_in, bot, monkeypatch):
+        path = tmp_path / 'roster.txt'
+        path.write_text(''.join(
+            f'token{number} {number}\n' for number in range(10)
+        ))
+        single = []
+        monkeypatch.setattr(
+            bot, 'send_message', lambda *args: single.append(args)
+        )
+        clock = VirtualClock()
+        with simulated(clock, failure_every=1):
+            loop = homework_module.PollLoop(
+                bot, clock=clock, roster=Roster.load(str(path))
+            )
+            loop.run(cycles=2)
+        assert not single, (
+            'Сообщения об ошибках должны уходить пачкой send_many.'
+        )
+        assert sorted(chat for chat, _ in stand_in.received) == [
+            str(number) for number in range(10)
+        ], 'Повторная ошибка не должна отправляться снова.'
+        assert all(
+            text.startswith('Сбой в работе программы')
+            for _, text in stand_in.received
+        )
+        assert not any(
+            state.pending_error for state in loop.states.values()
+        )
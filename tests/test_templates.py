@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from roster import Tenant, read_rows, validate
+from templates import Templates
+
+TEMPLATE = 'Изменился статус проверки работы "{name}". {verdict}'
+VERDICTS = {
+    'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
+    'reviewing': 'Работа взята на проверку ревьюером.',
+}
+
+
+class TestTemplates:
+
+    def test_default_locale_matches_format(self):
+        templates = Templates.build(TEMPLATE, VERDICTS)
+        for status, verdict in VERDICTS.items():
+            assert templates.render('ru', 'hw {1}', status) == (
+                TEMPLATE.format(name='hw {1}', verdict=verdict)
+            )
+
+    def test_rendered_messages_are_cached(self):
+        templates = Templates.build(TEMPLATE, VERDICTS)
+        for _ in range(1000):
+            templates.render('en', 'hw', 'approved')
+        info = templates.render.cache_info()
+        assert (info.hits, info.misses) == (999, 1), (
+            'Повторное сообщение должно браться из кэша.'
+        )
+
+    def test_fallback_to_default_locale(self):
+        templates = Templates.build(TEMPLATE, VERDICTS)
+        assert templates.render('xx', 'hw', 'approved') == (
+            templates.render('ru', 'hw', 'approved')
+        )
+        assert templates.render('en', 'hw', 'approved').startswith(
+            'Review status of "hw"'
+        )
+        with pytest.raises(ValueError):
+            templates.render('en', 'hw', 'lost')
+
+    def test_locales_file(self, tmp_path):
+        path = tmp_path / 'messages.json'
+        path.write_text(json.dumps({'de': {
+            'template': '{name}: {verdict}',
+            'verdicts': {'approved': 'Angenommen'}
+        }}))
+        templates = Templates.build(TEMPLATE, VERDICTS, str(path))
+        assert templates.locales == ['de', 'en', 'ru']
+        assert templates.render('de', 'hw', 'approved') == 'hw: Angenommen'
+        assert templates.render('de', 'hw', 'reviewing') == (
+            templates.render('ru', 'hw', 'reviewing')
+        )
+
+    @pytest.mark.parametrize('template', ['{verdict}', '{name} {unknown}'])
+    def test_invalid_template(self, template):
+        with pytest.raises(ValueError):
+            Templates({'ru': {'template': template, 'verdicts': VERDICTS}})
+
+
+class TestTenantLocale:
+
+    def test_roster_locale(self, tmp_path):
+        path = tmp_path / 'roster.txt'
+        path.write_text('token1 100 en\ntoken2 200\ntoken3 300 english\n')
+        tenants, defects = validate(read_rows(str(path)))
+        assert tenants == [
+            Tenant('token1', '100', 'en'), Tenant('token2', '200', 'ru')
+        ]
+        assert len(defects) == 1
+
+    def test_poll_uses_tenant_locale(self, homework_module, monkeypatch):
+        sent = []
+        monkeypatch.setattr(
+            homework_module, 'get_cached_api_answer',
+            lambda timestamp, token=None: {
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': 1
+            }
+        )
+        monkeypatch.setattr(
+            homework_module, 'send_chat_message',
+            lambda bot, chat_id, message: sent.append(message) or True
+        )
+        state = homework_module.PollState()
+        homework_module.poll(None, state, tenant=Tenant('token', '1', 'en'))
+        assert sent == [homework_module.TEMPLATES.render(
+            'en', 'hw', 'approved'
+        )]
@@ -0,0 +1,111 @@
+import io
+import json
+
+import pytest
+import requests
+
+import utils
+from state import PollState
+from tracing import JsonLinesExporter, Tracer
+
+
+class ListExporter:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, service, spans):
+        self.traces.append(spans)
+
+
+class TestTracer:
+
+    def test_nested_spans_share_trace(self):
+        exporter = ListExporter()
+        tracer = Tracer(exporter, sample_ratio=1)
+        with tracer.span('poll'):
+            with tracer.span('request', from_date=0) as span:
+                span.set_attribute('http.status_code', 200)
+            with tracer.span('send'):
+                pass
+        assert len(exporter.traces) == 1
+        spans = {span.name: span for span in exporter.traces[0]}
+        root = spans['poll']
+        assert root.parent_id is None
+        for name in ('request', 'send'):
+            assert spans[name].trace_id == root.trace_id
+            assert spans[name].parent_id == root.span_id
+        assert spans['request'].attributes == {
+            'from_date': 0, 'http.status_code': 200
+        }
+
+    def test_sampler(self):
+        exporter = ListExporter()
+        draws = iter([0.9, 0.1])
+        tracer = Tracer(exporter, sample_ratio=0.5, rng=lambda: next(draws))
+        for _ in range(2):
+            with tracer.span('poll'):
+                with tracer.span('request') as span:
+                    span.set_attribute('key', 'value')
+        assert len(exporter.traces) == 1, (
+            'Невыбранная трасса не должна выгружаться.'
+        )
+        assert len(exporter.traces[0]) == 2
+
+    def test_disabled_tracer_does_not_record(self):
+        tracer = Tracer(None, sample_ratio=1)
+        with tracer.span('poll') as span:
+            assert not span.recording
+
+    def test_error_status(self):
+        exporter = ListExporter()
+        tracer = Tracer(exporter, sample_ratio=1)
+        with pytest.raises(ValueError):
+            with tracer.span('poll'):
+                raise ValueError('boom')
+        otlp = exporter.traces[0][0].to_otlp()
+        assert otlp['status'] == {'code': 2, 'message': 'ValueError: boom'}
+
+    def test_otlp_json_lines(self):
+        stream = io.StringIO()
+        tracer = Tracer(
+            JsonLinesExporter(stream), sample_ratio=1,
+            clock=iter(range(100, 200)).__next__
+        )
+        with tracer.span('poll', homeworks=3, ratio=0.5, cached=False):
+            pass
+        request = json.loads(stream.getvalue())
+        span = request['resourceSpans'][0]['scopeSpans'][0]['spans'][0]
+        assert len(span['traceId']) == 32 and len(span['spanId']) == 16
+        assert span['startTimeUnixNano'] == '100'
+        assert span['endTimeUnixNano'] == '101'
+        assert span['attributes'] == [
+            {'key': 'homeworks', 'value': {'intValue': '3'}},
+            {'key': 'ratio', 'value': {'doubleValue': 0.5}},
+            {'key': 'cached', 'value': {'boolValue': False}},
+        ]
+
+
+class TestPollTracing:
+
+    def test_poll_stages(self, monkeypatch, homework_module):
+        exporter = ListExporter()
+        monkeypatch.setattr(
+            homework_module, 'TRACER', Tracer(exporter, sample_ratio=1)
+        )
+        data = {
+            'homeworks': [{'homework_name': 'hw123', 'status': 'approved'}],
+            'current_date': 1000198991
+        }
+
+        def mock_get(*args, **kwargs):
+            response = utils.MockResponseGET(random_timestamp=1000198991)
+            response.json = lambda: data
+            return response
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        homework_module.poll(utils.MockTelegramBot(), PollState())
+        names = [span.name for span in exporter.traces[0]]
+        assert sorted(names) == sorted([
+            'poll', 'practicum.request', 'practicum.decode',
+            'check_response', 'parse_status', 'telegram.send_message'
+        ])
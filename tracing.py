@@ -0,0 +1,187 @@
+"""Лёгкие спаны для этапов цикла опроса.
+
+Спаны выгружаются построчно в формате OTLP/JSON (ExportTraceServiceRequest),
+который понимают коллекторы OpenTelemetry.
+"""
+import json
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+SCOPE = 'homework_bot'
+
+
+class Span:
+    """Интервал выполнения этапа."""
+
+    recording = True
+
+    def __init__(self, name, trace_id, parent_id, kind, attributes, clock):
+        """Начатый спан."""
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = random.getrandbits(64)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = dict(attributes)
+        self.start = clock()
+        self.end = None
+        self.error = None
+
+    def set_attribute(self, key, value):
+        """Атрибут спана."""
+        self.attributes[key] = value
+
+    def to_otlp(self):
+        """Спан в формате OTLP/JSON."""
+        span = {
+            'traceId': f'{self.trace_id:032x}',
+            'spanId': f'{self.span_id:016x}',
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start),
+            'endTimeUnixNano': str(self.end),
+            'attributes': [
+                {'key': key, 'value': _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            'status': (
+                {'code': STATUS_ERROR, 'message': self.error}
+                if self.error is not None else {'code': STATUS_OK}
+            ),
+        }
+        if self.parent_id is not None:
+            span['parentSpanId'] = f'{self.parent_id:016x}'
+        return span
+
+
+class _NoopSpan:
+    """Спан невыбранной трассы: ничего не записывает."""
+
+    recording = False
+
+    def set_attribute(self, key, value):
+        """Атрибут игнорируется."""
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Создание спанов с выборкой трасс по доле sample_ratio.
+
+    Решение о выборке принимается для корневого спана и наследуется
+    вложенными. Законченная трасса целиком уходит в exporter.
+    """
+
+    def __init__(self, exporter=None, sample_ratio=0.0, service=SCOPE,
+                 clock=time.time_ns, rng=random.random):
+        """Трассировщик; без exporter все спаны пустые."""
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio if exporter is not None else 0.0
+        self.service = service
+        self.clock = clock
+        self.rng = rng
+        self._local = threading.local()
+
+    @property
+    def enabled(self):
+        """Трассы выбираются хотя бы иногда."""
+        return self.sample_ratio > 0
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name, kind=SPAN_KIND_INTERNAL, **attributes):
+        """Спан этапа name; исключение помечает его ошибкой."""
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+        stack = self._stack()
+        if stack:
+            parent = stack[-1]
+        elif self.rng() < self.sample_ratio:
+            parent = None
+        else:
+            parent = NOOP_SPAN
+        if parent is NOOP_SPAN:
+            stack.append(NOOP_SPAN)
+            try:
+                yield NOOP_SPAN
+            finally:
+                stack.pop()
+            return
+        span = Span(
+            name,
+            random.getrandbits(128) if parent is None else parent.trace_id,
+            None if parent is None else parent.span_id,
+            kind, attributes, self.clock
+        )
+        if parent is None:
+            self._local.finished = []
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as error:
+            span.error = f'{type(error).__name__}: {error}'
+            raise
+        finally:
+            span.end = self.clock()
+            stack.pop()
+            self._local.finished.append(span)
+            if parent is None:
+                self.exporter.export(self.service, self._local.finished)
+
+
+class JsonLinesExporter:
+    """Запись трасс по одной JSON-строке в файл или поток."""
+
+    def __init__(self, stream):
+        """Экспорт в открытый текстовый поток."""
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path):
+        """Экспорт в файл path; '-' — стандартный вывод."""
+        if path == '-':
+            return cls(sys.stdout)
+        return cls(open(path, 'a', encoding='utf-8'))
+
+    def export(self, service, spans):
+        """Запись законченной трассы."""
+        request = {'resourceSpans': [{
+            'resource': {'attributes': [{
+                'key': 'service.name',
+                'value': {'stringValue': service}
+            }]},
+            'scopeSpans': [{
+                'scope': {'name': SCOPE},
+                'spans': [span.to_otlp() for span in spans],
+            }],
+        }]}
+        line = json.dumps(request, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}